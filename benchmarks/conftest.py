@@ -0,0 +1,85 @@
+"""Fixtures for the benchmark suite.
+
+Library size and simulated latency come from the environment so the same suite can
+run as a quick CI check or a large local scaling run::
+
+    ZOTCLI_BENCH_ITEMS=50000 ZOTCLI_BENCH_LATENCY=0.05 pytest benchmarks
+
+``run_cli`` talks to an in-process fake client; ``run_cli_http`` points the CLI at
+the stand-in Web API server in ``zotero_server.py`` with ``ZOTERO_API_BASE_URL``, so
+the HTTP stack, paging headers and version preconditions are part of the measurement.
+"""
+import os
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from pyzotero_cli.zot_cli import zot
+from synthetic import SyntheticZotero, generate_library
+from zotero_server import Library, StandInServer
+
+BENCH_ITEMS = int(os.environ.get("ZOTCLI_BENCH_ITEMS", "2000"))
+BENCH_COLLECTIONS = int(os.environ.get("ZOTCLI_BENCH_COLLECTIONS", "100"))
+BENCH_TAGS = int(os.environ.get("ZOTCLI_BENCH_TAGS", "500"))
+# Seconds added to every fake API request
+BENCH_LATENCY = float(os.environ.get("ZOTCLI_BENCH_LATENCY", "0"))
+
+
+@pytest.fixture(scope="session")
+def library():
+    return generate_library(BENCH_ITEMS, BENCH_COLLECTIONS, BENCH_TAGS)
+
+
+@pytest.fixture
+def fake_zot(library):
+    return SyntheticZotero(library, latency=BENCH_LATENCY)
+
+
+def _runner(library, tmp_path, monkeypatch):
+    monkeypatch.setenv("ZOTCLI_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setenv("ZOTERO_API_KEY", "benchmark-key")
+    monkeypatch.setenv("ZOTERO_LIBRARY_ID", library.library_id)
+    monkeypatch.setenv("ZOTERO_LIBRARY_TYPE", library.library_type)
+    runner = CliRunner()
+
+    def run(*args, check=True):
+        result = runner.invoke(zot, ['--no-interaction', *args], catch_exceptions=False)
+        if check:
+            assert result.exit_code == 0, result.output
+        return result
+
+    return run
+
+
+@pytest.fixture
+def run_cli(fake_zot, tmp_path, monkeypatch):
+    """Run a zot command against the synthetic library; fails the benchmark on a non-zero exit."""
+    run = _runner(fake_zot.library, tmp_path, monkeypatch)
+    with patch("pyzotero_cli.zot_cli.pyzotero_client.Zotero", return_value=fake_zot), \
+         patch("pyzotero.zotero.Zotero", return_value=fake_zot):
+        yield run
+
+
+@pytest.fixture
+def stand_in(library):
+    """A stand-in Web API server holding a fresh copy of the synthetic library."""
+    with StandInServer([Library.from_synthetic(library)], latency=BENCH_LATENCY,
+                       user_id=int(library.library_id)) as server:
+        yield server
+
+
+@pytest.fixture
+def run_cli_http(stand_in, library, tmp_path, monkeypatch):
+    """Like run_cli, but the CLI sends real HTTP requests to ``stand_in`` (via ZOTERO_API_BASE_URL)."""
+    run = _runner(library, tmp_path, monkeypatch)
+    monkeypatch.setenv("ZOTERO_API_BASE_URL", stand_in.url)
+    return run
+
+
+def pytest_benchmark_update_json(config, benchmarks, output_json):
+    """Add items/second to the JSON report for benchmarks that declare an item count."""
+    for bench in output_json["benchmarks"]:
+        count = bench.get("extra_info", {}).get("items")
+        if count and bench["stats"]["mean"]:
+            bench["extra_info"]["items_per_second"] = round(count / bench["stats"]["mean"], 1)
@@ -0,0 +1,228 @@
+"""Synthetic Zotero libraries and an in-process fake client for benchmarks.
+
+``generate_library(n_items, n_collections, n_tags)`` builds deterministic item,
+collection and tag records shaped like Zotero Web API v3 responses (including the
+``links``/``library``/``meta`` envelopes). ``SyntheticZotero`` serves such a library
+through the subset of the pyzotero client interface the CLI uses, with the API's
+100-object page limit and an optional per-request latency.
+"""
+import copy
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from pyzotero.zotero_errors import ResourceNotFoundError
+
+KEY_ALPHABET = "23456789ABCDEFGHIJKLMNPQRSTUVWXYZ"
+API_PAGE_LIMIT = 100
+ITEM_TYPES = ("journalArticle", "book", "bookSection", "conferencePaper", "report", "thesis", "preprint")
+LAST_NAMES = ("Smith", "Garcia", "Chen", "Okafor", "Novak", "Tanaka", "Silva", "Kowalski", "Haddad", "Larsen")
+WORDS = ("adaptive", "bayesian", "cellular", "dynamics", "evidence", "framework", "genomic", "hierarchical",
+         "inference", "latent", "models", "networks", "optimal", "protein", "quantum", "regression",
+         "sampling", "temporal", "urban", "variational")
+
+
+@dataclass
+class SyntheticLibrary:
+    library_id: str
+    library_type: str
+    items: list[dict[str, Any]]
+    collections: list[dict[str, Any]]
+    tags: list[str]
+    version: int
+    by_key: dict[str, dict[str, Any]] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self.by_key = {item["key"]: item for item in self.items}
+
+
+def _key(rng: random.Random) -> str:
+    return "".join(rng.choice(KEY_ALPHABET) for _ in range(8))
+
+
+def _library_envelope(library_type: str, library_id: str) -> dict[str, Any]:
+    path = f"{library_type}s/{library_id}"
+    return {
+        "type": library_type,
+        "id": int(library_id),
+        "name": "Synthetic library",
+        "links": {"alternate": {"href": f"https://www.zotero.org/{path}", "type": "text/html"}},
+    }
+
+
+def generate_library(n_items: int = 1000, n_collections: int = 50, n_tags: int = 200, seed: int = 1,
+                     library_id: str = "12345", library_type: str = "user") -> SyntheticLibrary:
+    """Build a deterministic library. Tag usage follows a Zipf-like distribution."""
+    rng = random.Random(seed)
+    library = _library_envelope(library_type, library_id)
+    base = f"https://api.zotero.org/{library_type}s/{library_id}"
+
+    collections = []
+    for index in range(n_collections):
+        key = _key(rng)
+        parent = collections[rng.randrange(index)]["key"] if index and rng.random() < 0.4 else False
+        collections.append({
+            "key": key, "version": index + 1, "library": library,
+            "links": {"self": {"href": f"{base}/collections/{key}", "type": "application/json"}},
+            "meta": {"numCollections": 0, "numItems": 0},
+            "data": {"key": key, "version": index + 1, "name": f"Collection {index}",
+                     "parentCollection": parent, "relations": {}},
+        })
+
+    tags = [f"{rng.choice(WORDS)}-{index}" for index in range(n_tags)]
+    tag_weights = [1 / (rank + 1) for rank in range(n_tags)]
+
+    items = []
+    for index in range(n_items):
+        key = _key(rng)
+        version = n_collections + index + 1
+        year = 1990 + rng.randrange(35)
+        last_names = rng.sample(LAST_NAMES, rng.randint(1, 3))
+        item_tags = set(rng.choices(tags, weights=tag_weights, k=rng.randint(0, 6))) if tags else set()
+        item_collections = {c["key"] for c in rng.sample(collections, min(len(collections), rng.randint(0, 2)))}
+        added = f"{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00Z"
+        data = {
+            "key": key,
+            "version": version,
+            "itemType": rng.choice(ITEM_TYPES),
+            "title": " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 10))).capitalize(),
+            "creators": [{"creatorType": "author", "firstName": "A.", "lastName": name} for name in last_names],
+            "abstractNote": " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 80))),
+            "publicationTitle": f"Journal of {rng.choice(WORDS).capitalize()} Studies",
+            "date": str(year),
+            "DOI": f"10.{1000 + rng.randrange(9000)}/synthetic.{index}",
+            "url": f"https://example.org/{key}",
+            "tags": [{"tag": tag} for tag in sorted(item_tags)],
+            "collections": sorted(item_collections),
+            "relations": {},
+            "dateAdded": added,
+            "dateModified": added,
+        }
+        items.append({
+            "key": key, "version": version, "library": library,
+            "links": {"self": {"href": f"{base}/items/{key}", "type": "application/json"},
+                      "alternate": {"href": f"https://www.zotero.org/{library_type}s/{library_id}/items/{key}",
+                                    "type": "text/html"}},
+            "meta": {"creatorSummary": last_names[0], "parsedDate": str(year), "numChildren": 0},
+            "data": data,
+        })
+    # Newest first, like the API's default dateAdded sort used by the CLI's scans
+    items.sort(key=lambda item: item["data"]["dateAdded"], reverse=True)
+    return SyntheticLibrary(library_id, library_type, items, collections, tags, version=n_collections + n_items)
+
+
+class SyntheticZotero:
+    """Fake pyzotero client serving a SyntheticLibrary.
+
+    Every API-backed method sleeps ``latency`` seconds and counts one request;
+    list methods return at most 100 objects per call, as the Web API does.
+    Writes mutate a private copy, which ``reset()`` restores.
+    """
+
+    def __init__(self, library: SyntheticLibrary, latency: float = 0.0, **kwargs: Any):
+        self.library = library
+        self.library_id = library.library_id
+        self.library_type = library.library_type
+        self.latency = latency
+        self.requests = 0
+        self.reset()
+
+    def reset(self) -> None:
+        self.items_by_key = {key: item for key, item in self.library.by_key.items()}
+        self.deleted_tags: set[str] = set()
+        self.version = self.library.version
+        self.requests = 0
+
+    def _request(self) -> None:
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    @staticmethod
+    def _page(records: list[Any], limit: Any = None, start: Any = None) -> list[Any]:
+        start = int(start or 0)
+        limit = min(int(limit or API_PAGE_LIMIT), API_PAGE_LIMIT)
+        return records[start:start + limit]
+
+    # ── Reads ──────────────────────────────────────────────────────────
+
+    def items(self, **kwargs: Any) -> list[dict[str, Any]]:
+        self._request()
+        records = [item for item in self.items_by_key.values()]
+        if kwargs.get("itemKey"):
+            keys = set(kwargs["itemKey"].split(","))
+            records = [item for item in records if item["key"] in keys]
+        if kwargs.get("tag"):
+            records = [item for item in records if any(t["tag"] == kwargs["tag"] for t in item["data"]["tags"])]
+        if kwargs.get("itemType"):
+            records = [item for item in records if item["data"]["itemType"] == kwargs["itemType"]]
+        if kwargs.get("direction") == "asc":
+            records = records[::-1]
+        return self._page(records, kwargs.get("limit"), kwargs.get("start"))
+
+    def top(self, **kwargs: Any) -> list[dict[str, Any]]:
+        return self.items(**kwargs)
+
+    def item(self, key: str, **kwargs: Any) -> dict[str, Any]:
+        self._request()
+        if key not in self.items_by_key:
+            raise ResourceNotFoundError(f"https://api.zotero.org/items/{key}", "404", "Not found")
+        return self.items_by_key[key]
+
+    def item_versions(self, **kwargs: Any) -> dict[str, int]:
+        self._request()
+        since = int(kwargs.get("since") or 0)
+        return {key: item["version"] for key, item in self.items_by_key.items() if item["version"] > since}
+
+    def collections(self, **kwargs: Any) -> list[dict[str, Any]]:
+        self._request()
+        return self._page(self.library.collections, kwargs.get("limit"), kwargs.get("start"))
+
+    def all_collections(self, parent_id: str | None = None) -> list[dict[str, Any]]:
+        return list(self.library.collections)
+
+    def tags(self, **kwargs: Any) -> list[str]:
+        self._request()
+        names = [tag for tag in self.library.tags if tag not in self.deleted_tags]
+        return self._page(names, kwargs.get("limit"), kwargs.get("start"))
+
+    def deleted(self, **kwargs: Any) -> dict[str, list[str]]:
+        self._request()
+        return {"items": [], "collections": [], "searches": [], "tags": []}
+
+    def last_modified_version(self, **kwargs: Any) -> int:
+        self._request()
+        return self.version
+
+    # ── Writes ─────────────────────────────────────────────────────────
+
+    def update_items(self, payloads: list[dict[str, Any]]) -> bool:
+        self._request()
+        self.version += 1
+        for payload in payloads:
+            item = copy.deepcopy(self.items_by_key[payload["key"]])
+            item["data"].update({k: v for k, v in payload.items() if k not in ("key", "version")})
+            item["version"] = item["data"]["version"] = self.version
+            self.items_by_key[payload["key"]] = item
+        return True
+
+    def delete_item(self, payload: Any, last_modified: Any = None) -> bool:
+        self._request()
+        for entry in payload if isinstance(payload, list) else [payload]:
+            self.items_by_key.pop(entry["key"], None)
+        self.version += 1
+        return True
+
+    def delete_tags(self, *tag_names: str) -> bool:
+        self._request()
+        self.deleted_tags.update(tag_names)
+        self.version += 1
+        return True
+
+    def attachment_simple(self, files: list[str], parentid: str | None = None) -> dict[str, list]:
+        # Item creation, upload authorization and the upload itself are three requests per file
+        for _ in range(3 * len(files)):
+            self._request()
+        return {"success": [{"key": f"ATT{index:05d}", "filename": name} for index, name in enumerate(files)],
+                "failure": [], "unchanged": []}
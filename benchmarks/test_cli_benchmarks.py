@@ -0,0 +1,156 @@
+"""Throughput benchmarks for listing, rendering, duplicate checks and bulk writes."""
+import json
+import tracemalloc
+
+import pytest
+
+from pyzotero_cli.doi import find_existing_item_by_doi
+from pyzotero_cli.records import ItemRecord, compact
+from pyzotero_cli.utils import format_data_for_output
+from zotero_server import Library
+
+pytest.importorskip("pytest_benchmark")
+
+WRITE_KEYS = 50
+UPLOAD_FILES = 20
+
+
+def _most_used_tag(library):
+    counts = {}
+    for item in library.items:
+        for tag in item["data"]["tags"]:
+            counts[tag["tag"]] = counts.get(tag["tag"], 0) + 1
+    return max(counts, key=counts.get)
+
+
+def test_render_table(benchmark, library):
+    benchmark.extra_info["items"] = len(library.items)
+    output = benchmark(format_data_for_output, library.items, 'table', preset_key='item')
+    assert output.count("\n") >= len(library.items)
+
+
+def test_render_json(benchmark, library):
+    benchmark.extra_info["items"] = len(library.items)
+    benchmark(format_data_for_output, library.items, 'json')
+
+
+def _retained_bytes(build):
+    """What build() returns, and the bytes it still holds once built."""
+    tracemalloc.start()
+    try:
+        value = build()
+        return value, tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+def test_compact_records_memory(benchmark, library):
+    """Holding the library as ItemRecords instead of decoded item dicts."""
+    texts = [json.dumps(item) for item in library.items]  # decoded fresh, as from the item store
+    items, dict_bytes = _retained_bytes(lambda: [json.loads(text) for text in texts])
+    records, record_bytes = _retained_bytes(lambda: [ItemRecord.from_item(json.loads(text)) for text in texts])
+    benchmark.extra_info.update(items=len(items), dict_bytes=dict_bytes, record_bytes=record_bytes,
+                                reduction=round(dict_bytes / record_bytes, 1))
+    assert record_bytes * 4 < dict_bytes
+    benchmark(compact, items)
+    assert format_data_for_output(records, 'json') == format_data_for_output(items, 'json')
+
+
+def test_render_json_records(benchmark, library):
+    records = compact(library.items)
+    benchmark.extra_info["items"] = len(records)
+    benchmark(format_data_for_output, records, 'json')
+
+
+def test_items_list_table(benchmark, run_cli):
+    benchmark.extra_info["items"] = 100
+    result = benchmark(run_cli, 'items', 'list', '--limit', '100', '--output', 'table')
+    assert "Title" in result.output
+
+
+def test_doi_duplicate_scan(benchmark, fake_zot, library):
+    """A DOI that is not in the library scans the newest 1000 items page by page."""
+    benchmark.extra_info["items"] = min(len(library.items), 1000)
+    assert benchmark(find_existing_item_by_doi, fake_zot, "10.9999/not-in-library") is None
+
+
+def test_items_delete(benchmark, run_cli, fake_zot, library):
+    keys = [item["key"] for item in library.items[:WRITE_KEYS]]
+    benchmark.extra_info["items"] = len(keys)
+    benchmark.pedantic(run_cli, setup=lambda: (fake_zot.reset(), (('items', 'delete', '--force', *keys), {}))[1],
+                       rounds=10)
+
+
+def test_tags_delete(benchmark, run_cli, fake_zot, library):
+    benchmark.extra_info["items"] = len(library.tags)
+    benchmark.pedantic(run_cli, setup=lambda: (fake_zot.reset(), (('tags', 'delete', '--force', *library.tags), {}))[1],
+                       rounds=10)
+
+
+def test_tags_rename(benchmark, run_cli, fake_zot, library):
+    tag = _most_used_tag(library)
+    benchmark.extra_info["items"] = sum(1 for item in library.items if {"tag": tag} in item["data"]["tags"])
+    benchmark.pedantic(run_cli, setup=lambda: (fake_zot.reset(), (('tags', 'rename', tag, f"{tag}-renamed", '--force'), {}))[1],
+                       rounds=5)
+
+
+def test_files_upload(benchmark, run_cli, tmp_path):
+    paths = []
+    for index in range(UPLOAD_FILES):
+        path = tmp_path / f"paper-{index}.pdf"
+        path.write_bytes(b"%PDF-1.4\n" + bytes(1024))
+        paths.append(str(path))
+    benchmark.extra_info["items"] = len(paths)
+    result = benchmark(run_cli, 'files', 'upload', *paths)
+    assert result.output.count("Successfully uploaded") == len(paths)
+
+
+def test_item_store_full_sync(benchmark, run_cli, library):
+    benchmark.extra_info["items"] = len(library.items)
+    benchmark(run_cli, 'tags', 'stats', '--refresh', '--output', 'json')
+
+
+def test_query_indexed(benchmark, run_cli, library):
+    run_cli('tags', 'stats', '--output', 'json')  # sync the item store once
+    benchmark.extra_info["items"] = len(library.items)
+    tag = _most_used_tag(library)
+    result = benchmark(run_cli, 'query', f'year>=2000 and tag:"{tag}"', '--output', 'keys')
+    assert result.output.strip()
+
+
+# ── Over HTTP, against the stand-in Web API server ─────────────────────────
+
+def test_http_items_list(benchmark, run_cli_http):
+    benchmark.extra_info["items"] = 100
+    result = benchmark(run_cli_http, 'items', 'list', '--limit', '100', '--output', 'keys')
+    assert len(result.output.split()) == 100
+
+
+def test_http_item_store_full_sync(benchmark, run_cli_http, library):
+    benchmark.extra_info["items"] = len(library.items)
+    benchmark(run_cli_http, 'tags', 'stats', '--refresh', '--output', 'json')
+
+
+def test_http_tags_rename_conflict_storm(benchmark, run_cli_http, stand_in, library):
+    """Almost a third of the version-checked writes race a concurrent edit and come back 412."""
+    tag = _most_used_tag(library)
+    stand_in.conflict_rate = 0.3
+    benchmark.extra_info["items"] = sum(1 for item in library.items if {"tag": tag} in item["data"]["tags"])
+
+    def setup():
+        stand_in.load(Library.from_synthetic(library))
+        # The first write always races, so the 412 path runs even with a small library
+        stand_in.forced_conflicts = 1
+        return ('tags', 'rename', tag, f"{tag}-renamed", '--force'), {"check": False}
+
+    result = benchmark.pedantic(run_cli_http, setup=setup, rounds=5)
+    benchmark.extra_info["conflicts"] = stand_in.conflicts
+    assert stand_in.conflicts and "Updated" in result.output
+
+
+def test_replay_item_store_full_sync(benchmark, run_cli_http, library, tmp_path):
+    """The full sync replayed from a cassette: CLI and pyzotero overhead without network jitter."""
+    cassette_dir = str(tmp_path / "cassette")
+    run_cli_http('--record', cassette_dir, 'tags', 'stats', '--refresh', '--output', 'json')
+    benchmark.extra_info["items"] = len(library.items)
+    benchmark(run_cli_http, '--replay', cassette_dir, 'tags', 'stats', '--refresh', '--output', 'json')
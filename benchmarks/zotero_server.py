@@ -0,0 +1,952 @@
+"""A local stand-in for the subset of the Zotero Web API v3 that the CLI uses.
+
+Serves one or more in-memory libraries over HTTP so bulk workflows (full syncs of
+50k items, batched updates, tag deletes, uploads) can be load-tested without
+touching zotero.org. Implemented:
+
+* items (list, top, trash, children, single, collection items) with ``limit``/``start``
+  paging, ``Link`` and ``Total-Results`` headers, ``since``, ``itemKey``, ``tag``,
+  ``itemType``, ``q``, ``sort``/``direction`` and ``format=json|versions|keys``
+* collections, tags, saved searches, ``deleted``, full-text content and versions
+* writes with Zotero's concurrency rules: multi-object POST (PATCH semantics, per-object
+  412s in ``failed``), PATCH/PUT/DELETE with ``If-Unmodified-Since-Version``, tag deletes
+* the three-step file upload (authorization, storage POST, registration) and downloads
+* ``If-Modified-Since-Version`` (304), item templates and field metadata, key info, groups
+
+Load shaping: ``latency`` (seconds added to every request), ``backoff_every``
+(send ``Backoff`` on every Nth response), ``rate_limit_every`` (answer every Nth request
+with 429 and ``Retry-After``) and ``conflict_rate`` (probability that a conditional write
+first sees a concurrent modification, producing a 412 storm). ``forced_conflicts`` makes
+the next N conditional writes conflict regardless of the rate.
+
+Run it standalone::
+
+    python benchmarks/zotero_server.py --items 50000 --port 8085 --latency 0.02
+"""
+import copy
+import hashlib
+import json
+import random
+import re
+import secrets
+import threading
+import time
+from dataclasses import dataclass, field
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+MAX_PAGE_SIZE = 100
+DEFAULT_PAGE_SIZE = 25
+MAX_WRITE_OBJECTS = 50
+KEY_ALPHABET = "23456789ABCDEFGHIJKLMNPQRSTUVWXYZ"
+DATE_SORTS = {"dateAdded", "dateModified", "date"}
+
+ITEM_FIELDS = (
+    "title", "abstractNote", "publicationTitle", "volume", "issue", "pages", "date", "series", "seriesTitle",
+    "seriesText", "journalAbbreviation", "language", "DOI", "ISSN", "ISBN", "shortTitle", "url", "accessDate",
+    "archive", "archiveLocation", "libraryCatalog", "callNumber", "rights", "extra", "publisher", "place",
+    "edition", "numPages", "numberOfVolumes", "bookTitle", "proceedingsTitle", "conferenceName", "institution",
+    "reportNumber", "reportType", "university", "thesisType", "repository", "archiveID", "websiteTitle",
+    "websiteType", "blogTitle", "forumTitle", "postType", "caseName", "court", "nameOfAct", "subject",
+    "identifier", "type", "medium", "format",
+)
+ITEM_TYPES = (
+    "artwork", "book", "bookSection", "case", "conferencePaper", "dataset", "document", "email",
+    "journalArticle", "letter", "magazineArticle", "manuscript", "newspaperArticle", "preprint", "report",
+    "software", "statute", "thesis", "webpage", "attachment", "note", "annotation",
+)
+CREATOR_TYPES = ("author", "editor", "contributor", "translator", "seriesEditor", "bookAuthor")
+
+
+def _now() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+
+@dataclass
+class Library:
+    """One user or group library. Objects are stored as ``{"key", "version", "data"}``."""
+
+    library_type: str  # "user" | "group"
+    library_id: int
+    name: str = "Stand-in library"
+    version: int = 0
+    items: dict[str, dict[str, Any]] = field(default_factory=dict)
+    collections: dict[str, dict[str, Any]] = field(default_factory=dict)
+    searches: dict[str, dict[str, Any]] = field(default_factory=dict)
+    fulltext: dict[str, dict[str, Any]] = field(default_factory=dict)
+    files: dict[str, dict[str, Any]] = field(default_factory=dict)
+    # Deleted object keys with the library version they were deleted at
+    deleted: dict[str, dict[str, int]] = field(
+        default_factory=lambda: {"items": {}, "collections": {}, "searches": {}, "tags": {}})
+
+    @property
+    def prefix(self) -> str:
+        return f"/{self.library_type}s/{self.library_id}"
+
+    def bump(self) -> int:
+        self.version += 1
+        return self.version
+
+    @classmethod
+    def from_synthetic(cls, synthetic: Any) -> "Library":
+        """Build a library from benchmarks.synthetic.generate_library() output."""
+        library = cls(synthetic.library_type, int(synthetic.library_id), version=synthetic.version)
+        for item in synthetic.items:
+            library.items[item["key"]] = {"key": item["key"], "version": item["version"],
+                                          "data": copy.deepcopy(item["data"])}
+        for collection in synthetic.collections:
+            library.collections[collection["key"]] = {"key": collection["key"], "version": collection["version"],
+                                                      "data": copy.deepcopy(collection["data"])}
+        return library
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str = "", headers: dict[str, str] | None = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops SYNs when a concurrent client opens its pool at once
+    request_queue_size = 128
+
+
+class StandInServer:
+    """Threaded HTTP server holding the libraries; use as a context manager or call start()/stop()."""
+
+    def __init__(self, libraries: list[Library] | None = None, host: str = "127.0.0.1", port: int = 0,
+                 latency: float = 0.0, backoff_every: int = 0, backoff_seconds: float = 1.0,
+                 rate_limit_every: int = 0, retry_after: float = 1.0, conflict_rate: float = 0.0,
+                 api_key: str | None = None, user_id: int = 12345, seed: int = 0):
+        self.libraries = {(lib.library_type, lib.library_id): lib for lib in (libraries or [Library("user", user_id)])}
+        self.latency = latency
+        self.backoff_every = backoff_every
+        self.backoff_seconds = backoff_seconds
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.conflict_rate = conflict_rate
+        self.api_key = api_key
+        self.user_id = user_id
+        self.requests = 0
+        self.status_counts: dict[int, int] = {}
+        self.conflicts = 0  # simulated concurrent edits (see conflict_rate)
+        self.forced_conflicts = 0
+        self.lock = threading.RLock()
+        self._rng = random.Random(seed)
+        self._uploads: dict[str, dict[str, Any]] = {}
+        self._httpd = _HTTPServer((host, port), _make_handler(self))
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StandInServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def load(self, library: Library) -> None:
+        """Add a library, or replace the one with the same type and ID."""
+        with self.lock:
+            self.libraries[(library.library_type, library.library_id)] = library
+
+    def library(self, library_type: str, library_id: int) -> Library:
+        library = self.libraries.get((library_type, library_id))
+        if library is None:
+            raise HTTPError(404, "Library not found")
+        return library
+
+    def new_key(self) -> str:
+        return "".join(self._rng.choice(KEY_ALPHABET) for _ in range(8))
+
+    def concurrent_edit(self, library: Library, keys: list[str] = ()) -> bool:
+        """With probability ``conflict_rate`` (or while ``forced_conflicts`` lasts), modify the
+        library (and ``keys``) as another client would."""
+        if self.forced_conflicts:
+            self.forced_conflicts -= 1
+        elif not self.conflict_rate or self._rng.random() >= self.conflict_rate:
+            return False
+        self.conflicts += 1
+        version = library.bump()
+        for key in keys:
+            if key in library.items:
+                library.items[key]["version"] = version
+                library.items[key]["data"]["version"] = version
+        return True
+
+
+# ── Representation ─────────────────────────────────────────────────────────
+
+def _library_json(library: Library) -> dict[str, Any]:
+    return {"type": library.library_type, "id": library.library_id, "name": library.name,
+            "links": {"alternate": {"href": f"https://www.zotero.org{library.prefix}", "type": "text/html"}}}
+
+
+def _item_json(base_url: str, library: Library, obj: dict[str, Any]) -> dict[str, Any]:
+    data = obj["data"]
+    creators = data.get("creators") or []
+    names = [c.get("lastName") or c.get("name") or "" for c in creators]
+    summary = names[0] if len(names) == 1 else f"{names[0]} and {names[1]}" if len(names) == 2 else \
+        f"{names[0]} et al." if names else ""
+    meta: dict[str, Any] = {"numChildren": sum(1 for o in library.items.values()
+                                               if o["data"].get("parentItem") == obj["key"])}
+    if summary:
+        meta["creatorSummary"] = summary
+    match = re.match(r"\d{4}(-\d{2}(-\d{2})?)?", str(data.get("date") or ""))
+    if match:
+        meta["parsedDate"] = match.group(0)
+    links: dict[str, Any] = {"self": {"href": f"{base_url}{library.prefix}/items/{obj['key']}",
+                                      "type": "application/json"}}
+    if obj["key"] in library.files:
+        links["enclosure"] = {"href": f"{base_url}{library.prefix}/items/{obj['key']}/file/view",
+                              "type": data.get("contentType") or "application/octet-stream"}
+    return {"key": obj["key"], "version": obj["version"], "library": _library_json(library),
+            "links": links, "meta": meta, "data": data}
+
+
+def _collection_json(base_url: str, library: Library, obj: dict[str, Any]) -> dict[str, Any]:
+    key = obj["key"]
+    return {
+        "key": key, "version": obj["version"], "library": _library_json(library),
+        "links": {"self": {"href": f"{base_url}{library.prefix}/collections/{key}", "type": "application/json"}},
+        "meta": {
+            "numCollections": sum(1 for c in library.collections.values() if c["data"].get("parentCollection") == key),
+            "numItems": sum(1 for i in library.items.values() if key in i["data"].get("collections", [])),
+        },
+        "data": obj["data"],
+    }
+
+
+def _search_json(library: Library, obj: dict[str, Any]) -> dict[str, Any]:
+    return {"key": obj["key"], "version": obj["version"], "library": _library_json(library), "data": obj["data"]}
+
+
+# ── Filtering, sorting and paging ─────────────────────────────────────────
+
+def _first(params: dict[str, list[str]], name: str, default: str | None = None) -> str | None:
+    values = params.get(name)
+    return values[0] if values else default
+
+
+def _tag_filter(item_tags: set[str], expression: str) -> bool:
+    """One ``tag`` parameter: 'a || b' is OR, a leading '-' negates."""
+    alternatives = [t.strip() for t in expression.split("||")]
+    for alternative in alternatives:
+        if alternative.startswith("-"):
+            if alternative[1:] not in item_tags:
+                return True
+        elif alternative in item_tags:
+            return True
+    return False
+
+
+def _type_filter(item_type: str, expression: str) -> bool:
+    alternatives = [t.strip() for t in expression.split("||")]
+    negated = [a[1:] for a in alternatives if a.startswith("-")]
+    if negated:
+        return item_type not in negated
+    return item_type in alternatives
+
+
+def _quick_search(data: dict[str, Any], needle: str, everything: bool) -> bool:
+    needle = needle.lower()
+    fields = [str(data.get("title", "")), str(data.get("date", ""))]
+    fields += [f"{c.get('firstName', '')} {c.get('lastName', '')} {c.get('name', '')}" for c in data.get("creators", [])]
+    if everything:
+        fields += [str(v) for v in data.values() if isinstance(v, str)]
+    return any(needle in f.lower() for f in fields)
+
+
+def _filter_items(objects: list[dict[str, Any]], params: dict[str, list[str]]) -> list[dict[str, Any]]:
+    if _first(params, "itemKey"):
+        keys = set(_first(params, "itemKey").split(","))
+        objects = [o for o in objects if o["key"] in keys]
+    if _first(params, "since"):
+        since = int(_first(params, "since"))
+        objects = [o for o in objects if o["version"] > since]
+    for expression in params.get("tag", []):
+        objects = [o for o in objects if _tag_filter({t["tag"] for t in o["data"].get("tags", [])}, expression)]
+    if _first(params, "itemType"):
+        objects = [o for o in objects if _type_filter(o["data"].get("itemType", ""), _first(params, "itemType"))]
+    if _first(params, "q"):
+        everything = _first(params, "qmode") == "everything"
+        objects = [o for o in objects if _quick_search(o["data"], _first(params, "q"), everything)]
+    return objects
+
+
+def _sort(objects: list[dict[str, Any]], params: dict[str, list[str]], default: str) -> list[dict[str, Any]]:
+    sort = _first(params, "sort", default)
+    direction = _first(params, "direction", "desc" if sort in DATE_SORTS else "asc")
+
+    def sort_key(obj: dict[str, Any]) -> str:
+        data = obj["data"]
+        if sort == "creator":
+            creators = data.get("creators") or [{}]
+            return str(creators[0].get("lastName") or creators[0].get("name") or "").lower()
+        return str(data.get(sort) or "").lower()
+
+    return sorted(objects, key=sort_key, reverse=direction == "desc")
+
+
+def _page(records: list[Any], params: dict[str, list[str]], unlimited: bool = False) -> tuple[list[Any], int, int]:
+    start = int(_first(params, "start", "0"))
+    if unlimited and "limit" not in params:
+        return records[start:], start, len(records)
+    limit = min(int(_first(params, "limit", str(DEFAULT_PAGE_SIZE))), MAX_PAGE_SIZE)
+    return records[start:start + limit], start, limit
+
+
+def _link_header(url: str, params: dict[str, list[str]], start: int, limit: int, total: int) -> str:
+    parts = urlsplit(url)
+
+    def link(offset: int) -> str:
+        query = {k: v[0] for k, v in params.items()}
+        query.update(start=str(offset), limit=str(limit))
+        return f"{parts.scheme}://{parts.netloc}{parts.path}?{urlencode(query)}"
+
+    links = [f'<{link(0)}>; rel="first"']
+    if start + limit < total:
+        links.append(f'<{link(start + limit)}>; rel="next"')
+    if total:
+        links.append(f'<{link(((total - 1) // limit) * limit)}>; rel="last"')
+    return ", ".join(links)
+
+
+# ── Request handling ──────────────────────────────────────────────────────
+
+def _make_handler(server: StandInServer) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out as separate writes; without this, Nagle and delayed ACKs
+        # add ~40ms to every keep-alive response
+        disable_nagle_algorithm = True
+
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - stdlib signature
+            pass
+
+        def do_GET(self) -> None:
+            self._dispatch("GET")
+
+        def do_POST(self) -> None:
+            self._dispatch("POST")
+
+        def do_PUT(self) -> None:
+            self._dispatch("PUT")
+
+        def do_PATCH(self) -> None:
+            self._dispatch("PATCH")
+
+        def do_DELETE(self) -> None:
+            self._dispatch("DELETE")
+
+        # Plumbing ---------------------------------------------------------
+
+        def _dispatch(self, method: str) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            self.body = self.rfile.read(length) if length else b""
+            parts = urlsplit(self.path)
+            self.params = parse_qs(parts.query, keep_blank_values=True)
+            self.base_url = f"http://{self.headers.get('Host') or server.url.split('//', 1)[1]}"
+            self.extra_headers: dict[str, str] = {}
+            if server.latency:
+                time.sleep(server.latency)
+            with server.lock:
+                server.requests += 1
+                count = server.requests
+            try:
+                if server.rate_limit_every and count % server.rate_limit_every == 0:
+                    raise HTTPError(429, "Too many requests", {"Retry-After": str(server.retry_after)})
+                if server.api_key and not parts.path.startswith("/upload/"):
+                    supplied = self.headers.get("Zotero-API-Key") or \
+                        (self.headers.get("Authorization") or "").removeprefix("Bearer ")
+                    if supplied != server.api_key:
+                        raise HTTPError(403, "Invalid key")
+                with server.lock:
+                    status, payload = self._route(method, parts.path)
+            except HTTPError as exc:
+                status, payload = exc.status, exc.message
+                self.extra_headers.update(exc.headers)
+            if server.backoff_every and count % server.backoff_every == 0:
+                self.extra_headers["Backoff"] = str(server.backoff_seconds)
+            self._send(status, payload)
+
+        def _send(self, status: int, payload: Any) -> None:
+            with server.lock:
+                server.status_counts[status] = server.status_counts.get(status, 0) + 1
+            if isinstance(payload, (bytes, bytearray)):
+                body = bytes(payload)
+                content_type = self.extra_headers.pop("Content-Type", "application/octet-stream")
+            elif isinstance(payload, str):
+                body = payload.encode("utf-8")
+                content_type = self.extra_headers.pop("Content-Type", "text/plain; charset=utf-8")
+            elif payload is None:
+                body, content_type = b"", None
+            else:
+                body = json.dumps(payload).encode("utf-8")
+                content_type = "application/json"
+            self.send_response(status)
+            if content_type and status not in (204, 304):
+                self.send_header("Content-Type", content_type)
+            for name, value in self.extra_headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", "0" if status in (204, 304) else str(len(body)))
+            self.end_headers()
+            if status not in (204, 304):
+                self.wfile.write(body)
+
+        def _json_body(self) -> Any:
+            try:
+                return json.loads(self.body or b"null")
+            except ValueError:
+                raise HTTPError(400, "Invalid JSON") from None
+
+        def _form_body(self) -> dict[str, str]:
+            return {k: v[0] for k, v in parse_qs(self.body.decode("utf-8"), keep_blank_values=True).items()}
+
+        def _version_header(self, name: str) -> int | None:
+            value = self.headers.get(name)
+            return int(value) if value and value.isdigit() else None
+
+        def _check_library_precondition(self, library: Library) -> None:
+            expected = self._version_header("If-Unmodified-Since-Version")
+            if expected is None:
+                return
+            server.concurrent_edit(library)
+            if library.version > expected:
+                raise HTTPError(412, f"Library has been modified since specified version "
+                                     f"(expected {expected}, found {library.version})")
+
+        def _listing(self, library: Library, objects: list[Any], render: Any, default_sort: str,
+                     versions_only: bool = False) -> tuple[int, Any]:
+            """Common GET handling for object lists: 304, format=versions/keys, paging headers."""
+            since = self._version_header("If-Modified-Since-Version")
+            self.extra_headers["Last-Modified-Version"] = str(library.version)
+            if since is not None and library.version <= since:
+                return 304, None
+            fmt = _first(self.params, "format", "json")
+            objects = _sort(objects, self.params, default_sort)
+            if fmt == "versions" or versions_only:
+                page, _, _ = _page(objects, self.params, unlimited=True)
+                return 200, {o["key"]: o["version"] for o in page}
+            if fmt == "keys":
+                page, _, _ = _page(objects, self.params, unlimited=True)
+                return 200, "\n".join(o["key"] for o in page) + "\n"
+            page, start, limit = _page(objects, self.params)
+            self.extra_headers["Total-Results"] = str(len(objects))
+            self.extra_headers["Link"] = _link_header(self.base_url + self.path, self.params, start, limit, len(objects))
+            return 200, [render(o) for o in page]
+
+        # Routing ----------------------------------------------------------
+
+        def _route(self, method: str, path: str) -> tuple[int, Any]:
+            path = path.rstrip("/") or "/"
+            if path == "/" and method == "GET":
+                return 200, ""
+            match = re.fullmatch(r"/(users|groups)/(\d+)(/.*)?", path)
+            if match:
+                library_type = "user" if match.group(1) == "users" else "group"
+                if match.group(3) == "/groups" and library_type == "user":
+                    return self._groups(int(match.group(2)))
+                library = server.library(library_type, int(match.group(2)))
+                return self._library_route(method, library, (match.group(3) or "").strip("/").split("/"))
+            upload = re.fullmatch(r"/upload/(\w+)", path)
+            if upload and method == "POST":
+                return self._receive_upload(upload.group(1))
+            key_match = re.fullmatch(r"/keys/([^/]+)", path)
+            if key_match and method == "GET":
+                return self._key_info(key_match.group(1))
+            if method == "GET":
+                return self._schema(path)
+            raise HTTPError(404, "Not found")
+
+        def _library_route(self, method: str, library: Library, segments: list[str]) -> tuple[int, Any]:
+            head, rest = segments[0], segments[1:]
+            if head == "items":
+                return self._items_route(method, library, rest)
+            if head == "collections":
+                return self._collections_route(method, library, rest)
+            if head == "tags" and not rest:
+                if method == "DELETE":
+                    return self._delete_tags(library)
+                return self._tags(library, [o for o in library.items.values() if not o["data"].get("deleted")])
+            if head == "searches":
+                return self._searches_route(method, library, rest)
+            if head == "deleted" and method == "GET":
+                return self._deleted(library)
+            if head == "fulltext" and method == "GET":
+                since = int(_first(self.params, "since", "0"))
+                self.extra_headers["Last-Modified-Version"] = str(library.version)
+                return 200, {k: v["version"] for k, v in library.fulltext.items() if v["version"] > since}
+            if head == "publications" and rest == ["items"] and method == "GET":
+                objects = [o for o in library.items.values() if o["data"].get("inPublications")]
+                return self._listing(library, objects, lambda o: _item_json(self.base_url, library, o), "dateModified")
+            raise HTTPError(404, "Not found")
+
+        # Items ------------------------------------------------------------
+
+        def _items_route(self, method: str, library: Library, rest: list[str]) -> tuple[int, Any]:
+            def render(o):
+                return _item_json(self.base_url, library, o)
+
+            live = [o for o in library.items.values() if not o["data"].get("deleted")]
+            if not rest:
+                if method == "GET":
+                    objects = list(library.items.values()) if _first(self.params, "includeTrashed") == "1" else live
+                    return self._listing(library, _filter_items(objects, self.params), render, "dateModified")
+                if method == "POST":
+                    return self._write_objects(library, "items", self._json_body())
+                if method == "DELETE":
+                    return self._delete_many(library, "items", (_first(self.params, "itemKey") or "").split(","))
+            if rest == ["top"] and method == "GET":
+                objects = [o for o in live if not o["data"].get("parentItem")]
+                return self._listing(library, _filter_items(objects, self.params), render, "dateModified")
+            if rest == ["trash"] and method == "GET":
+                objects = [o for o in library.items.values() if o["data"].get("deleted")]
+                return self._listing(library, _filter_items(objects, self.params), render, "dateModified")
+            key = rest[0]
+            if len(rest) == 1:
+                if method == "GET":
+                    obj = self._get_object(library.items, key)
+                    self.extra_headers["Last-Modified-Version"] = str(obj["version"])
+                    return 200, render(obj)
+                if method in ("PATCH", "PUT"):
+                    return self._update_one(library, "items", key, self._json_body(), replace=method == "PUT")
+                if method == "DELETE":
+                    return self._delete_one(library, "items", key)
+            if rest[1:] == ["children"] and method == "GET":
+                self._get_object(library.items, key)
+                objects = [o for o in live if o["data"].get("parentItem") == key]
+                return self._listing(library, _filter_items(objects, self.params), render, "dateModified")
+            if rest[1:] == ["tags"] and method == "GET":
+                return self._tags(library, [self._get_object(library.items, key)])
+            if rest[1:] == ["fulltext"]:
+                return self._fulltext(method, library, key)
+            if rest[1] == "file":
+                if method == "POST":
+                    return self._file_authorization(library, key)
+                if method == "GET":
+                    stored = library.files.get(key)
+                    if stored is None:
+                        raise HTTPError(404, "File not found")
+                    self.extra_headers["Content-Type"] = stored["contentType"]
+                    return 200, stored["content"]
+            raise HTTPError(404, "Not found")
+
+        def _get_object(self, store: dict[str, dict[str, Any]], key: str) -> dict[str, Any]:
+            obj = store.get(key)
+            if obj is None:
+                raise HTTPError(404, "Not found")
+            return obj
+
+        # Writes -----------------------------------------------------------
+
+        def _write_objects(self, library: Library, kind: str, payload: Any) -> tuple[int, Any]:
+            """Multi-object POST: create new objects, PATCH existing ones, report per-object results."""
+            if not isinstance(payload, list):
+                raise HTTPError(400, "Uploaded data must be a JSON array")
+            if len(payload) > MAX_WRITE_OBJECTS:
+                raise HTTPError(413, f"Only {MAX_WRITE_OBJECTS} objects can be written per request")
+            self._check_library_precondition(library)
+            store = getattr(library, kind)
+            keys = [o.get("key") for o in payload if isinstance(o, dict) and o.get("key") in store]
+            server.concurrent_edit(library, keys)
+            result: dict[str, dict] = {"successful": {}, "success": {}, "unchanged": {}, "failed": {}}
+            new_version = library.version + 1
+            changed = False
+            for index, obj in enumerate(payload):
+                index = str(index)
+                if not isinstance(obj, dict):
+                    result["failed"][index] = {"code": 400, "message": "Object must be a JSON object"}
+                    continue
+                key = obj.get("key")
+                fields = {k: v for k, v in obj.items() if k not in ("key", "version")}
+                existing = store.get(key) if key else None
+                if existing is not None:
+                    expected = obj.get("version")
+                    if expected is not None and int(expected) != existing["version"]:
+                        result["failed"][index] = {
+                            "key": key, "code": 412,
+                            "message": f"{kind[:-1].capitalize()} has been modified since specified version "
+                                       f"(expected {expected}, found {existing['version']})"}
+                        continue
+                    merged = {**existing["data"], **fields}
+                    if merged == existing["data"]:
+                        result["unchanged"][index] = key
+                        continue
+                    merged["version"] = new_version
+                    if kind == "items":
+                        merged["dateModified"] = _now()
+                    existing.update(version=new_version, data=merged)
+                    obj_out = existing
+                else:
+                    if kind == "collections" and "name" not in fields:
+                        result["failed"][index] = {"key": key, "code": 400, "message": "Collection name missing"}
+                        continue
+                    if kind == "items" and "itemType" not in fields:
+                        result["failed"][index] = {"key": key, "code": 400, "message": "'itemType' property not provided"}
+                        continue
+                    key = key or server.new_key()
+                    data = {"key": key, "version": new_version, **fields}
+                    if kind == "items":
+                        data.setdefault("tags", [])
+                        data.setdefault("collections", [])
+                        data.setdefault("relations", {})
+                        data.setdefault("dateAdded", _now())
+                        data.setdefault("dateModified", data["dateAdded"])
+                    obj_out = store[key] = {"key": key, "version": new_version, "data": data}
+                    library.deleted[kind].pop(key, None)
+                changed = True
+                result["success"][index] = key
+                result["successful"][index] = (_item_json(self.base_url, library, obj_out) if kind == "items"
+                                               else _collection_json(self.base_url, library, obj_out)
+                                               if kind == "collections" else _search_json(library, obj_out))
+            if changed:
+                library.version = new_version
+            self.extra_headers["Last-Modified-Version"] = str(library.version)
+            return 200, result
+
+        def _update_one(self, library: Library, kind: str, key: str, payload: Any, replace: bool) -> tuple[int, Any]:
+            store = getattr(library, kind)
+            existing = self._get_object(store, key)
+            expected = self._version_header("If-Unmodified-Since-Version")
+            if expected is None and isinstance(payload, dict):
+                expected = payload.get("version")
+            if expected is None:
+                raise HTTPError(428, "If-Unmodified-Since-Version not provided")
+            server.concurrent_edit(library, [key])
+            if int(expected) != existing["version"]:
+                raise HTTPError(412, f"{kind[:-1].capitalize()} has been modified since specified version "
+                                     f"(expected {expected}, found {existing['version']})")
+            if not isinstance(payload, dict):
+                raise HTTPError(400, "Uploaded data must be a JSON object")
+            fields = {k: v for k, v in payload.items() if k not in ("key", "version")}
+            data = {"key": key, **fields} if replace else {**existing["data"], **fields}
+            version = library.bump()
+            data["version"] = version
+            if kind == "items":
+                data["dateModified"] = _now()
+            existing.update(version=version, data=data)
+            self.extra_headers["Last-Modified-Version"] = str(version)
+            return 204, None
+
+        def _delete_one(self, library: Library, kind: str, key: str) -> tuple[int, Any]:
+            store = getattr(library, kind)
+            existing = self._get_object(store, key)
+            expected = self._version_header("If-Unmodified-Since-Version")
+            if expected is None:
+                raise HTTPError(428, "If-Unmodified-Since-Version not provided")
+            server.concurrent_edit(library, [key])
+            if expected != existing["version"] and expected < library.version:
+                raise HTTPError(412, f"{kind[:-1].capitalize()} has been modified since specified version "
+                                     f"(expected {expected}, found {existing['version']})")
+            version = library.bump()
+            del store[key]
+            library.deleted[kind][key] = version
+            if kind == "items":
+                library.fulltext.pop(key, None)
+                library.files.pop(key, None)
+            self.extra_headers["Last-Modified-Version"] = str(version)
+            return 204, None
+
+        def _delete_many(self, library: Library, kind: str, keys: list[str]) -> tuple[int, Any]:
+            keys = [k for k in keys if k]
+            if not keys:
+                raise HTTPError(400, "No keys provided")
+            if len(keys) > MAX_WRITE_OBJECTS:
+                raise HTTPError(413, f"Only {MAX_WRITE_OBJECTS} objects can be deleted per request")
+            if self._version_header("If-Unmodified-Since-Version") is None:
+                raise HTTPError(428, "If-Unmodified-Since-Version not provided")
+            self._check_library_precondition(library)
+            store = getattr(library, kind)
+            version = library.bump()
+            for key in keys:
+                if store.pop(key, None) is not None:
+                    library.deleted[kind][key] = version
+            self.extra_headers["Last-Modified-Version"] = str(version)
+            return 204, None
+
+        # Collections and searches -------------------------------------------
+
+        def _collections_route(self, method: str, library: Library, rest: list[str]) -> tuple[int, Any]:
+            def render(o):
+                return _collection_json(self.base_url, library, o)
+
+            def render_item(o):
+                return _item_json(self.base_url, library, o)
+
+            if not rest:
+                if method == "GET":
+                    objects = list(library.collections.values())
+                    if _first(self.params, "since"):
+                        objects = [o for o in objects if o["version"] > int(_first(self.params, "since"))]
+                    return self._listing(library, objects, render, "title")
+                if method == "POST":
+                    return self._write_objects(library, "collections", self._json_body())
+                if method == "DELETE":
+                    return self._delete_many(library, "collections",
+                                             (_first(self.params, "collectionKey") or "").split(","))
+            if rest == ["top"] and method == "GET":
+                objects = [o for o in library.collections.values() if not o["data"].get("parentCollection")]
+                return self._listing(library, objects, render, "title")
+            key = rest[0]
+            if len(rest) == 1:
+                if method == "GET":
+                    return 200, render(self._get_object(library.collections, key))
+                if method in ("PUT", "PATCH"):
+                    return self._update_one(library, "collections", key, self._json_body(), replace=method == "PUT")
+                if method == "DELETE":
+                    return self._delete_one(library, "collections", key)
+            self._get_object(library.collections, key)
+            members = [o for o in library.items.values()
+                       if key in o["data"].get("collections", []) and not o["data"].get("deleted")]
+            if rest[1:] == ["collections"] and method == "GET":
+                objects = [o for o in library.collections.values() if o["data"].get("parentCollection") == key]
+                return self._listing(library, objects, render, "title")
+            if rest[1:] == ["items"] and method == "GET":
+                return self._listing(library, _filter_items(members, self.params), render_item, "dateModified")
+            if rest[1:] == ["items", "top"] and method == "GET":
+                objects = [o for o in members if not o["data"].get("parentItem")]
+                return self._listing(library, _filter_items(objects, self.params), render_item, "dateModified")
+            if rest[1:] == ["tags"] and method == "GET":
+                return self._tags(library, members)
+            raise HTTPError(404, "Not found")
+
+        def _searches_route(self, method: str, library: Library, rest: list[str]) -> tuple[int, Any]:
+            if not rest and method == "GET":
+                self.extra_headers["Last-Modified-Version"] = str(library.version)
+                return 200, [_search_json(library, o) for o in library.searches.values()]
+            if not rest and method == "POST":
+                return self._write_objects(library, "searches", self._json_body())
+            if not rest and method == "DELETE":
+                return self._delete_many(library, "searches", (_first(self.params, "searchKey") or "").split(","))
+            if len(rest) == 1 and method == "GET":
+                return 200, _search_json(library, self._get_object(library.searches, rest[0]))
+            raise HTTPError(404, "Not found")
+
+        # Tags ---------------------------------------------------------------
+
+        def _tags(self, library: Library, objects: list[dict[str, Any]]) -> tuple[int, Any]:
+            counts: dict[tuple[str, int], int] = {}
+            for obj in objects:
+                for tag in obj["data"].get("tags", []):
+                    name_type = (tag["tag"], int(tag.get("type", 0)))
+                    counts[name_type] = counts.get(name_type, 0) + 1
+            records = [{"key": name, "version": library.version, "data": {"tag": name, "type": tag_type},
+                        "numItems": n} for (name, tag_type), n in counts.items()]
+            for record in records:
+                record["data"]["title"] = record["key"].lower()
+
+            def render(record):
+                return {"tag": record["key"],
+                        "links": {"self": {"href": f"{self.base_url}{library.prefix}/tags/{record['key']}",
+                                           "type": "application/json"}},
+                        "meta": {"type": record["data"]["type"], "numItems": record["numItems"]}}
+
+            return self._listing(library, records, render, "title")
+
+        def _delete_tags(self, library: Library) -> tuple[int, Any]:
+            names = {t.strip() for expression in self.params.get("tag", []) for t in expression.split("||")}
+            names.discard("")
+            if not names:
+                raise HTTPError(400, "No tags provided")
+            if len(names) > MAX_WRITE_OBJECTS:
+                raise HTTPError(413, f"Only {MAX_WRITE_OBJECTS} tags can be deleted per request")
+            if self._version_header("If-Unmodified-Since-Version") is None:
+                raise HTTPError(428, "If-Unmodified-Since-Version not provided")
+            self._check_library_precondition(library)
+            version = library.bump()
+            for obj in library.items.values():
+                tags = obj["data"].get("tags", [])
+                kept = [t for t in tags if t["tag"] not in names]
+                if len(kept) != len(tags):
+                    obj["data"]["tags"] = kept
+                    obj["version"] = obj["data"]["version"] = version
+            for name in names:
+                library.deleted["tags"][name] = version
+            self.extra_headers["Last-Modified-Version"] = str(version)
+            return 204, None
+
+        def _deleted(self, library: Library) -> tuple[int, Any]:
+            since = _first(self.params, "since")
+            if since is None:
+                raise HTTPError(400, "'since' parameter must be provided")
+            self.extra_headers["Last-Modified-Version"] = str(library.version)
+            result = {kind: [k for k, v in keys.items() if v > int(since)] for kind, keys in library.deleted.items()}
+            result["settings"] = []
+            return 200, result
+
+        # Full text and files ------------------------------------------------
+
+        def _fulltext(self, method: str, library: Library, key: str) -> tuple[int, Any]:
+            self._get_object(library.items, key)
+            if method == "GET":
+                entry = library.fulltext.get(key)
+                if entry is None:
+                    raise HTTPError(404, "Not found")
+                self.extra_headers["Last-Modified-Version"] = str(entry["version"])
+                return 200, entry["data"]
+            if method == "PUT":
+                payload = self._json_body()
+                if not isinstance(payload, dict) or "content" not in payload:
+                    raise HTTPError(400, "'content' not provided")
+                library.fulltext[key] = {"version": library.bump(), "data": payload}
+                self.extra_headers["Last-Modified-Version"] = str(library.version)
+                return 204, None
+            raise HTTPError(405, "Method not allowed")
+
+        def _file_authorization(self, library: Library, key: str) -> tuple[int, Any]:
+            item = self._get_object(library.items, key)
+            form = self._form_body()
+            if "upload" in form:
+                pending = server._uploads.pop(form["upload"], None)
+                if pending is None or pending["item"] != key or "content" not in pending:
+                    raise HTTPError(400, "Upload key not found or file not uploaded")
+                library.files[key] = {"content": pending["content"], "contentType": pending["contentType"]}
+                version = library.bump()
+                item["data"].update(md5=pending["md5"], filename=pending["filename"], mtime=pending["mtime"],
+                                    version=version)
+                item["version"] = version
+                self.extra_headers["Last-Modified-Version"] = str(version)
+                return 204, None
+            current = item["data"].get("md5")
+            if_match = self.headers.get("If-Match")
+            if self.headers.get("If-None-Match") == "*" and current and key in library.files:
+                raise HTTPError(412, "If-None-Match: * set but file exists")
+            if if_match and if_match != current:
+                raise HTTPError(412, "ETag does not match current version of file")
+            if current and current == form.get("md5") and key in library.files:
+                return 200, {"exists": 1}
+            upload_key = secrets.token_hex(16)
+            server._uploads[upload_key] = {
+                "item": key, "md5": form.get("md5"), "filename": form.get("filename"),
+                "mtime": int(form.get("mtime") or 0), "contentType": form.get("contentType") or "application/octet-stream",
+                "size": int(form.get("filesize") or 0),
+            }
+            response = {"url": f"{self.base_url}/upload/{upload_key}", "uploadKey": upload_key,
+                        "contentType": "multipart/form-data", "prefix": "", "suffix": ""}
+            if form.get("params") == "1":
+                response["params"] = {"key": upload_key, "acl": "private", "Content-Type": response["contentType"]}
+            return 200, response
+
+        def _receive_upload(self, upload_key: str) -> tuple[int, Any]:
+            pending = server._uploads.get(upload_key)
+            if pending is None:
+                raise HTTPError(404, "Unknown upload")
+            content_type = self.headers.get("Content-Type", "")
+            content = self.body
+            if content_type.startswith("multipart/form-data"):
+                message = BytesParser(policy=HTTP).parsebytes(
+                    f"Content-Type: {content_type}\r\n\r\n".encode("latin-1") + self.body)
+                for part in message.iter_parts():
+                    if part.get_param("name", header="content-disposition") == "file":
+                        content = part.get_payload(decode=True)
+            if pending["md5"] and hashlib.md5(content).hexdigest() != pending["md5"]:  # noqa: S324
+                raise HTTPError(400, "Uploaded file does not match the authorized MD5")
+            pending["content"] = content
+            return 201, None
+
+        # Keys, groups and schema -------------------------------------------
+
+        def _key_info(self, key: str) -> tuple[int, Any]:
+            return 200, {
+                "key": key, "userID": server.user_id, "username": "stand-in",
+                "access": {"user": {"library": True, "files": True, "notes": True, "write": True},
+                           "groups": {"all": {"library": True, "write": True}}},
+            }
+
+        def _groups(self, user_id: int) -> tuple[int, Any]:
+            groups = [lib for (library_type, _), lib in server.libraries.items() if library_type == "group"]
+            records = [{"key": str(g.library_id), "id": g.library_id, "version": g.version,
+                        "data": {"id": g.library_id, "version": g.version, "name": g.name, "owner": user_id,
+                                 "type": "Private", "libraryEditing": "members", "libraryReading": "members",
+                                 "fileEditing": "members"},
+                        "links": {}, "meta": {"numItems": len(g.items)}} for g in groups]
+            start = int(_first(self.params, "start", "0"))
+            limit = min(int(_first(self.params, "limit", str(DEFAULT_PAGE_SIZE))), MAX_PAGE_SIZE)
+            self.extra_headers["Total-Results"] = str(len(records))
+            return 200, records[start:start + limit]
+
+        def _schema(self, path: str) -> tuple[int, Any]:
+            item_type = _first(self.params, "itemType")
+            if path == "/items/new":
+                if item_type == "attachment":
+                    return 200, {"itemType": "attachment", "linkMode": _first(self.params, "linkMode", "imported_file"),
+                                 "title": "", "accessDate": "", "url": "", "note": "", "tags": [], "relations": {},
+                                 "contentType": "", "charset": "", "filename": "", "md5": None, "mtime": None}
+                if item_type not in ITEM_TYPES:
+                    raise HTTPError(400, f"Invalid itemType '{item_type}'")
+                template = {"itemType": item_type, "title": "",
+                            "creators": [{"creatorType": "author", "firstName": "", "lastName": ""}]}
+                template.update({f: "" for f in ITEM_FIELDS if f != "title"})
+                template.update(tags=[], collections=[], relations={})
+                return 200, template
+            if path == "/itemTypes":
+                return 200, [{"itemType": t, "localized": t} for t in ITEM_TYPES]
+            if path in ("/itemFields", "/itemTypeFields"):
+                return 200, [{"field": f, "localized": f} for f in ITEM_FIELDS]
+            if path == "/itemTypeCreatorTypes":
+                return 200, [{"creatorType": c, "localized": c} for c in CREATOR_TYPES]
+            if path == "/creatorFields":
+                return 200, [{"field": f, "localized": f} for f in ("firstName", "lastName", "name")]
+            raise HTTPError(404, "Not found")
+
+    return Handler
+
+
+def main(argv: list[str] | None = None) -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8085)
+    parser.add_argument("--user-id", type=int, default=12345)
+    parser.add_argument("--items", type=int, default=1000, help="Synthetic items in the user library")
+    parser.add_argument("--collections", type=int, default=50)
+    parser.add_argument("--tags", type=int, default=200)
+    parser.add_argument("--groups", type=int, default=0, help="Extra synthetic group libraries")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request")
+    parser.add_argument("--backoff-every", type=int, default=0)
+    parser.add_argument("--rate-limit-every", type=int, default=0)
+    parser.add_argument("--conflict-rate", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    from synthetic import generate_library
+
+    libraries = [Library.from_synthetic(generate_library(args.items, args.collections, args.tags,
+                                                         library_id=str(args.user_id)))]
+    for index in range(args.groups):
+        group = generate_library(args.items, args.collections, args.tags, seed=index + 2,
+                                 library_id=str(100000 + index), library_type="group")
+        libraries.append(Library.from_synthetic(group))
+    server = StandInServer(libraries, host=args.host, port=args.port, latency=args.latency,
+                           backoff_every=args.backoff_every, rate_limit_every=args.rate_limit_every,
+                           conflict_rate=args.conflict_rate, user_id=args.user_id)
+    print(f"Zotero API stand-in listening on {server.url} (user library {args.user_id})")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
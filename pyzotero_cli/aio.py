@@ -0,0 +1,206 @@
+"""Asyncio request engine for commands that issue many independent requests.
+
+Pyzotero's client is synchronous, so a command gets one request in flight per
+thread. The engine runs an event loop on a background thread with one shared
+``AsyncClient`` (connection pooling, and HTTP/2 when the ``h2`` package is
+installed) and a global semaphore capping the requests in flight across every
+command of the run (``--max-concurrency``, ``ZOTCLI_MAX_CONCURRENCY`` or the
+``max_concurrency`` profile setting; default 32).
+
+``AsyncEngine.map`` mirrors ``bulk.map_concurrently``: it takes a function
+returning an awaitable, consumes its input lazily and yields ``(item, result,
+error)`` in completion order to the calling (synchronous) command. ``zotero_get``
+sends a Zotero Web API GET with the client's endpoint and credentials, waits out
+``Backoff``/``Retry-After`` for every request of the engine, retries 429s and
+raises pyzotero's exceptions for error responses. Blocking pyzotero calls can
+share the same limit through ``blocking``.
+
+The configured transport wrappers (HTTP cache, --timings, tracing, --record/--replay
+and the ``transport`` hook) are installed on the engine's client as well; a custom
+transport factory then receives an async transport.
+"""
+import asyncio
+import importlib.util
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from itertools import islice
+from typing import Any, Awaitable, Callable, Iterable, Iterator
+
+import click
+
+try:
+    import httpx2 as httpx
+except ImportError:  # pragma: no cover - older pyzotero releases use httpx
+    import httpx
+
+try:
+    from pyzotero.errors import error_handler
+except ImportError:  # pragma: no cover - older pyzotero releases
+    from pyzotero.zotero import error_handler
+from pyzotero import zotero_errors
+
+MAX_CONCURRENCY_ENV_VAR = "ZOTCLI_MAX_CONCURRENCY"
+DEFAULT_MAX_CONCURRENCY = 32
+MAX_ATTEMPTS = 5
+REQUEST_TIMEOUT = 30.0
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def max_concurrency(ctx_obj: dict) -> int:
+    """Resolve the global limit: --max-concurrency > ZOTCLI_MAX_CONCURRENCY > profile 'max_concurrency' > 32."""
+    if ctx_obj.get("MAX_CONCURRENCY"):
+        return int(ctx_obj["MAX_CONCURRENCY"])
+    profile_config = ctx_obj.get("PROFILE_CONFIG") or {}
+    value = os.environ.get(MAX_CONCURRENCY_ENV_VAR) or profile_config.get("max_concurrency")
+    try:
+        return max(1, int(value)) if value else DEFAULT_MAX_CONCURRENCY
+    except ValueError:
+        return DEFAULT_MAX_CONCURRENCY
+
+
+class _ClientHolder:
+    """What configure_client() expects: an object with an httpx client and an endpoint."""
+
+    def __init__(self, client: Any):
+        self.client = client
+        self.endpoint = None
+
+
+class AsyncEngine:
+    """An event loop thread, a pooled AsyncClient and a global in-flight limit."""
+
+    def __init__(self, ctx_obj: dict | None = None, limit: int = DEFAULT_MAX_CONCURRENCY):
+        from .http_transport import configure_client
+
+        self.limit = max(1, limit)
+        self.http2 = http2_available()
+        self.client = httpx.AsyncClient(
+            http2=self.http2,
+            follow_redirects=True,
+            timeout=REQUEST_TIMEOUT,
+            limits=httpx.Limits(max_connections=self.limit, max_keepalive_connections=self.limit),
+        )
+        configure_client(_ClientHolder(self.client), ctx_obj or {})
+        self._backoff_until = 0.0
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="zotcli-aio", daemon=True)
+        self._thread.start()
+        self._semaphore = self.run(self._make_semaphore())
+
+    async def _make_semaphore(self) -> asyncio.Semaphore:
+        # Created on the engine's loop (asyncio primitives bind to the running loop)
+        return asyncio.Semaphore(self.limit)
+
+    def run(self, awaitable: Awaitable[Any]) -> Any:
+        """Run a coroutine on the engine loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(awaitable, self._loop).result()
+
+    def map(self, func: Callable[[Any], Awaitable[Any]], items: Iterable[Any],
+            limit: int | None = None) -> Iterator[tuple[Any, Any, BaseException | None]]:
+        """Await ``func(item)`` for each item, at most ``limit`` (default: the global limit) at once.
+
+        Yields ``(item, result, error)`` in completion order; ``items`` is consumed lazily.
+        """
+        window = max(1, min(limit or self.limit, self.limit * 4))
+        iterator = iter(items)
+        pending = {}
+
+        def submit(item: Any) -> None:
+            pending[asyncio.run_coroutine_threadsafe(func(item), self._loop)] = item
+
+        for item in islice(iterator, window):
+            submit(item)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                error = future.exception()
+                yield item, (None if error else future.result()), error
+            for item in islice(iterator, window - len(pending)):
+                submit(item)
+
+    def blocking(self, func: Callable[[Any], Any]) -> Callable[[Any], Awaitable[Any]]:
+        """Adapt a blocking callable for map(): it runs on a worker thread within the global limit."""
+        async def call(item: Any) -> Any:
+            async with self._semaphore:
+                return await asyncio.to_thread(func, item)
+
+        return call
+
+    async def _wait_backoff(self) -> None:
+        delay = self._backoff_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _note_backoff(self, response: Any) -> float:
+        value = response.headers.get("backoff") or response.headers.get("retry-after")
+        try:
+            delay = float(value) if value else 0.0
+        except ValueError:
+            return 0.0
+        if delay:
+            self._backoff_until = max(self._backoff_until, time.monotonic() + delay)
+        return delay
+
+    async def request(self, method: str, url: str, *, params: dict | None = None,
+                      headers: dict | None = None) -> Any:
+        """Send one request within the global limit, honouring Backoff and retrying 429s."""
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            await self._wait_backoff()
+            async with self._semaphore:
+                response = await self.client.request(method, url, params=params, headers=headers)
+            delay = self._note_backoff(response)
+            if response.status_code == 429 and attempt < MAX_ATTEMPTS:
+                if not delay:
+                    self._backoff_until = max(self._backoff_until, time.monotonic() + 2 ** attempt)
+                continue
+            return response
+        return response
+
+    async def zotero_get(self, zot: Any, path: str, params: dict | None = None) -> Any:
+        """GET ``path`` (relative to the client's library, e.g. '/items/KEY/fulltext') and decode JSON.
+
+        Error responses raise the same PyZoteroError subclasses pyzotero would.
+        """
+        url = f"{zot.endpoint}/{zot.library_type}/{zot.library_id}{path}"
+        query = {"format": "json", **(params or {})}
+        if getattr(zot, "locale", None):
+            query.setdefault("locale", zot.locale)
+        response = await self.request("GET", url, params=query, headers=zot.default_headers())
+        if response.is_error:
+            error_handler(zot, response)
+            # error_handler() only records a backoff for 429s; we have run out of retries
+            raise zotero_errors.TooManyRetriesError(f"Still rate-limited after {MAX_ATTEMPTS} attempts: {url}")
+        return response.json()
+
+    def close(self) -> None:
+        try:
+            self.run(self.client.aclose())
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._loop.close()
+
+
+def supports(zot_client: Any) -> bool:
+    """Whether ``zot_client`` is a real pyzotero client the engine can send requests for (not a test double)."""
+    return (isinstance(getattr(zot_client, "endpoint", None), str)
+            and callable(getattr(zot_client, "default_headers", None))
+            and hasattr(getattr(zot_client, "client", None), "_transport"))
+
+
+def get_engine(ctx: click.Context) -> AsyncEngine:
+    """The run's engine, created on first use and closed when the root command finishes."""
+    root = ctx.find_root()
+    ctx_obj = root.obj if isinstance(root.obj, dict) else {}
+    engine = ctx_obj.get("AIO_ENGINE")
+    if engine is None:
+        engine = AsyncEngine(ctx_obj, limit=max_concurrency(ctx_obj))
+        ctx_obj["AIO_ENGINE"] = engine
+        root.call_on_close(engine.close)
+    return engine
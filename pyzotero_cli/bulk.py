@@ -0,0 +1,211 @@
+"""Helpers for bulk operations: chunking, bounded concurrency and batched writes.
+
+Pyzotero client instances keep per-request state (``request``, ``url_params``,
+``links``), so they must not be shared between threads. Worker threads get
+their own client from ``thread_local_client_factory``.
+"""
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator
+
+from . import telemetry
+
+# The Zotero API accepts at most 50 objects per write request
+WRITE_BATCH_SIZE = 50
+
+
+def chunked(iterable: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    """Yield successive lists of at most ``size`` elements from ``iterable``."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def map_concurrently(
+    func: Callable[[Any], Any],
+    items: Iterable[Any],
+    max_workers: int = 4,
+    max_pending: int | None = None,
+) -> Iterator[tuple[Any, Any, BaseException | None]]:
+    """Apply ``func`` to each element of ``items`` on a bounded thread pool.
+
+    Yields ``(item, result, error)`` tuples in completion order. ``error`` is the
+    exception raised by ``func`` (``result`` is then None). ``items`` is consumed
+    lazily: at most ``max_pending`` calls (default ``2 * max_workers``) are in
+    flight at once, so large or streamed inputs are never fully materialized.
+    """
+    max_workers = max(1, max_workers)
+    max_pending = max_pending or max_workers * 2
+    iterator = iter(items)
+
+    if max_workers == 1:
+        for item in iterator:
+            try:
+                yield item, func(item), None
+            except Exception as exc:  # pylint: disable=broad-except
+                yield item, None, exc
+        return
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+        for item in islice(iterator, max_pending):
+            pending[executor.submit(func, item)] = item
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                error = future.exception()
+                yield item, (None if error else future.result()), error
+            for item in islice(iterator, max_pending - len(pending)):
+                pending[executor.submit(func, item)] = item
+
+
+class RateLimiter:
+    """Thread-safe limiter spacing calls at least ``1 / rate`` seconds apart.
+
+    A ``rate`` of None or 0 disables limiting.
+    """
+
+    def __init__(self, rate: float | None):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 30.0) -> float:
+    """Seconds to wait before retry number ``attempt`` (1-based).
+
+    Exponential with full jitter, so concurrent workers that conflicted with each
+    other do not retry in lockstep.
+    """
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+def thread_local_client_factory(ctx: Any, main_client: Any) -> Callable[[], Any]:
+    """Return a callable giving each thread its own Zotero client.
+
+    The calling thread reuses ``main_client``; worker threads build a fresh
+    client from the same Click context configuration.
+    """
+    from .utils import initialize_zotero_client
+
+    owner = threading.get_ident()
+    local = threading.local()
+
+    def get_client() -> Any:
+        if threading.get_ident() == owner:
+            return main_client
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = initialize_zotero_client(ctx)
+            local.client = client
+        return client
+
+    return get_client
+
+
+def _failed_objects(zot_client: Any) -> dict[int, tuple[Any, str]]:
+    """Per-object failures of the last write, by payload index, from the response body.
+
+    Pyzotero's update_items() only returns True, but keeps the last response in
+    ``zot_client.request``; its JSON lists objects the API rejected (e.g. a 412 for
+    a stale ``version``). Clients without a response are assumed to have succeeded.
+    """
+    response = getattr(zot_client, 'request', None)
+    try:
+        body = response.json() if response is not None else None
+    except Exception:  # pylint: disable=broad-except
+        body = None
+    if not isinstance(body, dict):
+        return {}
+    failed = {}
+    for index, failure in (body.get('failed') or {}).items():
+        if isinstance(failure, dict):
+            failed[int(index)] = (failure.get('code'), str(failure.get('message', '')))
+    return failed
+
+
+def batched_update(
+    zot_client: Any,
+    items: Iterable[dict[str, Any]],
+    transform: Callable[[dict[str, Any]], dict[str, Any] | None],
+    refetch: Callable[[list[str]], list[dict[str, Any]]],
+    batch_size: int = WRITE_BATCH_SIZE,
+    max_attempts: int = 3,
+    on_result: Callable[[str, str], None] | None = None,
+) -> list[dict[str, str]]:
+    """Rewrite items in version-checked batches, retrying objects that hit a 412.
+
+    ``transform`` receives an item's ``data`` and returns the fields to change, or
+    None to leave the item alone. Each write sends ``{key, version, **changes}``, so
+    an item modified elsewhere since it was read is rejected with a 412; those items
+    are fetched again with ``refetch(keys)``, transformed again and retried, up to
+    ``max_attempts`` in total.
+
+    ``on_result(key, status)``, when given, is called as soon as each item's final
+    status is known, so callers can stream results while later batches are written.
+
+    Returns a results summary in the ``[{key: status}]`` shape used by
+    check_batch_operation_results().
+    """
+    results: dict[str, str] = {}
+
+    def resolve(key: str, status: str) -> None:
+        results[key] = status
+        if on_result is not None:
+            on_result(key, status)
+
+    pending = list(items)
+    for attempt in range(1, max_attempts + 1):
+        conflicts = []
+        for batch in chunked(pending, batch_size):
+            payload = []
+            for item in batch:
+                changes = transform(item.get('data', {}))
+                if changes is None:
+                    resolve(item['key'], "Unchanged")
+                else:
+                    payload.append({'key': item['key'], 'version': item['version'], **changes})
+            if not payload:
+                continue
+            try:
+                zot_client.update_items(payload)
+            except Exception as exc:  # pylint: disable=broad-except
+                for obj in payload:
+                    resolve(obj['key'], f"Error: {exc}")
+                continue
+            failed = _failed_objects(zot_client)
+            for index, obj in enumerate(payload):
+                if index not in failed:
+                    resolve(obj['key'], "Updated")
+                    continue
+                code, message = failed[index]
+                if code == 412 and attempt < max_attempts:
+                    conflicts.append(obj['key'])
+                    telemetry.add_retry('version_conflict')
+                else:
+                    resolve(obj['key'], f"Error: {message or 'write rejected'} (code {code})")
+        if not conflicts:
+            break
+        pending = refetch(conflicts)
+        refetched = {item['key'] for item in pending}
+        for key in conflicts:
+            if key not in refetched:
+                resolve(key, "Error: item no longer exists")
+    return [{key: status} for key, status in results.items()]
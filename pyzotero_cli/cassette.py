@@ -0,0 +1,237 @@
+"""``zot --record DIR`` / ``zot --replay DIR``: capture and replay every API exchange.
+
+A cassette is ``DIR/cassette.sqlite``: one row per exchange with the request
+method and path, the response status, headers (including ``Link`` paging and
+``Last-Modified-Version``), the zlib-compressed body and the measured latency.
+Exchanges are keyed by a request fingerprint (method, path, sorted query and a
+hash of the request body; the host and credentials are left out, so a cassette
+recorded against one endpoint replays against any). Identical requests made more
+than once in a session are numbered, so a read after a write replays the
+post-write response.
+
+On replay the whole index is loaded into a dict, so each lookup is O(1) and a
+recorded full sync replays at memory speed; bodies stay compressed until served.
+``--replay-latency`` adds a fixed delay per request, or ``recorded`` to reproduce
+the latencies measured while recording. A request missing from the cassette is an
+error rather than a network call. Traffic through pyzotero's client and the
+async engine (``aio``) is captured; the storage upload step of ``files upload``
+bypasses both.
+"""
+import asyncio
+import hashlib
+import importlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import click
+
+CASSETTE_FILE = "cassette.sqlite"
+RECORDED_LATENCY = "recorded"
+
+# Headers describing the encoded wire body; bodies are stored decoded
+_ENCODING_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+class CassetteMiss(click.ClickException):
+    """A request made during --replay that the cassette has no response for."""
+
+
+def fingerprint(request: Any) -> str:
+    parts = urlsplit(str(request.url))
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    body = request.content if request.method not in ("GET", "HEAD") else b""
+    digest = hashlib.sha256(f"{request.method} {parts.path}?{query}\n".encode("utf-8"))
+    digest.update(hashlib.sha256(body).digest())
+    return digest.hexdigest()
+
+
+def _httpx_for(request: Any) -> Any:
+    """The httpx distribution pyzotero uses (httpx or httpx2), found from a request object."""
+    return importlib.import_module(type(request).__module__.split(".")[0])
+
+
+def parse_latency(value: str | None) -> float | str | None:
+    """Parse --replay-latency: seconds as a number, or 'recorded'."""
+    if value is None or value == RECORDED_LATENCY:
+        return value
+    try:
+        seconds = float(value)
+    except ValueError:
+        raise click.BadParameter(f"expected seconds or '{RECORDED_LATENCY}', got {value!r}") from None
+    if seconds < 0:
+        raise click.BadParameter("latency cannot be negative")
+    return seconds
+
+
+class Cassette:
+    """The exchanges of one cassette directory, opened for recording or replay (thread-safe)."""
+
+    def __init__(self, directory: str, mode: str, latency: float | str | None = None):
+        self.directory = directory
+        self.mode = mode
+        self.latency = latency
+        self.path = os.path.join(directory, CASSETTE_FILE)
+        self._lock = threading.Lock()
+        self._counts: dict[str, int] = {}
+        self._index: dict[str, list[tuple[int, str, bytes, float]]] = {}
+        if mode == "record":
+            os.makedirs(directory, exist_ok=True)
+            if os.path.exists(self.path):
+                os.remove(self.path)
+        elif not os.path.exists(self.path):
+            raise click.ClickException(f"No cassette found in '{directory}' (expected {CASSETTE_FILE}).")
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        if mode == "record":
+            self._conn.execute(
+                """
+                CREATE TABLE exchanges (
+                    fingerprint TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    method TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    status INTEGER NOT NULL,
+                    headers TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    seconds REAL NOT NULL,
+                    PRIMARY KEY (fingerprint, seq)
+                )
+                """
+            )
+        else:
+            rows = self._conn.execute(
+                "SELECT fingerprint, status, headers, body, seconds FROM exchanges ORDER BY fingerprint, seq"
+            )
+            for key, status, headers, body, seconds in rows:
+                self._index.setdefault(key, []).append((status, headers, body, seconds))
+            self._conn.close()
+            self._conn = None
+
+    def __len__(self) -> int:
+        if self._conn is not None:
+            return self._conn.execute("SELECT COUNT(*) FROM exchanges").fetchone()[0]
+        return sum(len(entries) for entries in self._index.values())
+
+    def _next_seq(self, key: str) -> int:
+        with self._lock:
+            seq = self._counts.get(key, 0)
+            self._counts[key] = seq + 1
+            return seq
+
+    def record(self, request: Any, status: int, headers: dict[str, str], body: bytes, seconds: float) -> None:
+        key = fingerprint(request)
+        seq = self._next_seq(key)
+        parts = urlsplit(str(request.url))
+        url = parts.path + (f"?{parts.query}" if parts.query else "")
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO exchanges (fingerprint, seq, method, url, status, headers, body, seconds) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, seq, request.method, url, status, json.dumps(headers), zlib.compress(body), seconds),
+            )
+
+    def lookup(self, request: Any) -> tuple[int, dict[str, str], bytes, float]:
+        """The recorded response for ``request``; repeats past the recorded count get the last one."""
+        key = fingerprint(request)
+        entries = self._index.get(key)
+        if not entries:
+            parts = urlsplit(str(request.url))
+            raise CassetteMiss(
+                f"No recorded response in '{self.directory}' for {request.method} "
+                f"{parts.path}{'?' + parts.query if parts.query else ''}. Re-record with --record."
+            )
+        status, headers, body, seconds = entries[min(self._next_seq(key), len(entries) - 1)]
+        return status, json.loads(headers), zlib.decompress(body), seconds
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.commit()
+                self._conn.close()
+                self._conn = None
+
+
+class RecordingTransport:
+    """Transport that forwards to the network and stores every exchange in a Cassette."""
+
+    def __init__(self, inner: Any, cassette: Cassette):
+        self.inner = inner
+        self.cassette = cassette
+
+    def handle_request(self, request: Any) -> Any:
+        start = time.perf_counter()
+        response = self.inner.handle_request(request)
+        body = response.read()
+        response.close()
+        return self._record(request, response, body, time.perf_counter() - start)
+
+    async def handle_async_request(self, request: Any) -> Any:
+        start = time.perf_counter()
+        response = await self.inner.handle_async_request(request)
+        body = await response.aread()
+        await response.aclose()
+        return self._record(request, response, body, time.perf_counter() - start)
+
+    def _record(self, request: Any, response: Any, body: bytes, seconds: float) -> Any:
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in _ENCODING_HEADERS}
+        self.cassette.record(request, response.status_code, headers, body, round(seconds, 6))
+        # The wire body has been consumed and decoded; hand back an equivalent response
+        return type(response)(response.status_code, headers=headers, content=body, request=request)
+
+    def close(self) -> None:
+        self.inner.close()
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+    def __enter__(self) -> "RecordingTransport":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class ReplayTransport:
+    """Transport answering every request from a Cassette; the wrapped transport is never used."""
+
+    def __init__(self, inner: Any, cassette: Cassette):
+        self.inner = inner
+        self.cassette = cassette
+
+    def _delay(self, seconds: float) -> float:
+        return seconds if self.cassette.latency == RECORDED_LATENCY else (self.cassette.latency or 0.0)
+
+    def handle_request(self, request: Any) -> Any:
+        status, headers, body, seconds = self.cassette.lookup(request)
+        if self._delay(seconds):
+            time.sleep(self._delay(seconds))
+        return _httpx_for(request).Response(status, headers=headers, content=body, request=request)
+
+    async def handle_async_request(self, request: Any) -> Any:
+        status, headers, body, seconds = self.cassette.lookup(request)
+        if self._delay(seconds):
+            await asyncio.sleep(self._delay(seconds))
+        return _httpx_for(request).Response(status, headers=headers, content=body, request=request)
+
+    def close(self) -> None:
+        self.inner.close()
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+    def __enter__(self) -> "ReplayTransport":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def transport_factory(cassette: Cassette) -> Any:
+    """The install_transport_wrapper() callable for ``cassette``'s mode."""
+    transport_class = RecordingTransport if cassette.mode == "record" else ReplayTransport
+    return lambda inner: transport_class(inner, cassette)
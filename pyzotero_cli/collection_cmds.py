@@ -5,10 +5,17 @@ from .utils import (
     handle_zotero_exceptions_and_exit, create_click_exception, check_batch_operation_results,
     initialize_zotero_client
 )
+from .bulk import map_concurrently, thread_local_client_factory
+from .collection_tree import load_collection_tree
+from .fanout import echo_fanned_out, library_fanout_options, resolve_libraries
 from pyzotero import zotero
 from pyzotero.zotero_errors import PyZoteroError, HTTPError, ResourceNotFoundError, PreConditionFailedError
 import json
 import os
+from itertools import islice
+
+# Page size used when walking every item of a collection subtree
+RECURSIVE_PAGE_SIZE = 100
 
 @click.group(name='collections')
 @click.pass_context
@@ -23,20 +30,26 @@ def collection_group(ctx):
 @sorting_options(entity_type='collection')
 @filtering_options
 @versioning_option
+@library_fanout_options
 @click.pass_context
-def collection_list(ctx, top, limit, start, since, sort, direction, output, query, qmode, filter_tags, filter_item_type):
-    """List collections in the Zotero library."""
+def collection_list(ctx, top, limit, start, since, sort, direction, output, query, qmode, filter_tags, filter_item_type,
+                    all_groups, libraries_spec, library_workers):
+    """List collections in the Zotero library (or several, with --all-groups/--libraries)."""
     zot_client = ctx.obj['zotero_client']
     
     api_params = prepare_api_params(limit, start, since, sort, direction, query, qmode, filter_tags, filter_item_type)
-    
+
+    def fetch(client):
+        return client.collections_top(**api_params) if top else client.collections(**api_params)
+
     try:
-        if top:
-            results = zot_client.collections_top(**api_params)
-        else:
-            results = zot_client.collections(**api_params)
+        libraries = resolve_libraries(ctx, zot_client, all_groups, libraries_spec)
+        if libraries is not None:
+            echo_fanned_out(ctx, libraries, fetch, library_workers, output, 'collection')
+            return
+        results = fetch(zot_client)
         click.echo(format_data_for_output(results, output, preset_key='collection')) # Use format_data_for_output
-    except PyZoteroError as e:
+    except (PyZoteroError, click.ClickException) as e:
         handle_zotero_exceptions_and_exit(ctx, e)
     except Exception as e:
         click.echo(f"An unexpected error occurred: {e}", err=True)
@@ -59,16 +72,32 @@ def collection_get(ctx, collection_key_or_id, limit, start, since, sort, directi
         click.echo(f"An unexpected error occurred: {e}", err=True)
         ctx.exit(1)
 
+def _load_tree_with_key(zot_client, collection_key):
+    """Loads the collection tree and checks that a collection key exists in it."""
+    tree = load_collection_tree(zot_client)
+    if collection_key not in tree:
+        raise create_click_exception(
+            description="Collection not found",
+            context=f"Collection key: '{collection_key}'",
+            hint="Verify the collection key exists in your library"
+        )
+    return tree
+
 @collection_group.command(name="subcollections")
 @click.argument('parent_collection_key_or_id', required=True)
+@click.option('--recursive', is_flag=True, help='Include all descendants, not just direct children (served from the local collection index).')
 @common_options
 @click.pass_context
-def collection_subcollections(ctx, parent_collection_key_or_id, limit, start, since, sort, direction, output, query, qmode, filter_tags, filter_item_type):
+def collection_subcollections(ctx, parent_collection_key_or_id, recursive, limit, start, since, sort, direction, output, query, qmode, filter_tags, filter_item_type):
     """List subcollections of a specific collection."""
     zot_client = ctx.obj['zotero_client']
     api_params = prepare_api_params(limit, start, since, sort, direction, query, qmode, filter_tags, filter_item_type)
     try:
-        results = zot_client.collections_sub(parent_collection_key_or_id, **api_params)
+        if recursive:
+            tree = _load_tree_with_key(zot_client, parent_collection_key_or_id)
+            results = tree.subtree(parent_collection_key_or_id, include_self=False)
+        else:
+            results = zot_client.collections_sub(parent_collection_key_or_id, **api_params)
         click.echo(format_data_for_output(results, output, preset_key='collection')) # Use format_data_for_output
     except PyZoteroError as e:
         handle_zotero_exceptions_and_exit(ctx, e)
@@ -81,31 +110,112 @@ def collection_subcollections(ctx, parent_collection_key_or_id, limit, start, si
 @common_options
 @click.pass_context
 def collection_all(ctx, parent_id, limit, start, since, sort, direction, output, query, qmode, filter_tags, filter_item_type):
-    """List all collections and subcollections, flattened."""
+    """List all collections and subcollections, flattened.
+
+    Parents are listed before their children. Collections come from a local index
+    that is fetched in pages once and then only updated with what changed since the
+    cached library version.
+    """
     zot_client = ctx.obj['zotero_client']
-    # Pyzotero's all_collections() only takes an optional collectionID (parent_id here).
-    # It does not accept other parameters like limit, sort, direction directly.
-    # If filtering/sorting is needed, it would typically be done client-side on the results,
-    # or by setting parameters on the Zotero instance if the specific method respects them (all_collections likely doesn't).
     try:
         if parent_id:
-            results = zot_client.all_collections(parent_id)
+            results = _load_tree_with_key(zot_client, parent_id).subtree(parent_id)
         else:
-            results = zot_client.all_collections()
+            results = load_collection_tree(zot_client).all()
         click.echo(format_data_for_output(results, output, preset_key='collection')) # Use format_data_for_output
-    except PyZoteroError as e:
-        click.echo(f"Zotero API Error: {e}", err=True)
     except Exception as e:
-        click.echo(f"An unexpected error occurred: {e}", err=True)
+        handle_zotero_exceptions_and_exit(ctx, e)
+
+@collection_group.command(name="path")
+@click.argument('collection_key_or_id', required=True)
+@click.option('--output', type=click.Choice(['text', 'json', 'yaml', 'table', 'keys']), default='text', show_default=True, help='Output format. "text" prints names joined with --separator.')
+@click.option('--separator', default=' / ', show_default=True, help='Separator between collection names for text output.')
+@click.pass_context
+def collection_path(ctx, collection_key_or_id, output, separator):
+    """Show the ancestry of a collection, from the top level down to it."""
+    zot_client = ctx.obj['zotero_client']
+    try:
+        ancestors = _load_tree_with_key(zot_client, collection_key_or_id).ancestors(collection_key_or_id)
+        if output == 'text':
+            click.echo(separator.join(c.get('data', {}).get('name', c['key']) for c in ancestors))
+        else:
+            click.echo(format_data_for_output(ancestors, output, preset_key='collection'))
+    except Exception as e:
+        handle_zotero_exceptions_and_exit(ctx, e)
+
+def _iter_subtree_items(ctx, zot_client, collection_key, top, api_params, workers, failures):
+    """
+    Yields each item in a collection and all of its subcollections exactly once.
+
+    Collections are paged concurrently (one worker per collection, each with its own
+    client); items are deduplicated by key as results arrive. Collections that could
+    not be fetched are appended to ``failures`` as (key, error) pairs.
+    """
+    collection_keys = _load_tree_with_key(zot_client, collection_key).subtree_keys(collection_key)
+    get_client = thread_local_client_factory(ctx, zot_client)
+
+    def fetch_all_pages(key):
+        client = get_client()
+        fetch = client.collection_items_top if top else client.collection_items
+        items = []
+        page_start = 0
+        while True:
+            page = fetch(key, limit=RECURSIVE_PAGE_SIZE, start=page_start, **api_params)
+            items.extend(page)
+            if len(page) < RECURSIVE_PAGE_SIZE:
+                return items
+            page_start += RECURSIVE_PAGE_SIZE
+
+    seen = set()
+    for key, items, error in map_concurrently(fetch_all_pages, collection_keys, max_workers=workers):
+        if error is not None:
+            failures.append((key, error))
+            continue
+        for item in items:
+            if item.get('key') not in seen:
+                seen.add(item.get('key'))
+                yield item
 
 @collection_group.command(name="items")
 @click.argument('collection_key_or_id', required=True)
 @click.option('--top', is_flag=True, help='List top-level items in the collection. Corresponds to Zotero.collection_items_top().')
+@click.option('--recursive', is_flag=True, help='Include items from every subcollection, deduplicated by item key.')
+@click.option('--workers', type=click.IntRange(1, 32), default=4, show_default=True, help='Number of collections fetched concurrently with --recursive.')
 @common_options
 @click.pass_context
-def collection_items(ctx, collection_key_or_id, top, limit, start, since, sort, direction, output, query, qmode, filter_tags, filter_item_type):
-    """List items in a specific collection."""
+def collection_items(ctx, collection_key_or_id, top, recursive, workers, limit, start, since, sort, direction, output, query, qmode, filter_tags, filter_item_type):
+    """List items in a specific collection.
+
+    With --recursive, items from the whole subtree are merged. --limit then caps the
+    merged result, sorting applies within each collection only, and 'keys' output is
+    streamed as items arrive.
+    """
     zot_client = ctx.obj['zotero_client']
+    if recursive:
+        if start is not None:
+            raise click.UsageError('--start cannot be used with --recursive.')
+        if output not in ('json', 'yaml', 'table', 'keys'):
+            raise click.UsageError('--recursive supports only json, yaml, table and keys output.')
+        api_params = prepare_api_params(None, None, since, sort, direction, query, qmode, filter_tags, filter_item_type)
+        failures = []
+        try:
+            subtree_items = _iter_subtree_items(ctx, zot_client, collection_key_or_id, top, api_params, workers, failures)
+            results = []
+            for item in islice(subtree_items, limit):
+                if output == 'keys':
+                    click.echo(item['key'])
+                else:
+                    results.append(item)
+            if output != 'keys':
+                click.echo(format_data_for_output(results, output, preset_key='item'))
+        except Exception as e:
+            handle_zotero_exceptions_and_exit(ctx, e)
+        for key, error in failures:
+            click.echo(f"Warning: Could not list items of collection '{key}': {error}", err=True)
+        if failures:
+            ctx.exit(1)
+        return
+
     api_params = prepare_api_params(limit, start, since, sort, direction, query, qmode, filter_tags, filter_item_type)
     try:
         if top:
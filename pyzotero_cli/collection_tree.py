@@ -0,0 +1,143 @@
+"""Client-side index of a library's collection hierarchy.
+
+All collections are fetched with plain paged requests (instead of one request per
+collection, as pyzotero's all_collections() does), stored in the zotcli cache with
+the library version, and refreshed incrementally with collection_versions() and
+deleted() when the library changes.
+
+Collections are laid out in pre-order, and each key records the span of its subtree
+in that order, so descendant checks are O(1) and subtree listings are a slice.
+"""
+from typing import Any, Iterable
+
+from .bulk import chunked
+from .utils import library_cache_key, load_cache_json, save_cache_json
+
+PAGE_SIZE = 100
+# The API accepts at most 50 keys in a collectionKey filter
+KEYS_PER_REQUEST = 50
+
+
+def _cache_file(zot_client: Any) -> str:
+    return "collection_tree.{}.json".format(library_cache_key(zot_client).replace(":", "_"))
+
+
+def _parent_of(collection: dict[str, Any]) -> str | None:
+    return collection.get("data", {}).get("parentCollection") or None
+
+
+class CollectionTree:
+    """Parent → children adjacency index over a list of collection objects."""
+
+    def __init__(self, collections: Iterable[dict[str, Any]], version: int | None = None):
+        self.version = version
+        self.by_key: dict[str, dict[str, Any]] = {c["key"]: c for c in collections}
+        self.children: dict[str | None, list[str]] = {}
+        for key, collection in self.by_key.items():
+            parent = _parent_of(collection)
+            # Orphans (parent missing, e.g. mid-sync) are treated as top-level
+            if parent not in self.by_key:
+                parent = None
+            self.children.setdefault(parent, []).append(key)
+        for siblings in self.children.values():
+            siblings.sort(key=lambda k: (self.by_key[k].get("data", {}).get("name", "").lower(), k))
+
+        self.order: list[str] = []
+        self.span: dict[str, tuple[int, int]] = {}
+        # Iterative pre-order walk; deep trees must not hit the recursion limit
+        stack: list[tuple[str, bool]] = [(k, False) for k in reversed(self.children.get(None, []))]
+        while stack:
+            key, finished = stack.pop()
+            if finished:
+                self.span[key] = (self.span[key][0], len(self.order))
+                continue
+            self.span[key] = (len(self.order), -1)
+            self.order.append(key)
+            stack.append((key, True))
+            stack.extend((child, False) for child in reversed(self.children.get(key, [])))
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.by_key
+
+    def __len__(self) -> int:
+        return len(self.by_key)
+
+    def all(self) -> list[dict[str, Any]]:
+        """Every collection, parents before children."""
+        return [self.by_key[k] for k in self.order]
+
+    def subtree(self, key: str, include_self: bool = True) -> list[dict[str, Any]]:
+        start, end = self.span[key]
+        keys = self.order[start if include_self else start + 1:end]
+        return [self.by_key[k] for k in keys]
+
+    def subtree_keys(self, key: str, include_self: bool = True) -> list[str]:
+        start, end = self.span[key]
+        return self.order[start if include_self else start + 1:end]
+
+    def is_descendant(self, key: str, ancestor: str) -> bool:
+        start, end = self.span[ancestor]
+        return start < self.span[key][0] < end
+
+    def ancestors(self, key: str) -> list[dict[str, Any]]:
+        """Collections from the top level down to ``key`` (inclusive)."""
+        path = []
+        current: str | None = key
+        while current in self.by_key and len(path) <= len(self.by_key):
+            path.append(self.by_key[current])
+            current = _parent_of(self.by_key[current])
+        return list(reversed(path))
+
+
+def _fetch_pages(zot_client: Any, **params: Any) -> list[dict[str, Any]]:
+    results: list[dict[str, Any]] = []
+    start = 0
+    while True:
+        page = zot_client.collections(limit=PAGE_SIZE, start=start, **params)
+        results.extend(page)
+        if len(page) < PAGE_SIZE:
+            return results
+        start += PAGE_SIZE
+
+
+def _fetch_keys(zot_client: Any, keys: Iterable[str]) -> list[dict[str, Any]]:
+    results: list[dict[str, Any]] = []
+    for batch in chunked(keys, KEYS_PER_REQUEST):
+        results.extend(_fetch_pages(zot_client, collectionKey=",".join(batch)))
+    return results
+
+
+def load_collection_tree(zot_client: Any, refresh: bool = False) -> CollectionTree:
+    """Return the collection tree for a client's library, updating the cached copy as needed.
+
+    A current cache costs one request (the library version). A stale one is patched
+    with the collections changed or deleted since its version; anything that fails
+    during the incremental update falls back to a full fetch.
+    """
+    library_version = zot_client.last_modified_version()
+    cache_file = _cache_file(zot_client)
+    cached = {} if refresh else load_cache_json(cache_file)
+    cached_version = cached.get("version")
+    collections = cached.get("collections")
+
+    if isinstance(collections, list) and cached_version == library_version:
+        return CollectionTree(collections, library_version)
+
+    merged = None
+    if isinstance(collections, list) and isinstance(cached_version, int):
+        try:
+            changed = zot_client.collection_versions(since=cached_version) or {}
+            removed = set((zot_client.deleted(since=cached_version) or {}).get("collections", []))
+            by_key = {c["key"]: c for c in collections}
+            for collection in _fetch_keys(zot_client, changed.keys()):
+                by_key[collection["key"]] = collection
+            for key in removed:
+                by_key.pop(key, None)
+            merged = list(by_key.values())
+        except Exception:
+            merged = None
+    if merged is None:
+        merged = _fetch_pages(zot_client)
+
+    save_cache_json(cache_file, {"version": library_version, "collections": merged})
+    return CollectionTree(merged, library_version)
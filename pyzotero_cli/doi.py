@@ -5,8 +5,14 @@ from typing import Any
 from datetime import datetime, timezone
 from urllib import error, parse, request
 
+from . import schema, telemetry
+
 
 DOI_CSL_ACCEPT_HEADER = "application/vnd.citationstyles.csl+json"
+DOI_REQUEST_HEADERS = {
+    "Accept": DOI_CSL_ACCEPT_HEADER,
+    "User-Agent": "pyzotero-cli/doi-import",
+}
 DOI_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".config", "zotcli", "doi_cache.json")
 DOI_LIBRARY_CATALOG = "DOI.org (AI Agent)"
 DOI_URL_PREFIX_RE = re.compile(
@@ -60,19 +66,18 @@ def normalize_doi(raw_doi: str) -> str:
     return clean_doi(raw_doi).lower()
 
 
+def _doi_url(doi: str) -> str:
+    return f"https://doi.org/{parse.quote(doi, safe='/')}"
+
+
 def fetch_csl_json_for_doi(doi: str, timeout: int = 10) -> dict[str, Any]:
     """Fetch CSL JSON metadata for a DOI using DOI content negotiation."""
-    url = f"https://doi.org/{parse.quote(doi, safe='/')}"
-    req = request.Request(
-        url,
-        headers={
-            "Accept": DOI_CSL_ACCEPT_HEADER,
-            "User-Agent": "pyzotero-cli/doi-import",
-        },
-    )
+    url = _doi_url(doi)
+    req = request.Request(url, headers=DOI_REQUEST_HEADERS)
 
     try:
-        with request.urlopen(req, timeout=timeout) as response:
+        with telemetry.request_span("GET", url) as record_status, request.urlopen(req, timeout=timeout) as response:
+            record_status(response.status)
             payload = response.read().decode("utf-8")
     except error.HTTPError as exc:
         raise DOIError(f"DOI lookup failed with HTTP {exc.code}") from exc
@@ -81,6 +86,21 @@ def fetch_csl_json_for_doi(doi: str, timeout: int = 10) -> dict[str, Any]:
     except TimeoutError as exc:
         raise DOIError("DOI lookup timed out") from exc
 
+    return _parse_csl_payload(payload)
+
+
+async def fetch_csl_json_for_doi_async(engine: Any, doi: str) -> dict[str, Any]:
+    """fetch_csl_json_for_doi() through an aio.AsyncEngine, for looking up many DOIs at once."""
+    try:
+        response = await engine.request("GET", _doi_url(doi), headers=DOI_REQUEST_HEADERS)
+    except Exception as exc:
+        raise DOIError(f"DOI lookup failed: {exc}") from exc
+    if response.is_error:
+        raise DOIError(f"DOI lookup failed with HTTP {response.status_code}")
+    return _parse_csl_payload(response.text)
+
+
+def _parse_csl_payload(payload: str) -> dict[str, Any]:
     try:
         data = json.loads(payload)
     except json.JSONDecodeError as exc:
@@ -163,7 +183,7 @@ def find_existing_item_by_doi(
 def map_csl_json_to_zotero_item(zot_client: Any, csl_json: dict[str, Any], doi: str) -> dict[str, Any]:
     """Map CSL JSON metadata into a Zotero item payload."""
     item_type = _determine_zotero_item_type(csl_json)
-    template = zot_client.item_template(item_type)
+    template = schema.item_template(zot_client, item_type)
     if not isinstance(template, dict):
         raise DOIError(f"Could not create Zotero template for item type '{item_type}'")
 
@@ -341,7 +361,7 @@ def _map_creators(zot_client: Any, item_type: str, csl_json: dict[str, Any]) ->
 
 def _get_allowed_creator_types(zot_client: Any, item_type: str) -> set[str]:
     try:
-        creator_types = zot_client.item_creator_types(itemtype=item_type)
+        creator_types = schema.item_creator_types(zot_client, item_type)
     except Exception:
         return {"author", "editor", "translator"}
 
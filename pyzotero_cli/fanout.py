@@ -0,0 +1,144 @@
+"""Run one read command against several libraries and merge the results.
+
+Commands decorated with ``library_fanout_options`` accept ``--all-groups`` (every
+group the API key can access) or ``--libraries`` (an explicit list). Each library
+gets its own client; requests run on a bounded thread pool (within the run's
+``--max-concurrency`` limit) and every returned record is tagged with the
+library it came from.
+"""
+from typing import Any, Callable
+
+import click
+
+from . import aio, records
+from .bulk import map_concurrently
+from .utils import TABLE_HEADER_PRESETS, create_usage_error, format_data_for_output, initialize_zotero_client
+
+GROUPS_PAGE_SIZE = 100
+DEFAULT_LIBRARY_WORKERS = 4
+
+
+def library_fanout_options(func):
+    """Decorator adding --all-groups, --libraries and --library-workers to a read command."""
+    func = click.option('--library-workers', type=click.IntRange(1, 16), default=DEFAULT_LIBRARY_WORKERS,
+                        show_default=True, help='Libraries queried concurrently with --all-groups/--libraries.')(func)
+    func = click.option('--libraries', 'libraries_spec',
+                        help="Comma-separated libraries to query, e.g. '12345,67890' (group IDs) or 'user:111,group:222'.")(func)
+    func = click.option('--all-groups', is_flag=True, help='Query every group library the API key can access.')(func)
+    return func
+
+
+def parse_libraries(spec: str) -> list[tuple[str, str]]:
+    """Parse '--libraries' into (library_type, library_id) pairs; bare IDs are groups."""
+    libraries = []
+    for part in (p.strip() for p in spec.split(',')):
+        if not part:
+            continue
+        library_type, _, library_id = part.rpartition(':')
+        library_type = library_type or 'group'
+        if library_type not in ('user', 'group') or not library_id.isdigit():
+            raise create_usage_error(
+                description=f"Invalid library '{part}'",
+                hint="Use a group ID, or 'user:<id>' / 'group:<id>'."
+            )
+        libraries.append((library_type, library_id))
+    if not libraries:
+        raise create_usage_error(description="--libraries needs at least one library")
+    return list(dict.fromkeys(libraries))
+
+
+def _group_libraries(ctx: click.Context, zot_client: Any) -> list[tuple[str, str]]:
+    # groups() always reads /users/<id>/groups, so a group profile needs the key's user ID
+    if zot_client.library_type in ('user', 'users'):
+        user_client = zot_client
+    else:
+        user_id = zot_client.key_info().get('userID')
+        user_client = initialize_zotero_client(ctx, library_id=str(user_id), library_type='user')
+    groups: list[dict[str, Any]] = []
+    start = 0
+    while True:
+        page = user_client.groups(limit=GROUPS_PAGE_SIZE, start=start)
+        groups.extend(page)
+        if len(page) < GROUPS_PAGE_SIZE:
+            break
+        start += GROUPS_PAGE_SIZE
+    return [('group', str(g.get('id', g.get('data', {}).get('id')))) for g in groups]
+
+
+def resolve_libraries(ctx: click.Context, zot_client: Any, all_groups: bool,
+                      libraries_spec: str | None) -> list[tuple[str, str]] | None:
+    """Libraries selected by the fan-out options, or None when the command targets one library."""
+    if all_groups and libraries_spec:
+        raise create_usage_error(description="Use either --all-groups or --libraries, not both")
+    if libraries_spec:
+        return parse_libraries(libraries_spec)
+    if all_groups:
+        return _group_libraries(ctx, zot_client)
+    return None
+
+
+def _tag_record(record: Any, library_type: str, library_id: str) -> dict[str, Any]:
+    if not isinstance(record, dict):
+        # Plain values (e.g. tag names) become objects so they can carry the library
+        record = {'tag': record} if isinstance(record, str) else {'value': record}
+    library = record.get('library') if isinstance(record.get('library'), dict) else {}
+    record['library'] = {**library, 'type': library_type, 'id': int(library_id)}
+    return record
+
+
+def fan_out(ctx: click.Context, libraries: list[tuple[str, str]], fetch: Callable[[Any], Any],
+            workers: int = DEFAULT_LIBRARY_WORKERS,
+            compact_items: bool = False) -> tuple[list[Any], list[tuple[str, BaseException]]]:
+    """Call ``fetch(client)`` for every library concurrently.
+
+    Returns the merged, library-tagged records (in the order of ``libraries``) and a
+    list of ``(library, error)`` for the libraries that failed. With ``compact_items``
+    each library's items become records.ItemRecord as soon as that library is done.
+    """
+    def run(library):
+        library_type, library_id = library
+        client = initialize_zotero_client(ctx, library_id=library_id, library_type=library_type)
+        return fetch(client)
+
+    if aio.supports(ctx.obj.get('ZOTERO_CLIENT')):
+        # Share the run's global --max-concurrency limit with other concurrent requests
+        engine = aio.get_engine(ctx)
+        completed = engine.map(engine.blocking(run), libraries, limit=workers)
+    else:
+        completed = map_concurrently(run, libraries, max_workers=workers)
+
+    by_library: dict[tuple[str, str], list[Any]] = {}
+    failures = []
+    for library, result, error in completed:
+        if error is not None:
+            failures.append((f"{library[0]}:{library[1]}", error))
+            continue
+        results = result if isinstance(result, list) else [result]
+        tagged = [_tag_record(r, *library) for r in results]
+        by_library[library] = records.compact(tagged) if compact_items else tagged
+    merged = [record for library in libraries for record in by_library.get(library, [])]
+    return merged, failures
+
+
+def report_fanout_failures(ctx: click.Context, failures: list[tuple[str, BaseException]]) -> None:
+    """Print one warning per failed library and exit with code 1 if there were any."""
+    for library, error in failures:
+        click.echo(f"Warning: library {library} failed: {error}", err=True)
+    if failures:
+        ctx.exit(1)
+
+
+def fanout_table_headers(preset_key: str) -> list[tuple[str, Any]]:
+    """A table preset with an extra Library column."""
+    return TABLE_HEADER_PRESETS[preset_key] + [
+        ("Library", lambda r: r.get('library', {}).get('name') or f"{r['library']['type']}:{r['library']['id']}")
+    ]
+
+
+def echo_fanned_out(ctx: click.Context, libraries: list[tuple[str, str]], fetch: Callable[[Any], Any],
+                    workers: int, output: str, preset_key: str, keys_field: str | None = None,
+                    compact_items: bool = False) -> None:
+    """Fan ``fetch`` out over ``libraries``, print the merged records and report failures."""
+    results, failures = fan_out(ctx, libraries, fetch, workers, compact_items)
+    click.echo(format_data_for_output(results, output, keys_field, table_headers_map=fanout_table_headers(preset_key)))
+    report_fanout_failures(ctx, failures)
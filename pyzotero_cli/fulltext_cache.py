@@ -0,0 +1,221 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import zlib
+from typing import Any
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional; zlib is always available
+    zstandard = None
+
+
+CACHE_DIR_NAME = "fulltext"
+CACHE_DB_NAME = "fulltext_cache.sqlite"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+MAX_SIZE_ENV_VAR = "ZOTCLI_FULLTEXT_CACHE_MB"
+
+
+def _compress(raw: bytes) -> tuple[bytes, str]:
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=10).compress(raw), ".zst"
+    return zlib.compress(raw, 6), ".zz"
+
+
+def _decompress(blob: bytes, suffix: str) -> bytes:
+    if suffix == ".zst":
+        if zstandard is None:
+            raise ValueError("Cached blob is zstd-compressed but 'zstandard' is not installed")
+        return zstandard.ZstdDecompressor().decompress(blob)
+    return zlib.decompress(blob)
+
+
+def max_cache_bytes() -> int:
+    """Size cap from ZOTCLI_FULLTEXT_CACHE_MB (megabytes), defaulting to 512 MB."""
+    value = os.environ.get(MAX_SIZE_ENV_VAR)
+    try:
+        return int(float(value) * 1024 * 1024) if value else DEFAULT_MAX_BYTES
+    except ValueError:
+        return DEFAULT_MAX_BYTES
+
+
+class FullTextCache:
+    """Compressed, content-addressed on-disk cache of full-text payloads.
+
+    Payloads are stored once per SHA-256 digest of their JSON encoding under
+    ``<root>/blobs``; a SQLite index maps (library, item key) to the digest and the
+    full-text version it was cached at. Blobs are evicted least-recently-used first
+    once their compressed size exceeds ``max_bytes``.
+
+    Entries stay valid until ``invalidate`` reports a newer full-text version for the
+    key; callers learn about those with new_fulltext(since=checked_version).
+    """
+
+    def __init__(self, root: str, max_bytes: int | None = None):
+        self.root = root
+        self.blob_dir = os.path.join(root, "blobs")
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self.max_bytes = max_cache_bytes() if max_bytes is None else max_bytes
+        self.conn = sqlite3.connect(os.path.join(root, CACHE_DB_NAME))
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS libraries (
+                library TEXT PRIMARY KEY,
+                checked_version INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS entries (
+                library TEXT NOT NULL,
+                item_key TEXT NOT NULL,
+                version INTEGER,
+                digest TEXT NOT NULL,
+                PRIMARY KEY (library, item_key)
+            );
+            CREATE TABLE IF NOT EXISTS blobs (
+                digest TEXT PRIMARY KEY,
+                suffix TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS blobs_last_access ON blobs (last_access);
+            """
+        )
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "FullTextCache":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _blob_path(self, digest: str, suffix: str) -> str:
+        return os.path.join(self.blob_dir, digest[:2], digest + suffix)
+
+    def checked_version(self, library: str) -> int | None:
+        """Library version up to which cached entries are known to be current, or None."""
+        row = self.conn.execute(
+            "SELECT checked_version FROM libraries WHERE library = ?", (library,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def set_checked_version(self, library: str, version: int) -> None:
+        self.conn.execute(
+            "INSERT INTO libraries (library, checked_version) VALUES (?, ?) "
+            "ON CONFLICT (library) DO UPDATE SET checked_version = excluded.checked_version",
+            (library, version),
+        )
+        self.conn.commit()
+
+    def invalidate(self, library: str, changed: dict[str, int]) -> int:
+        """Drop entries older than the versions in a new_fulltext() result. Returns the number dropped."""
+        dropped = 0
+        for item_key, version in changed.items():
+            cursor = self.conn.execute(
+                "DELETE FROM entries WHERE library = ? AND item_key = ? AND (version IS NULL OR version < ?)",
+                (library, item_key, version),
+            )
+            dropped += cursor.rowcount
+        if dropped:
+            orphans = self.conn.execute(
+                "SELECT digest, suffix FROM blobs WHERE digest NOT IN (SELECT digest FROM entries)"
+            ).fetchall()
+            for digest, suffix in orphans:
+                self._drop_blob(digest, suffix)
+        self.conn.commit()
+        return dropped
+
+    def get(self, library: str, item_key: str) -> dict[str, Any] | None:
+        row = self.conn.execute(
+            "SELECT b.digest, b.suffix FROM entries e JOIN blobs b ON b.digest = e.digest "
+            "WHERE e.library = ? AND e.item_key = ?",
+            (library, item_key),
+        ).fetchone()
+        if not row:
+            return None
+        digest, suffix = row
+        try:
+            with open(self._blob_path(digest, suffix), "rb") as f:
+                data = json.loads(_decompress(f.read(), suffix))
+        except (OSError, ValueError, zlib.error):
+            # Missing or corrupt blob: forget it so the caller refetches
+            self._drop_blob(digest, suffix)
+            self.conn.commit()
+            return None
+        self.conn.execute("UPDATE blobs SET last_access = ? WHERE digest = ?", (time.time(), digest))
+        self.conn.commit()
+        return data
+
+    def put(self, library: str, item_key: str, version: int | None, data: dict[str, Any]) -> None:
+        raw = json.dumps(data, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        digest = hashlib.sha256(raw).hexdigest()
+        row = self.conn.execute("SELECT suffix FROM blobs WHERE digest = ?", (digest,)).fetchone()
+        if row:
+            self.conn.execute("UPDATE blobs SET last_access = ? WHERE digest = ?", (time.time(), digest))
+        else:
+            blob, suffix = _compress(raw)
+            path = self._blob_path(digest, suffix)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(blob)
+            os.replace(tmp_path, path)
+            self.conn.execute(
+                "INSERT INTO blobs (digest, suffix, size, last_access) VALUES (?, ?, ?, ?)",
+                (digest, suffix, len(blob), time.time()),
+            )
+        self.conn.execute(
+            "INSERT INTO entries (library, item_key, version, digest) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (library, item_key) DO UPDATE SET version = excluded.version, digest = excluded.digest",
+            (library, item_key, version, digest),
+        )
+        self.conn.commit()
+        self.evict()
+
+    def total_size(self) -> int:
+        return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def stats(self) -> dict[str, Any]:
+        entries, = self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+        blobs, = self.conn.execute("SELECT COUNT(*) FROM blobs").fetchone()
+        return {
+            "path": self.root,
+            "entries": entries,
+            "blobs": blobs,
+            "size_bytes": self.total_size(),
+            "max_bytes": self.max_bytes,
+            "compression": "zstd" if zstandard is not None else "zlib",
+        }
+
+    def evict(self) -> int:
+        """Remove least-recently-used blobs until the cache fits in max_bytes. Returns blobs removed."""
+        excess = self.total_size() - self.max_bytes
+        removed = 0
+        if excess <= 0:
+            return 0
+        for digest, suffix, size in self.conn.execute(
+            "SELECT digest, suffix, size FROM blobs ORDER BY last_access"
+        ).fetchall():
+            if excess <= 0:
+                break
+            self._drop_blob(digest, suffix)
+            excess -= size
+            removed += 1
+        self.conn.commit()
+        return removed
+
+    def clear(self) -> None:
+        for digest, suffix in self.conn.execute("SELECT digest, suffix FROM blobs").fetchall():
+            self._drop_blob(digest, suffix)
+        self.conn.execute("DELETE FROM libraries")
+        self.conn.commit()
+
+    def _drop_blob(self, digest: str, suffix: str) -> None:
+        self.conn.execute("DELETE FROM entries WHERE digest = ?", (digest,))
+        self.conn.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+        try:
+            os.remove(self._blob_path(digest, suffix))
+        except OSError:
+            pass
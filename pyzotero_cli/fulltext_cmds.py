@@ -1,5 +1,100 @@
 import click
-from .utils import format_data_for_output, handle_zotero_exceptions_and_exit, create_click_exception, parse_json_input, initialize_zotero_client
+import json
+import os
+from . import aio
+from .bulk import RateLimiter, map_concurrently, thread_local_client_factory
+from .fulltext_cache import CACHE_DIR_NAME, FullTextCache
+from .fulltext_index import INDEX_FILE_NAME, FullTextIndex, FullTextIndexError
+from .utils import (
+    format_data_for_output, handle_zotero_exceptions_and_exit, create_click_exception, parse_json_input,
+    initialize_zotero_client, library_cache_key, load_cache_json, save_cache_json, get_cache_path
+)
+
+# Stores the library version each library was last dumped at, so reruns only fetch deltas
+FULLTEXT_STATE_FILE = "fulltext_state.json"
+
+SEARCH_RESULT_HEADERS = [
+    ("Key", "key"),
+    ("Score", "score"),
+    ("Snippet", "snippet"),
+]
+
+
+def _iter_changed_fulltext(ctx, zot_instance, since, workers):
+    """
+    Yields (item_key, version, data, error) for every attachment whose full-text changed since a version.
+
+    Returns a (library_version, generator) pair. The library version is read before listing changes
+    so that it is a safe high-water mark for the next incremental run.
+    """
+    library_version = zot_instance.last_modified_version()
+    changed = zot_instance.new_fulltext(since=since) or {}
+
+    if aio.supports(zot_instance):
+        # One pooled async client instead of a pyzotero client per worker thread
+        engine = aio.get_engine(ctx)
+        completed = engine.map(lambda item_key: engine.zotero_get(zot_instance, f"/items/{item_key}/fulltext"),
+                               changed.keys(), limit=workers)
+    else:
+        get_client = thread_local_client_factory(ctx, zot_instance)
+        completed = map_concurrently(lambda item_key: get_client().fulltext_item(item_key),
+                                     changed.keys(), max_workers=workers)
+
+    def results():
+        for item_key, data, error in completed:
+            yield item_key, changed[item_key], data, error
+
+    return library_version, results()
+
+def _check_fulltext_payload(payload):
+    """
+    Validates a full-text payload for set_fulltext.
+
+    Returns (error, warning): error is a (description, details) tuple or None, warning a string or None.
+    """
+    if not isinstance(payload, dict):
+        return ("Invalid payload format", "Parsed payload is not a JSON object (dictionary)"), None
+    if "content" not in payload:
+        return ("Invalid payload format", "Payload must have a 'content' key"), None
+
+    has_pages = "indexedPages" in payload and "totalPages" in payload
+    has_chars = "indexedChars" in payload and "totalChars" in payload
+    if not (has_pages or has_chars):
+        return ("Incomplete payload format",
+                "Payload needs ('indexedPages' & 'totalPages') OR ('indexedChars' & 'totalChars')"), None
+    if has_pages and has_chars:
+        return None, "Payload has both page and char counts. Behavior may vary."
+    return None, None
+
+def _warn_local_write(ctx, command_name):
+    if ctx.obj.get('LOCAL', False):
+        click.echo(f"Warning: Attempting '{command_name}' fulltext with local Zotero. This may fail (read-only).", err=True)
+        if not ctx.obj.get('NO_INTERACTION', False) and not click.confirm("Proceed anyway?"):
+            ctx.abort()
+
+def _open_fulltext_cache(zot_instance):
+    """
+    Opens the full-text cache and brings it up to date with the library.
+
+    Entries changed since the cache's checked version are invalidated with one
+    new_fulltext() request. On first use, the current library version becomes the
+    checked version, since the cache holds nothing to invalidate yet.
+    """
+    cache = FullTextCache(get_cache_path(CACHE_DIR_NAME))
+    library_key = library_cache_key(zot_instance)
+    try:
+        checked = cache.checked_version(library_key)
+        if checked is None:
+            cache.set_checked_version(library_key, zot_instance.last_modified_version())
+        else:
+            changed = zot_instance.new_fulltext(since=checked) or {}
+            if changed:
+                cache.invalidate(library_key, changed)
+                cache.set_checked_version(library_key, max(checked, *changed.values()))
+    except Exception:
+        cache.close()
+        raise
+    return cache
 
 @click.group("fulltext")
 @click.pass_context
@@ -11,12 +106,26 @@ def fulltext_group(ctx):
 @fulltext_group.command("get")
 @click.argument("item_key")
 @click.option('--output', type=click.Choice(['json', 'yaml', 'raw_content']), default='json', show_default=True, help='Output format. "raw_content" outputs only the text content.')
+@click.option('--no-cache', is_flag=True, help='Bypass the local full-text cache and always fetch from Zotero.')
 @click.pass_context
-def get_fulltext(ctx, item_key, output):
-    """Retrieve full-text content for a specific attachment item."""
+def get_fulltext(ctx, item_key, output, no_cache):
+    """Retrieve full-text content for a specific attachment item.
+
+    Content is read through a compressed local cache (see 'fulltext cache'). Before a
+    cached copy is used, one lightweight request checks whether the item's full-text
+    changed since it was cached.
+    """
     zot_instance = ctx.obj['zot']
     try:
-        data = zot_instance.fulltext_item(item_key)
+        if no_cache:
+            data = zot_instance.fulltext_item(item_key)
+        else:
+            library_key = library_cache_key(zot_instance)
+            with _open_fulltext_cache(zot_instance) as cache:
+                data = cache.get(library_key, item_key)
+                if data is None:
+                    data = zot_instance.fulltext_item(item_key)
+                    cache.put(library_key, item_key, cache.checked_version(library_key), data)
 
         if output == 'raw_content':
             content = data.get('content', '')
@@ -73,38 +182,17 @@ def set_fulltext(ctx, item_key, payload_json_input):
     or for text docs: '{"content": "...", "indexedChars": 1000, "totalChars": 1000}'.
     """
     zot_instance = ctx.obj['zot']
-    
-    if ctx.obj.get('LOCAL', False):
-        click.echo("Warning: Attempting 'set' fulltext with local Zotero. This may fail (read-only).", err=True)
-        if not ctx.obj.get('NO_INTERACTION', False) and not click.confirm("Proceed anyway?"):
-            ctx.abort()
+    _warn_local_write(ctx, 'set')
 
     try:
         # Parse JSON input (either file path or JSON string)
         payload_dict = parse_json_input(payload_json_input, "Full-text payload")
-        
-        if not isinstance(payload_dict, dict):
-            raise create_click_exception(
-                description="Invalid payload format",
-                details="Parsed payload is not a JSON object (dictionary)"
-            )
-        
-        if "content" not in payload_dict:
-            raise create_click_exception(
-                description="Invalid payload format",
-                details="Payload must have a 'content' key"
-            )
-        
-        has_pages = "indexedPages" in payload_dict and "totalPages" in payload_dict
-        has_chars = "indexedChars" in payload_dict and "totalChars" in payload_dict
 
-        if not (has_pages or has_chars):
-            raise create_click_exception(
-                description="Incomplete payload format",
-                details="Payload needs ('indexedPages' & 'totalPages') OR ('indexedChars' & 'totalChars')"
-            )
-        if has_pages and has_chars:
-            click.echo("Warning: Payload has both page and char counts. Behavior may vary.", err=True)
+        error, warning = _check_fulltext_payload(payload_dict)
+        if error:
+            raise create_click_exception(description=error[0], details=error[1])
+        if warning:
+            click.echo(f"Warning: {warning}", err=True)
 
         success = zot_instance.set_fulltext(item_key, payload_dict)
         if success:
@@ -120,3 +208,229 @@ def set_fulltext(ctx, item_key, payload_json_input):
         handle_zotero_exceptions_and_exit(ctx, e)
 
 
+@fulltext_group.command("set-batch")
+@click.argument("input_file", type=click.File('r', encoding='utf-8'), default='-')
+@click.option('--report', 'report_file', type=click.File('w', encoding='utf-8'), help='Write a per-key NDJSON result report to this file ("-" for stdout).')
+@click.option('--workers', type=click.IntRange(1, 32), default=4, show_default=True, help='Number of concurrent upload requests.')
+@click.option('--rate', type=click.FloatRange(min=0), default=0, show_default=True, help='Maximum requests per second across all workers (0 for no limit).')
+@click.pass_context
+def set_batch_fulltext(ctx, input_file, report_file, workers, rate):
+    """Set full-text data for many attachment items from NDJSON.
+
+    INPUT_FILE (default: stdin) holds one JSON object per line with a 'key' field plus
+    the same payload fields as 'fulltext set'. Records are read and uploaded as a stream,
+    so only a bounded number of payloads is held in memory at once. Invalid records are
+    reported and skipped; the command exits 1 if any record was not set.
+    """
+    zot_instance = ctx.obj['zot']
+    _warn_local_write(ctx, 'set-batch')
+
+    get_client = thread_local_client_factory(ctx, zot_instance)
+    limiter = RateLimiter(rate)
+    counts = {"ok": 0, "invalid": 0, "error": 0}
+
+    def report(line_no, item_key, status, message=None):
+        counts[status] += 1
+        if status != "ok":
+            click.echo(f"Warning: Line {line_no} ({item_key or 'no key'}): {message}", err=True)
+        if report_file:
+            entry = {"line": line_no, "key": item_key, "status": status}
+            if message:
+                entry["message"] = message
+            report_file.write(json.dumps(entry) + "\n")
+
+    def valid_records():
+        for line_no, line in enumerate(input_file, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                report(line_no, None, "invalid", f"Invalid JSON: {e}")
+                continue
+            item_key = record.pop("key", None) if isinstance(record, dict) else None
+            if not item_key:
+                report(line_no, None, "invalid", "Record must be a JSON object with a 'key' field")
+                continue
+            error, warning = _check_fulltext_payload(record)
+            if error:
+                report(line_no, item_key, "invalid", f"{error[0]}: {error[1]}")
+                continue
+            if warning:
+                click.echo(f"Warning: Line {line_no} ({item_key}): {warning}", err=True)
+            yield line_no, item_key, record
+
+    def upload(entry):
+        _, item_key, payload = entry
+        limiter.wait()
+        return get_client().set_fulltext(item_key, payload)
+
+    for (line_no, item_key, _), _, error in map_concurrently(upload, valid_records(), max_workers=workers):
+        if error is not None:
+            report(line_no, item_key, "error", str(error) or type(error).__name__)
+        else:
+            report(line_no, item_key, "ok")
+
+    click.echo(
+        f"Set full-text for {counts['ok']} item(s); {counts['invalid']} invalid record(s), {counts['error']} failed request(s).",
+        err=True
+    )
+    if counts['invalid'] or counts['error']:
+        ctx.exit(1)
+
+
+@fulltext_group.command("dump")
+@click.option('--since', type=int, help='Library version to dump changes since. Defaults to the version stored by the previous dump (0 on first run).')
+@click.option('--full', is_flag=True, help='Ignore the stored high-water mark and dump all full-text content.')
+@click.option('--output-dir', type=click.Path(file_okay=False), help='Write one <ITEM_KEY>.json file per attachment instead of NDJSON to stdout.')
+@click.option('--workers', type=click.IntRange(1, 256), default=16, show_default=True, help='Number of concurrent full-text requests (capped by --max-concurrency).')
+@click.option('--no-save-state', is_flag=True, help='Do not update the stored high-water mark after the dump.')
+@click.pass_context
+def dump_fulltext(ctx, since, full, output_dir, workers, no_save_state):
+    """Dump full-text content changed since a library version.
+
+    Changed attachments are found with a single 'new fulltext' request, their content is
+    fetched concurrently and streamed as NDJSON (one object per line, with 'key' and
+    'version' added) or written to one file per key. The library version at the start of
+    the dump is stored so the next run only fetches deltas.
+    """
+    zot_instance = ctx.obj['zot']
+    if since is not None and full:
+        raise click.UsageError('Cannot use --since and --full simultaneously.')
+
+    state = load_cache_json(FULLTEXT_STATE_FILE)
+    library_key = library_cache_key(zot_instance)
+    if full:
+        since = 0
+    elif since is None:
+        since = state.get(library_key, {}).get('dump_version', 0)
+
+    try:
+        library_version, results = _iter_changed_fulltext(ctx, zot_instance, since, workers)
+    except Exception as e:
+        handle_zotero_exceptions_and_exit(ctx, e)
+
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    dumped = 0
+    failures = 0
+    for item_key, version, data, error in results:
+        if error is not None:
+            failures += 1
+            click.echo(f"Warning: Could not fetch full-text for item '{item_key}': {error}", err=True)
+            continue
+        record = {"key": item_key, "version": version, **(data or {})}
+        if output_dir:
+            with open(os.path.join(output_dir, f"{item_key}.json"), 'w', encoding='utf-8') as f:
+                json.dump(record, f, ensure_ascii=False)
+        else:
+            click.echo(json.dumps(record, ensure_ascii=False))
+        dumped += 1
+
+    click.echo(f"Dumped {dumped} full-text item(s) changed since version {since} (library version {library_version}).", err=True)
+
+    if failures:
+        # Keep the old high-water mark so the failed keys are retried next time
+        click.echo(f"Error: {failures} full-text item(s) could not be fetched. Stored version not updated.", err=True)
+        ctx.exit(1)
+
+    if not no_save_state:
+        state.setdefault(library_key, {})['dump_version'] = library_version
+        save_cache_json(FULLTEXT_STATE_FILE, state)
+
+
+@fulltext_group.command("index")
+@click.option('--rebuild', is_flag=True, help='Discard the existing index for this library and rebuild it from scratch.')
+@click.option('--workers', type=click.IntRange(1, 256), default=16, show_default=True, help='Number of concurrent full-text requests (capped by --max-concurrency).')
+@click.pass_context
+def index_fulltext(ctx, rebuild, workers):
+    """Build or update the local full-text search index.
+
+    The index is a SQLite FTS5 database in the zotcli cache directory. Each run only
+    fetches content that changed since the library version stored by the previous run,
+    and drops attachments that were deleted from the library.
+    """
+    zot_instance = ctx.obj['zot']
+    library_key = library_cache_key(zot_instance)
+    try:
+        with FullTextIndex(get_cache_path(INDEX_FILE_NAME)) as index:
+            if rebuild:
+                index.clear(library_key)
+            since = index.library_version(library_key)
+
+            library_version, results = _iter_changed_fulltext(ctx, zot_instance, since, workers)
+            indexed = 0
+            failures = 0
+            for item_key, version, data, error in results:
+                if error is not None:
+                    failures += 1
+                    click.echo(f"Warning: Could not fetch full-text for item '{item_key}': {error}", err=True)
+                    continue
+                content = (data or {}).get('content')
+                if not isinstance(content, str):
+                    continue
+                index.upsert(library_key, item_key, version, content)
+                indexed += 1
+
+            removed = 0
+            if since:
+                deleted_keys = (zot_instance.deleted(since=since) or {}).get('items', [])
+                removed = index.remove(library_key, deleted_keys)
+            index.commit()
+
+            if not failures:
+                index.set_library_version(library_key, library_version)
+            total = index.count(library_key)
+    except FullTextIndexError as e:
+        raise create_click_exception(description="Full-text index unavailable", details=str(e))
+    except Exception as e:
+        handle_zotero_exceptions_and_exit(ctx, e)
+
+    click.echo(f"Indexed {indexed} item(s), removed {removed}. Index holds {total} item(s) at library version {library_version}.")
+    if failures:
+        click.echo(f"Error: {failures} full-text item(s) could not be fetched. They will be retried on the next run.", err=True)
+        ctx.exit(1)
+
+@fulltext_group.command("search")
+@click.argument("query")
+@click.option('--limit', type=click.IntRange(min=1), default=20, show_default=True, help='Maximum number of results.')
+@click.option('--output', type=click.Choice(['json', 'yaml', 'table', 'keys']), default='json', show_default=True, help='Output format.')
+@click.pass_context
+def search_fulltext(ctx, query, limit, output):
+    """Search the local full-text index (see 'fulltext index').
+
+    QUERY uses SQLite FTS5 syntax: words, "exact phrases", prefix* terms, AND/OR/NOT
+    and NEAR(). Results are ranked by BM25 and include a snippet around the match.
+    """
+    zot_instance = ctx.obj['zot']
+    library_key = library_cache_key(zot_instance)
+    try:
+        with FullTextIndex(get_cache_path(INDEX_FILE_NAME)) as index:
+            if not index.library_version(library_key) and not index.count(library_key):
+                raise create_click_exception(
+                    description="The full-text index for this library is empty",
+                    hint="Run 'zot fulltext index' first"
+                )
+            results = index.search(library_key, query, limit=limit)
+    except FullTextIndexError as e:
+        raise create_click_exception(description="Full-text search failed", details=str(e))
+
+    if output == 'table':
+        click.echo(format_data_for_output(results, output, table_headers_map=SEARCH_RESULT_HEADERS))
+    else:
+        click.echo(format_data_for_output(results, output))
+
+@fulltext_group.command("cache")
+@click.option('--clear', is_flag=True, help='Remove every cached full-text payload.')
+@click.option('--output', type=click.Choice(['json', 'yaml']), default='json', show_default=True, help='Output format.')
+def cache_fulltext(clear, output):
+    """Show (or clear) the local full-text cache used by 'fulltext get'.
+
+    The cache size is capped by ZOTCLI_FULLTEXT_CACHE_MB (default 512); the least
+    recently read payloads are evicted first.
+    """
+    with FullTextCache(get_cache_path(CACHE_DIR_NAME)) as cache:
+        if clear:
+            cache.clear()
+        click.echo(format_data_for_output(cache.stats(), output))
@@ -0,0 +1,142 @@
+import sqlite3
+from typing import Any, Iterable
+
+
+INDEX_FILE_NAME = "fulltext_index.sqlite"
+SNIPPET_TOKENS = 12
+
+
+class FullTextIndexError(Exception):
+    """Raised when the local full-text index cannot be opened or queried."""
+
+
+class FullTextIndex:
+    """On-disk SQLite FTS5 index of Zotero full-text content.
+
+    Documents are stored per library (see utils.library_cache_key) together with the
+    full-text version they were indexed at, and the library version the index is
+    current to is kept so updates can be fetched incrementally with new_fulltext().
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        try:
+            self.conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS libraries (
+                    library TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS documents (
+                    docid INTEGER PRIMARY KEY,
+                    library TEXT NOT NULL,
+                    item_key TEXT NOT NULL,
+                    version INTEGER,
+                    UNIQUE (library, item_key)
+                );
+                CREATE VIRTUAL TABLE IF NOT EXISTS fulltext USING fts5(
+                    content,
+                    tokenize = 'porter unicode61'
+                );
+                """
+            )
+        except sqlite3.OperationalError as exc:
+            self.conn.close()
+            raise FullTextIndexError(f"Could not open full-text index at '{path}': {exc}") from exc
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "FullTextIndex":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def library_version(self, library: str) -> int:
+        """Return the library version the index is current to (0 if never indexed)."""
+        row = self.conn.execute("SELECT version FROM libraries WHERE library = ?", (library,)).fetchone()
+        return row[0] if row else 0
+
+    def set_library_version(self, library: str, version: int) -> None:
+        self.conn.execute(
+            "INSERT INTO libraries (library, version) VALUES (?, ?) "
+            "ON CONFLICT (library) DO UPDATE SET version = excluded.version",
+            (library, version),
+        )
+        self.conn.commit()
+
+    def upsert(self, library: str, item_key: str, version: int | None, content: str) -> None:
+        """Add or replace the indexed content of one attachment."""
+        row = self.conn.execute(
+            "SELECT docid FROM documents WHERE library = ? AND item_key = ?", (library, item_key)
+        ).fetchone()
+        if row:
+            docid = row[0]
+            self.conn.execute("DELETE FROM fulltext WHERE rowid = ?", (docid,))
+            self.conn.execute("UPDATE documents SET version = ? WHERE docid = ?", (version, docid))
+        else:
+            cursor = self.conn.execute(
+                "INSERT INTO documents (library, item_key, version) VALUES (?, ?, ?)", (library, item_key, version)
+            )
+            docid = cursor.lastrowid
+        self.conn.execute("INSERT INTO fulltext (rowid, content) VALUES (?, ?)", (docid, content))
+
+    def remove(self, library: str, item_keys: Iterable[str]) -> int:
+        """Remove documents for the given keys. Returns the number removed."""
+        removed = 0
+        for item_key in item_keys:
+            row = self.conn.execute(
+                "SELECT docid FROM documents WHERE library = ? AND item_key = ?", (library, item_key)
+            ).fetchone()
+            if row:
+                self.conn.execute("DELETE FROM fulltext WHERE rowid = ?", (row[0],))
+                self.conn.execute("DELETE FROM documents WHERE docid = ?", (row[0],))
+                removed += 1
+        return removed
+
+    def clear(self, library: str) -> None:
+        """Drop every document and the stored version for a library."""
+        self.conn.execute(
+            "DELETE FROM fulltext WHERE rowid IN (SELECT docid FROM documents WHERE library = ?)", (library,)
+        )
+        self.conn.execute("DELETE FROM documents WHERE library = ?", (library,))
+        self.conn.execute("DELETE FROM libraries WHERE library = ?", (library,))
+        self.conn.commit()
+
+    def commit(self) -> None:
+        self.conn.commit()
+
+    def count(self, library: str) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM documents WHERE library = ?", (library,)).fetchone()[0]
+
+    def search(self, library: str, query: str, limit: int = 20) -> list[dict[str, Any]]:
+        """Return documents matching an FTS5 query, best BM25 score first.
+
+        If the query is not valid FTS5 syntax, each whitespace-separated term is
+        quoted and the search retried, so plain text with punctuation still works.
+        """
+        try:
+            return self._search(library, query, limit)
+        except sqlite3.OperationalError:
+            quoted = " ".join('"{}"'.format(term.replace('"', '""')) for term in query.split())
+            try:
+                return self._search(library, quoted, limit)
+            except sqlite3.OperationalError as exc:
+                raise FullTextIndexError(f"Invalid full-text query '{query}': {exc}") from exc
+
+    def _search(self, library: str, query: str, limit: int) -> list[dict[str, Any]]:
+        rows = self.conn.execute(
+            "SELECT d.item_key, d.version, bm25(fulltext) AS score, "
+            f"snippet(fulltext, 0, '[', ']', '...', {SNIPPET_TOKENS}) "
+            "FROM fulltext JOIN documents d ON d.docid = fulltext.rowid "
+            "WHERE fulltext MATCH ? AND d.library = ? "
+            "ORDER BY score LIMIT ?",
+            (query, library, limit),
+        ).fetchall()
+        # bm25() is lower-is-better; flip the sign so larger scores rank higher for users
+        return [
+            {"key": key, "version": version, "score": round(-score, 4), "snippet": snippet}
+            for key, version, score, snippet in rows
+        ]
@@ -0,0 +1,300 @@
+"""HTTP transport wrappers installed on the httpx client inside a pyzotero client.
+
+Pyzotero builds its own httpx client, so extra behaviour is added by wrapping the
+client's transport(s) in place. Clients without an httpx client (e.g. test doubles)
+are left untouched.
+
+Two settings redirect traffic for testing or proxying: ``api_base_url``
+(``ZOTERO_API_BASE_URL``) replaces ``https://api.zotero.org`` as the client's
+endpoint, and ``transport`` (``ZOTCLI_TRANSPORT``) names a ``module:factory``
+callable that receives the client's network transport and returns the transport
+to use instead (e.g. a recording, replaying or caching-proxy transport).
+"""
+import hashlib
+import importlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Callable
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+HTTP_CACHE_FILE = "http_cache.sqlite"
+HTTP_CACHE_ENV_VAR = "ZOTCLI_HTTP_CACHE"
+API_BASE_URL_ENV_VAR = "ZOTERO_API_BASE_URL"
+TRANSPORT_ENV_VAR = "ZOTCLI_TRANSPORT"
+# Bodies above this size (e.g. large exports) are passed through uncached
+MAX_CACHED_BODY_BYTES = 8 * 1024 * 1024
+# Stored responses beyond this many are evicted, least recently stored first
+MAX_CACHED_RESPONSES = 5000
+
+# Headers describing the encoded wire body; cached bodies are stored decoded
+_ENCODING_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+# Throttling headers apply to the response that carried them: never stored, only taken from the live 304
+_PASSTHROUGH_304_HEADERS = {"backoff", "retry-after"}
+
+
+def install_transport_wrapper(zot_client: Any, wrap: Callable[[Any], Any]) -> bool:
+    """Replace every transport of ``zot_client.client`` with ``wrap(transport)``.
+
+    Covers the default transport and any proxy mounts. Returns False (doing nothing)
+    when the object has no httpx client.
+    """
+    http_client = getattr(zot_client, "client", None)
+    if http_client is None or not hasattr(http_client, "_transport"):
+        return False
+    http_client._transport = wrap(http_client._transport)
+    mounts = getattr(http_client, "_mounts", None) or {}
+    for pattern, transport in list(mounts.items()):
+        if transport is not None:
+            mounts[pattern] = wrap(transport)
+    return True
+
+
+def _truthy(value: Any) -> bool:
+    return str(value).strip().lower() in ("1", "true", "yes", "on")
+
+
+def http_cache_enabled(ctx_obj: dict) -> bool:
+    """Resolve the HTTP cache setting: --http-cache/--no-http-cache > ZOTCLI_HTTP_CACHE > profile 'http_cache'."""
+    if ctx_obj.get("HTTP_CACHE") is not None:
+        return bool(ctx_obj["HTTP_CACHE"])
+    env_value = os.environ.get(HTTP_CACHE_ENV_VAR)
+    if env_value is not None:
+        return _truthy(env_value)
+    profile_config = ctx_obj.get("PROFILE_CONFIG") or {}
+    return _truthy(profile_config.get("http_cache", "false"))
+
+
+def resolve_api_base_url(ctx_obj: dict) -> str | None:
+    """Resolve the Web API base URL: ZOTERO_API_BASE_URL > profile 'api_base_url'. None keeps pyzotero's default.
+
+    Raises ValueError for a value that is not an http(s) URL.
+    """
+    profile_config = ctx_obj.get("PROFILE_CONFIG") or {}
+    value = os.environ.get(API_BASE_URL_ENV_VAR) or profile_config.get("api_base_url")
+    if not value:
+        return None
+    value = value.strip().rstrip("/")
+    scheme, netloc = urlsplit(value)[:2]
+    if scheme not in ("http", "https") or not netloc:
+        raise ValueError(f"'{value}' is not an http(s) URL")
+    return value
+
+
+def resolve_transport_spec(ctx_obj: dict) -> str | None:
+    """Resolve the transport hook: ZOTCLI_TRANSPORT > profile 'transport'."""
+    profile_config = ctx_obj.get("PROFILE_CONFIG") or {}
+    return os.environ.get(TRANSPORT_ENV_VAR) or profile_config.get("transport") or None
+
+
+def load_transport_factory(spec: str) -> Callable[[Any], Any]:
+    """Import the ``module:attribute`` callable named by ``spec``.
+
+    Raises ValueError if the spec is malformed, the module cannot be imported or the
+    attribute is missing or not callable.
+    """
+    module_name, _, attribute = spec.strip().partition(":")
+    if not module_name or not attribute:
+        raise ValueError(f"'{spec}' is not of the form 'module:factory'")
+    try:
+        target: Any = importlib.import_module(module_name)
+    except ImportError as exc:
+        raise ValueError(f"cannot import '{module_name}': {exc}") from exc
+    for name in attribute.split("."):
+        target = getattr(target, name, None)
+        if target is None:
+            raise ValueError(f"'{module_name}' has no attribute '{attribute}'")
+    if not callable(target):
+        raise ValueError(f"'{spec}' is not callable")
+    return target
+
+
+def configure_client(zot_client: Any, ctx_obj: dict) -> Any:
+    """Point a new client at the configured API and install the enabled transport wrappers.
+
+    ``ctx_obj['API_BASE_URL']``, ``ctx_obj['TRANSPORT_FACTORY']`` and the --record/--replay
+    ``ctx_obj['CASSETTE']`` are resolved once per run by the main command group.
+    """
+    from . import instrumentation, telemetry
+
+    base_url = ctx_obj.get("API_BASE_URL")
+    if base_url and not ctx_obj.get("LOCAL"):
+        zot_client.endpoint = base_url
+    # Each wrapper wraps the ones installed before it. From the network outward the
+    # stack is: transport hook -> cassette -> tracing -> timing -> HTTP cache.
+    factory = ctx_obj.get("TRANSPORT_FACTORY")
+    if factory:
+        # Closest to the network: it replaces (or wraps) it, everything else sits above it
+        install_transport_wrapper(zot_client, factory)
+    cassette = ctx_obj.get("CASSETTE")
+    if cassette is not None:
+        from .cassette import transport_factory
+
+        # Directly above the hook, so recordings hold what the server (or hook) actually sent
+        install_transport_wrapper(zot_client, transport_factory(cassette))
+    if telemetry.enabled():
+        # Above the cassette and below the cache, so a revalidated cache hit is traced as a 304
+        install_transport_wrapper(zot_client, telemetry.TracingTransport)
+    if instrumentation.enabled():
+        # Also below the cache (a cache hit shows as a 304), but above the cassette: with
+        # --replay the latencies are those of cassette playback, not of the network
+        install_transport_wrapper(zot_client, instrumentation.TimingTransport)
+    if http_cache_enabled(ctx_obj):
+        from .utils import get_cache_path
+
+        # Outermost: pyzotero gets the stored body instead of a 304, the layers below see the 304
+        cache_path = get_cache_path(HTTP_CACHE_FILE)
+        install_transport_wrapper(zot_client, lambda inner: ConditionalCacheTransport(inner, cache_path))
+    return zot_client
+
+
+class ConditionalCacheTransport:
+    """Transport that revalidates repeated GETs with If-Modified-Since-Version.
+
+    Successful responses carrying a Last-Modified-Version header are stored in SQLite,
+    keyed by URL, sorted query parameters and a hash of the API key. Repeat requests
+    are sent with If-Modified-Since-Version; a 304 answer is turned into a 200 with
+    the stored body and headers, so pyzotero handles it like a fresh response.
+    At most ``max_entries`` responses are kept; storing more evicts the oldest.
+    """
+
+    def __init__(self, inner: Any, path: str, max_entries: int = MAX_CACHED_RESPONSES):
+        self.inner = inner
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                cache_key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                stored_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_stored_at ON responses (stored_at)")
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def cache_key(request: Any) -> str:
+        scheme, netloc, path, query, _ = urlsplit(str(request.url))
+        normalized = urlunsplit((scheme, netloc, path, urlencode(sorted(parse_qsl(query, keep_blank_values=True))), ""))
+        credential = request.headers.get("zotero-api-key") or request.headers.get("authorization") or ""
+        digest = hashlib.sha256(f"{request.method} {normalized}\n{credential}".encode("utf-8")).hexdigest()
+        return digest
+
+    @staticmethod
+    def _cacheable_request(request: Any) -> bool:
+        if request.method != "GET" or "if-modified-since-version" in request.headers:
+            return False
+        # Attachment downloads are large, unversioned and already cached by the user on disk
+        return "/file" not in urlsplit(str(request.url)).path
+
+    def _lookup(self, cache_key: str) -> tuple[int, dict, bytes] | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version, headers, body FROM responses WHERE cache_key = ?", (cache_key,)
+            ).fetchone()
+        if not row:
+            return None
+        version, headers, body = row
+        try:
+            return version, json.loads(headers), zlib.decompress(body)
+        except (ValueError, zlib.error):
+            return None
+
+    def _store(self, cache_key: str, url: str, version: int, headers: dict, body: bytes) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (cache_key, url, version, headers, body, stored_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (cache_key, url, version, json.dumps(headers), zlib.compress(body), time.time()),
+            )
+            self._conn.execute(
+                "DELETE FROM responses WHERE cache_key IN "
+                "(SELECT cache_key FROM responses ORDER BY stored_at DESC, rowid DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def _prepare(self, request: Any) -> tuple[str, tuple[int, dict, bytes] | None]:
+        cache_key = self.cache_key(request)
+        cached = self._lookup(cache_key)
+        if cached:
+            request.headers["If-Modified-Since-Version"] = str(cached[0])
+        return cache_key, cached
+
+    def _serve_cached(self, request: Any, response: Any, cached: tuple[int, dict, bytes]) -> Any:
+        self.hits += 1
+        _, headers, body = cached
+        headers = dict(headers)
+        for name, value in response.headers.items():
+            if name.lower() in _PASSTHROUGH_304_HEADERS:
+                headers[name] = value
+        return type(response)(200, headers=headers, content=body, request=request)
+
+    @staticmethod
+    def _storable(response: Any) -> bool:
+        version = response.headers.get("last-modified-version")
+        return response.status_code == 200 and bool(version) and version.isdigit()
+
+    def _store_response(self, request: Any, cache_key: str, response: Any, body: bytes) -> Any:
+        if len(body) > MAX_CACHED_BODY_BYTES:
+            return response
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in _ENCODING_HEADERS}
+        stored = {k: v for k, v in headers.items() if k.lower() not in _PASSTHROUGH_304_HEADERS}
+        version = int(response.headers["last-modified-version"])
+        self._store(cache_key, str(request.url), version, stored, body)
+        # The wire body has been consumed and decoded; hand back an equivalent response
+        return type(response)(200, headers=headers, content=body, request=request)
+
+    def handle_request(self, request: Any) -> Any:
+        if not self._cacheable_request(request):
+            return self.inner.handle_request(request)
+        cache_key, cached = self._prepare(request)
+        response = self.inner.handle_request(request)
+        if response.status_code == 304 and cached:
+            response.close()
+            return self._serve_cached(request, response, cached)
+        self.misses += 1
+        if self._storable(response):
+            return self._store_response(request, cache_key, response, response.read())
+        return response
+
+    async def handle_async_request(self, request: Any) -> Any:
+        if not self._cacheable_request(request):
+            return await self.inner.handle_async_request(request)
+        cache_key, cached = self._prepare(request)
+        response = await self.inner.handle_async_request(request)
+        if response.status_code == 304 and cached:
+            await response.aclose()
+            return self._serve_cached(request, response, cached)
+        self.misses += 1
+        if self._storable(response):
+            return self._store_response(request, cache_key, response, await response.aread())
+        return response
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+        self.inner.close()
+
+    async def aclose(self) -> None:
+        with self._lock:
+            self._conn.close()
+        await self.inner.aclose()
+
+    def __enter__(self) -> "ConditionalCacheTransport":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
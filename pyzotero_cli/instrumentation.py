@@ -0,0 +1,198 @@
+"""Lightweight timing instrumentation for a single CLI run.
+
+Phases (import, load_config, client, command, format) and every HTTP request
+(method, URL, status, latency, bytes) are recorded once instrumentation is enabled
+with ``zot --timings`` or the ``ZOTCLI_TRACE_FILE`` environment variable. At the end
+of the run a summary is printed to stderr (--timings) and/or a JSON trace is written
+to the trace file. When disabled, every hook is a cheap no-op.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Iterator
+from urllib.parse import urlsplit
+
+import click
+
+TRACE_FILE_ENV_VAR = "ZOTCLI_TRACE_FILE"
+# Set when pyzotero_cli.zot_cli starts importing, so the import phase can be measured
+PROCESS_MARK = time.perf_counter()
+
+
+class Recorder:
+    """Collects phase durations and HTTP request records (thread-safe)."""
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.runs = 0
+        self.started = PROCESS_MARK
+        self.phases: dict[str, float] = {}
+        self.requests: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.enabled = False
+            self.phases = {}
+            self.requests = []
+
+    def add_phase(self, name: str, seconds: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def add_request(self, record: dict[str, Any]) -> None:
+        with self._lock:
+            self.requests.append(record)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.perf_counter() - start)
+
+    def trace(self) -> dict[str, Any]:
+        with self._lock:
+            requests = list(self.requests)
+            phases = dict(self.phases)
+        return {
+            "total_seconds": round(time.perf_counter() - self.started, 6),
+            "phases": {name: round(seconds, 6) for name, seconds in phases.items()},
+            "http": {
+                "count": len(requests),
+                "seconds": round(sum(r["seconds"] for r in requests), 6),
+                "bytes": sum(r["bytes"] for r in requests),
+            },
+            "requests": requests,
+        }
+
+
+recorder = Recorder()
+
+
+def enabled() -> bool:
+    return recorder.enabled
+
+
+def timed(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator adding a function's run time to phase ``name``."""
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not recorder.enabled:
+                return func(*args, **kwargs)
+            with recorder.phase(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class TimingTransport:
+    """Transport wrapper recording latency, status and size of every request it sends."""
+
+    def __init__(self, inner: Any, rec: Recorder | None = None):
+        self.inner = inner
+        self.recorder = rec or recorder
+
+    def handle_request(self, request: Any) -> Any:
+        start = time.perf_counter()
+        response = self.inner.handle_request(request)
+        length = response.headers.get("content-length")
+        if length is None or not length.isdigit():
+            # Reading here is cheap: pyzotero reads every body in full anyway
+            length = len(response.read())
+        self._record(request, response, start, int(length))
+        return response
+
+    async def handle_async_request(self, request: Any) -> Any:
+        start = time.perf_counter()
+        response = await self.inner.handle_async_request(request)
+        length = response.headers.get("content-length")
+        if length is None or not length.isdigit():
+            length = len(await response.aread())
+        self._record(request, response, start, int(length))
+        return response
+
+    def _record(self, request: Any, response: Any, start: float, length: int) -> None:
+        seconds = time.perf_counter() - start
+        parts = urlsplit(str(request.url))
+        self.recorder.add_request({
+            "method": request.method,
+            "path": parts.path + (f"?{parts.query}" if parts.query else ""),
+            "host": parts.netloc,
+            "status": response.status_code,
+            "seconds": round(seconds, 6),
+            "bytes": length,
+            "start": round(start - self.recorder.started, 6),
+        })
+
+    def close(self) -> None:
+        self.inner.close()
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+    def __enter__(self) -> "TimingTransport":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def _size(num_bytes: int) -> str:
+    for unit in ("B", "KB", "MB"):
+        if num_bytes < 1024 or unit == "MB":
+            return f"{num_bytes:.0f} {unit}" if unit == "B" else f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes} B"
+
+
+def format_summary(trace: dict[str, Any], max_requests: int = 20) -> str:
+    lines = [f"Timings (total {trace['total_seconds']:.3f}s):"]
+    for name, seconds in trace["phases"].items():
+        lines.append(f"  {name:<12} {seconds:8.3f}s")
+    http = trace["http"]
+    lines.append(f"HTTP: {http['count']} request(s), {http['seconds']:.3f}s, {_size(http['bytes'])}")
+    slowest = sorted(trace["requests"], key=lambda r: r["seconds"], reverse=True)[:max_requests]
+    for r in slowest:
+        lines.append(f"  {r['method']:<6} {r['status']}  {r['seconds']:7.3f}s  {_size(r['bytes']):>9}  {r['path']}")
+    if len(trace["requests"]) > max_requests:
+        lines.append(f"  ... {len(trace['requests']) - max_requests} faster request(s) not shown")
+    return "\n".join(lines)
+
+
+def start(print_summary: bool) -> Callable[[], None] | None:
+    """Enable recording for this run. Returns the callback that reports at exit, or None if disabled."""
+    trace_file = os.environ.get(TRACE_FILE_ENV_VAR)
+    if not print_summary and not trace_file:
+        return None
+    recorder.enabled = True
+    recorder.runs += 1
+    if recorder.runs == 1:
+        recorder.add_phase("import", time.perf_counter() - PROCESS_MARK)
+    else:
+        # Later runs in the same process (e.g. tests) have nothing left to import
+        recorder.started = time.perf_counter()
+
+    def report() -> None:
+        trace = recorder.trace()
+        if print_summary:
+            click.echo(format_summary(trace), err=True)
+        if trace_file:
+            try:
+                with open(trace_file, "w", encoding="utf-8") as f:
+                    json.dump(trace, f, indent=2)
+            except OSError as exc:
+                click.echo(f"Warning: could not write trace file '{trace_file}': {exc}", err=True)
+        recorder.reset()
+
+    return report
@@ -1,12 +1,17 @@
 import click
+from . import aio
 from . import doi as doi_utils
+from . import schema
+from .bulk import WRITE_BATCH_SIZE, batched_update, chunked
 from .utils import (
     common_options, format_data_for_output, prepare_api_params,
     output_option, pagination_options, sorting_options, filtering_options, versioning_option,
     deleted_items_options, handle_zotero_exceptions_and_exit,
     create_click_exception, check_batch_operation_results, initialize_zotero_client
 )
+from .fanout import echo_fanned_out, library_fanout_options, resolve_libraries
 from pyzotero.zotero_errors import PyZoteroError, HTTPError, ResourceNotFoundError, PreConditionFailedError
+import csv
 import json
 import os
 
@@ -18,6 +23,8 @@ DOI_OUTPUT_HEADERS = [
     ("Error", "error"),
 ]
 AI_AGENT_TAG = "Added by AI Agent"
+# items get outputs whose JSON responses can be fetched in chunks and merged
+CONCURRENT_GET_OUTPUTS = ('json', 'yaml', 'table', 'keys')
 
 
 def _extract_created_item_info(create_response):
@@ -54,9 +61,15 @@ def item_group(ctx):
 @sorting_options(entity_type='item')
 @filtering_options
 @versioning_option
+@library_fanout_options
 @click.pass_context
-def item_list(ctx, top, publications, trash, deleted, limit, start, since, sort, direction, output, query, qmode, filter_tags, filter_item_type):
-    """List items in the Zotero library."""
+def item_list(ctx, top, publications, trash, deleted, limit, start, since, sort, direction, output, query, qmode, filter_tags, filter_item_type,
+              all_groups, libraries_spec, library_workers):
+    """List items in the Zotero library.
+
+    With --all-groups or --libraries the same listing runs against several
+    libraries concurrently and the merged results carry their 'library'.
+    """
     if deleted and not since:
         raise click.UsageError('The --deleted flag requires the --since option to be set.')
     
@@ -79,28 +92,55 @@ def item_list(ctx, top, publications, trash, deleted, limit, start, since, sort,
             # Keep only 'since' parameter for deleted items
             api_params = {'since': since} if since else {}
 
-    try:
+    def fetch(client):
         if top:
-            results = zot_client.top(**api_params)
+            return client.top(**api_params)
         elif publications:
-            if zot_client.library_type != 'user':
+            if client.library_type != 'user':
                 raise click.UsageError('--publications can only be used with a user library.')
-            results = zot_client.publications(**api_params)
+            return client.publications(**api_params)
         elif trash:
-            results = zot_client.trash(**api_params)
+            return client.trash(**api_params)
         elif deleted:
             # 'deleted' in Pyzotero typically returns more than just items (collections, tags etc.)
             # The spec implies this is for items. Pyzotero's zot.deleted() takes 'since'.
             # It's fine, it will list deleted items among other things.
-            results = zot_client.deleted(since=since) # 'since' is mandatory and already checked. Other params might not apply.
+            return client.deleted(since=since) # 'since' is mandatory and already checked. Other params might not apply.
         else:
-            results = zot_client.items(**api_params)
+            return client.items(**api_params)
+
+    try:
+        libraries = resolve_libraries(ctx, zot_client, all_groups, libraries_spec)
+        if libraries is not None:
+            if deleted:
+                raise click.UsageError('--deleted cannot be combined with --all-groups or --libraries.')
+            # Whole-library listings across many libraries are held as compact records until printed
+            echo_fanned_out(ctx, libraries, fetch, library_workers, output, 'item', compact_items=True)
+            return
+        results = fetch(zot_client)
         click.echo(format_data_for_output(results, output, preset_key='item'))
     except PyZoteroError as e:
         handle_zotero_exceptions_and_exit(ctx, e)
     except Exception as e:
         handle_zotero_exceptions_and_exit(ctx, e)
 
+def _get_items_concurrently(ctx, zot_client, item_keys, api_params):
+    """Fetch items in itemKey chunks of WRITE_BATCH_SIZE concurrently, returned in the order requested."""
+    engine = aio.get_engine(ctx)
+    unique_keys = list(dict.fromkeys(item_keys))
+
+    def fetch(chunk):
+        params = {**api_params, 'itemKey': ','.join(chunk), 'limit': len(chunk)}
+        return engine.zotero_get(zot_client, '/items', params)
+
+    by_key = {}
+    for _, items, error in engine.map(fetch, chunked(unique_keys, WRITE_BATCH_SIZE)):
+        if error is not None:
+            raise error
+        by_key.update((item.get('key'), item) for item in items)
+    return [by_key[key] for key in unique_keys if key in by_key]
+
+
 @item_group.command(name="get")
 @click.argument('item_key_or_id', nargs=-1, required=True)
 @common_options # For output formatting mostly, some params might be usable by item()/get_subset() e.g. 'format', 'style', 'content'
@@ -131,6 +171,8 @@ def item_get(ctx, item_key_or_id, limit, start, since, sort, direction, output,
     try:
         if len(item_key_or_id) == 1:
             results = zot_client.item(item_key_or_id[0], **api_params)
+        elif output in CONCURRENT_GET_OUTPUTS and aio.supports(zot_client):
+            results = _get_items_concurrently(ctx, zot_client, item_key_or_id, api_params)
         else:
             # Pyzotero's get_subset is for non-adjacent items, up to 50.
             # Or we can loop zot_client.item()
@@ -239,13 +281,19 @@ def item_versions(ctx, since_version, output_format):
 @click.option('--template', 'template_type', help='Item type to use as a template (e.g., book, journalArticle).')
 @click.option('--field', 'fields', multiple=True, type=(str, str), help='Set a field for the item (e.g., --field title "My Book"). Use for simple fields if using --template.')
 @click.option('--parent-id', 'parent_item_id', help='ID of the parent item for this new item (usually for notes/attachments).') # Renamed
+@click.option('--validate-only', is_flag=True, help='Check the item(s) against the Zotero schema and report problems without creating anything.')
 # --last-modified is not applicable for create_items in Pyzotero, removing it based on typical API behavior
 # @click.option('--last-modified', 'last_modified_version', help='If-Unmodified-Since-Version header value.')
 @common_options # Added common options (includes output)
 @click.pass_context
 # Added output param from common_options (others like limit, start etc. are unused but harmless here)
-def item_create(ctx, from_json_input, template_type, fields, parent_item_id, limit, start, since, sort, direction, output, query, qmode, filter_tags, filter_item_type):
-    """Create new Zotero item(s)."""
+def item_create(ctx, from_json_input, template_type, fields, parent_item_id, validate_only, limit, start, since, sort, direction, output, query, qmode, filter_tags, filter_item_type):
+    """Create new Zotero item(s).
+
+    Every item is validated locally against the Zotero schema (fields, creator types,
+    tags and collections) before anything is sent; if any item is invalid, the
+    per-item errors are printed and nothing is created.
+    """
     if from_json_input and template_type:
         raise click.UsageError('Cannot use --from-json and --template simultaneously.')
     if not from_json_input and not template_type:
@@ -279,46 +327,17 @@ def item_create(ctx, from_json_input, template_type, fields, parent_item_id, lim
 
         elif template_type:
             # Create a template
-            template = zot_client.item_template(template_type)
+            template = schema.item_template(zot_client, template_type)
             if not isinstance(template, dict): # Check if template is a dictionary
                  raise click.ClickException(
                      f"Could not generate a valid item template for type: '{template_type}'. "
                      f"Pyzotero.item_template() call result: {template}"
                  )
 
-            # Apply fields to the template itself
-            if fields:
-                for key, value in fields:
-                    # Creators need special handling if we want to set them via --field
-                    # For now, this handles top-level simple fields in the template.
-                    # e.g., template['title'] = "My Book"
-                    # Complex paths like 'creators.0.firstName' are not handled by this simple loop.
-                    if key == 'parentItem' and parent_item_id: # Special case for parentItem from option
-                        template[key] = parent_item_id
-                    elif key in template or key in getattr(template, 'data', {}): # Check if key is valid for template
-                        template[key] = value
-                    else:
-                        # Optionally, warn or error if a field is not directly settable this way
-                        # For now, we allow attempting to set any field. Pyzotero validation might catch it.
-                        # Or, more strictly, only allow known template fields.
-                        # For maximum flexibility with --field and to match previous behavior of assuming template['data']
-                        # we could try to set it, but it might be better to be strict.
-                        # Let's stick to setting only existing top-level keys for now for safety, or known ones.
-                        # This was template['data'][key], now it's template[key]
-                        # If a user wants to set a deep field, they should use --from-json.
-                        # A simple default: if key exists in template, set it.
-                        if key in template:
-                             template[key] = value
-                        else:
-                             # If we want to be more permissive (like original template['data'][key] attempt)
-                             # we could do template[key] = value anyway.
-                             # For now, let's be a bit more careful and require the key to exist at top-level.
-                             # This change means template['data'][key] implicitly worked because all fields were under 'data'.
-                             # Now, they are at top-level of template.
-                             # The original code template['data'][key] = value was trying to put all fields under a 'data' sub-dict.
-                             # Pyzotero's create_items expects a list of item dicts, where each dict is the template structure.
-                             # So, template[key] = value is correct for top-level fields of the template.
-                             template[key] = value # Allow setting new keys as well, like original did for 'data'
+            # Apply fields to the template itself. Only top-level keys are supported; unknown
+            # keys are reported by the validation below. Deep fields need --from-json.
+            for key, value in fields:
+                template[key] = value
 
             # This was an error: template['data']['parentItem'] = parent_item_id
             # parentItem is a top-level field in the template if it's for a note/attachment.
@@ -330,6 +349,23 @@ def item_create(ctx, from_json_input, template_type, fields, parent_item_id, lim
         if not item_payloads:
             raise click.UsageError("No item data to create.")
 
+        validator = schema.ItemValidator(zot_client)
+        validation_summary = []
+        invalid_count = 0
+        for index, payload in enumerate(item_payloads):
+            problems = validator.errors(payload)
+            if problems:
+                invalid_count += 1
+                validation_summary.append({str(index): f"Error: {'; '.join(problems)}"})
+            elif validate_only:
+                validation_summary.append({str(index): "Valid"})
+        if validate_only or invalid_count:
+            click.echo(format_data_for_output(validation_summary, output, preset_key='item'))
+            if invalid_count:
+                click.echo(f"Error: {invalid_count} of {len(item_payloads)} item(s) failed validation. Nothing was sent.", err=True)
+                ctx.exit(1)
+            return
+
         results = zot_client.create_items(item_payloads) # Expects a list of item templates
         # Use format_data_for_output
         click.echo(format_data_for_output(results, output, preset_key='item'))
@@ -345,11 +381,16 @@ def item_create(ctx, from_json_input, template_type, fields, parent_item_id, lim
 @click.option('--from-json', 'from_json_input', help='Path to a JSON file or a JSON string containing the item data for update.')
 @click.option('--field', 'fields', multiple=True, type=(str, str), help='Set a specific field to update (e.g., --field title "New Title").')
 @click.option('--last-modified', 'last_modified_option', help='If-Unmodified-Since-Version header. Can be a version number or "auto" to use the item\'s current version.')
+@click.option('--validate-only', is_flag=True, help='Check the changed fields against the Zotero schema and report problems without updating.')
 @common_options # Added common options (includes output)
 @click.pass_context
 # Added output param from common_options (others unused but harmless)
-def item_update(ctx, item_key_or_id, from_json_input, fields, last_modified_option, limit, start, since, sort, direction, output, query, qmode, filter_tags, filter_item_type):
-    """Update an existing Zotero item."""
+def item_update(ctx, item_key_or_id, from_json_input, fields, last_modified_option, validate_only, limit, start, since, sort, direction, output, query, qmode, filter_tags, filter_item_type):
+    """Update an existing Zotero item.
+
+    The changed fields are validated locally against the Zotero schema first; an
+    invalid update is reported and not sent.
+    """
     if from_json_input and fields:
         raise click.UsageError('Cannot use --from-json and --field simultaneously.')
     if not from_json_input and not fields:
@@ -414,6 +455,7 @@ def item_update(ctx, item_key_or_id, from_json_input, fields, last_modified_opti
                 
                 new_data_fields = update_data.get('data', update_data) # If JSON is full item or just 'data' part
                 item_to_update['data'].update(new_data_fields) # Merge new fields into existing data
+                changed_keys = list(new_data_fields) if isinstance(new_data_fields, dict) else []
                 if 'version' in update_data: # If user supplied version in JSON, respect it, unless 'auto' was used
                     if not (last_modified_option == 'auto'): # 'auto' takes precedence
                          item_to_update['version'] = update_data['version']
@@ -428,7 +470,22 @@ def item_update(ctx, item_key_or_id, from_json_input, fields, last_modified_opti
                 # Assume simple key-value for data dictionary.
                 # Type conversion might be needed for non-string values.
                 item_to_update['data'][key] = value
-        
+            changed_keys = [key for key, _ in fields]
+
+        # Only the changed keys need checking; the rest came from the server
+        changed_data = {key: item_to_update['data'][key] for key in changed_keys}
+        problems = schema.ItemValidator(zot_client).errors(changed_data, item_type=item_to_update['data'].get('itemType'),
+                                                           linkmode=item_to_update['data'].get('linkMode'))
+        if validate_only or problems:
+            output_data = {"status": "invalid" if problems else "valid", "item_key": item_key_or_id}
+            if problems:
+                output_data["errors"] = problems
+            click.echo(format_data_for_output(output_data, output, preset_key='item'))
+            if problems:
+                click.echo(f"Error: Update for item '{item_key_or_id}' failed validation. Nothing was sent.", err=True)
+                ctx.exit(1)
+            return
+
         # Ensure the item key is present
         item_to_update['key'] = item_key_or_id
 
@@ -444,6 +501,153 @@ def item_update(ctx, item_key_or_id, from_json_input, fields, last_modified_opti
         handle_zotero_exceptions_and_exit(ctx, e)
 
 
+def _fetch_items_by_key(ctx, zot_client, item_keys):
+    """Current items for ``item_keys``, in itemKey chunks of WRITE_BATCH_SIZE (concurrently when possible)."""
+    if aio.supports(zot_client):
+        return _get_items_concurrently(ctx, zot_client, item_keys, {})
+    items = []
+    for batch in chunked(item_keys, WRITE_BATCH_SIZE):
+        items.extend(zot_client.items(itemKey=",".join(batch), limit=WRITE_BATCH_SIZE))
+    return items
+
+
+def _check_patch(item_key, patch):
+    """Return an error message for an invalid update-batch record, or None."""
+    if not item_key or not isinstance(item_key, str):
+        return "Record must have a 'key' field"
+    if not isinstance(patch, dict) or not patch:
+        return "Record must have a non-empty 'patch' object"
+    if 'key' in patch or 'version' in patch:
+        return "A patch cannot change 'key' or 'version'"
+    return None
+
+
+def _read_patch_records(input_file, input_format):
+    """Yield (line_no, key, patch, error) for each record of an update-batch input.
+
+    NDJSON lines are {"key": ..., "patch": {...}} objects. CSV rows have a 'key'
+    column plus either a 'patch' column holding a JSON object, or one column per
+    field (empty cells are left out of the patch).
+    """
+    if input_format == 'csv':
+        reader = csv.DictReader(input_file)
+        for row in reader:
+            item_key = (row.pop('key', None) or '').strip()
+            patch = {name: value for name, value in row.items() if name and value}
+            if 'patch' in patch:
+                try:
+                    patch = json.loads(patch['patch'])
+                except json.JSONDecodeError as e:
+                    yield reader.line_num, item_key or None, None, f"Invalid JSON in 'patch' column: {e}"
+                    continue
+            yield reader.line_num, item_key or None, patch, _check_patch(item_key, patch)
+        return
+    for line_no, line in enumerate(input_file, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, None, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, None, None, "Record must be a JSON object"
+            continue
+        item_key, patch = record.get('key'), record.get('patch')
+        yield line_no, item_key, patch, _check_patch(item_key, patch)
+
+
+@item_group.command(name="update-batch")
+@click.argument('input_file', type=click.File('r', encoding='utf-8'), default='-')
+@click.option('--format', 'input_format', type=click.Choice(['ndjson', 'csv']), help='Input format (default: csv for *.csv files, otherwise ndjson).')
+@click.option('--max-attempts', type=click.IntRange(1, 10), default=3, show_default=True, help='Write attempts per item; only items rejected with 412 (modified since they were read) are retried.')
+@click.pass_context
+def item_update_batch(ctx, input_file, input_format, max_attempts):
+    """Apply field patches to many items from NDJSON or CSV.
+
+    \b
+    INPUT_FILE (default: stdin) holds one record per item:
+      NDJSON: {"key": "ABCD2345", "patch": {"title": "New title"}}
+      CSV:    a 'key' column plus one column per field, or a 'patch' JSON column
+
+    Current versions are read in 50-key chunks, each patch is checked against the
+    Zotero schema, and changes are written in batches of 50 with version checks.
+    Items modified elsewhere in the meantime (412) are read again and retried; no
+    other item is resent. One JSON result per key is printed as soon as it is
+    known. Exits 1 if any record was invalid or any item was not updated.
+    """
+    if ctx.obj.get('LOCAL', False):
+        raise click.UsageError("The 'items update-batch' command is not available with --local.")
+
+    zot_client = ctx.obj['zotero_client']
+    if input_format is None:
+        input_format = 'csv' if str(getattr(input_file, 'name', '')).lower().endswith('.csv') else 'ndjson'
+    counts = {"updated": 0, "unchanged": 0, "invalid": 0, "error": 0}
+    lines = {}
+
+    def emit(item_key, status, message=None):
+        counts[status] += 1
+        entry = {"key": item_key, "status": status}
+        if item_key in lines:
+            entry["line"] = lines[item_key]
+        if message:
+            entry["message"] = message
+        click.echo(json.dumps(entry, ensure_ascii=False))
+
+    # Several records for one key are merged in input order
+    patches = {}
+    for line_no, item_key, patch, error in _read_patch_records(input_file, input_format):
+        if error:
+            counts["invalid"] += 1
+            click.echo(json.dumps({"key": item_key, "line": line_no, "status": "invalid", "message": error}))
+            continue
+        patches.setdefault(item_key, {}).update(patch)
+        lines.setdefault(item_key, line_no)
+
+    try:
+        items = _fetch_items_by_key(ctx, zot_client, list(patches)) if patches else []
+    except Exception as e:
+        handle_zotero_exceptions_and_exit(ctx, e)
+
+    validator = schema.ItemValidator(zot_client)
+    writable = []
+    for item in items:
+        problems = validator.errors(patches[item['key']], item_type=item.get('data', {}).get('itemType'),
+                                   linkmode=item.get('data', {}).get('linkMode'))
+        if problems:
+            emit(item['key'], "invalid", "; ".join(problems))
+        else:
+            writable.append(item)
+    found = {item['key'] for item in items}
+    for item_key in patches:
+        if item_key not in found:
+            emit(item_key, "error", "Item not found")
+
+    def transform(data):
+        changes = {field: value for field, value in patches[data['key']].items() if data.get(field) != value}
+        return changes or None
+
+    def on_result(item_key, status):
+        if status.startswith("Error: "):
+            emit(item_key, "error", status[len("Error: "):])
+        else:
+            emit(item_key, status.lower())
+
+    try:
+        batched_update(zot_client, writable, transform, lambda keys: _fetch_items_by_key(ctx, zot_client, keys),
+                       max_attempts=max_attempts, on_result=on_result)
+    except Exception as e:
+        handle_zotero_exceptions_and_exit(ctx, e)
+
+    click.echo(
+        f"Updated {counts['updated']} item(s); {counts['unchanged']} unchanged, "
+        f"{counts['invalid']} invalid record(s), {counts['error']} failed.",
+        err=True
+    )
+    if counts['invalid'] or counts['error']:
+        ctx.exit(1)
+
+
 @item_group.command(name="delete")
 @click.argument('item_key_or_id', nargs=-1, required=True)
 @click.option('--last-modified', 'last_modified_option', help='If-Unmodified-Since-Version header. Can be a version number or "auto".')
@@ -564,6 +768,21 @@ def item_add_tags(ctx, item_key_or_id, tag_names, limit, start, since, sort, dir
         handle_zotero_exceptions_and_exit(ctx, e)
 
 
+def _fetch_csl_json(ctx, zot_client, dois):
+    """CSL JSON (or the lookup error) for each DOI, fetched concurrently through the async engine."""
+    if not aio.supports(zot_client):
+        fetched = {}
+        for doi in dois:
+            try:
+                fetched[doi] = doi_utils.fetch_csl_json_for_doi(doi)
+            except Exception as e:
+                fetched[doi] = e
+        return fetched
+    engine = aio.get_engine(ctx)
+    return {doi: error or csl_json for doi, csl_json, error in
+            engine.map(lambda doi: doi_utils.fetch_csl_json_for_doi_async(engine, doi), dois)}
+
+
 @item_group.command(name="add-doi")
 @click.argument('dois', nargs=-1, required=True)
 @click.option('--collection', 'collection_key_or_id', help='Collection key or ID to add newly created items to.')
@@ -589,7 +808,9 @@ def item_add_doi(ctx, dois, collection_key_or_id, check_duplicate, output):
         except Exception as e:
             handle_zotero_exceptions_and_exit(ctx, e)
 
+    # Resolve inputs and duplicates first, then fetch the remaining DOIs' metadata concurrently
     results = []
+    to_fetch = []
     for raw_doi in dois:
         result_row = {
             "doi": raw_doi,
@@ -597,6 +818,7 @@ def item_add_doi(ctx, dois, collection_key_or_id, check_duplicate, output):
             "item_key": None,
             "title": "",
         }
+        results.append(result_row)
         try:
             cleaned_doi = doi_utils.clean_doi(raw_doi)
             normalized_doi = doi_utils.normalize_doi(raw_doi)
@@ -611,10 +833,24 @@ def item_add_doi(ctx, dois, collection_key_or_id, check_duplicate, output):
                     result_row["status"] = "exists"
                     result_row["item_key"] = existing_item.get("key")
                     result_row["title"] = existing_item.get("data", {}).get("title", "")
-                    results.append(result_row)
                     continue
+            to_fetch.append((result_row, cleaned_doi, normalized_doi))
+        except Exception as e:
+            result_row["error"] = str(e)
+
+    csl_by_doi = _fetch_csl_json(ctx, zot_client, {cleaned for _, cleaned, _ in to_fetch})
 
-            csl_json = doi_utils.fetch_csl_json_for_doi(cleaned_doi)
+    created_keys = {}
+    for result_row, cleaned_doi, normalized_doi in to_fetch:
+        try:
+            if check_duplicate and normalized_doi in created_keys:
+                # Repeated in the input: the first occurrence created it
+                result_row["status"] = "exists"
+                result_row["item_key"] = created_keys[normalized_doi]
+                continue
+            csl_json = csl_by_doi[cleaned_doi]
+            if isinstance(csl_json, BaseException):
+                raise csl_json
             item_payload = doi_utils.map_csl_json_to_zotero_item(zot_client, csl_json, cleaned_doi)
             if collection_key_or_id:
                 item_payload["collections"] = [collection_key_or_id]
@@ -631,6 +867,7 @@ def item_add_doi(ctx, dois, collection_key_or_id, check_duplicate, output):
             if not created_item_key:
                 raise click.ClickException(f"Failed to create item for DOI '{cleaned_doi}'.")
             doi_utils.cache_item_key_for_doi(zot_client, normalized_doi, created_item_key)
+            created_keys[normalized_doi] = created_item_key
 
             result_row["status"] = "created"
             result_row["item_key"] = created_item_key
@@ -638,7 +875,6 @@ def item_add_doi(ctx, dois, collection_key_or_id, check_duplicate, output):
             result_row["error"] = str(e)
         except Exception as e:
             result_row["error"] = str(e)
-        results.append(result_row)
 
     if output == 'table':
         click.echo(format_data_for_output(results, output, table_headers_map=DOI_OUTPUT_HEADERS))
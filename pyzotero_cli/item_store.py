@@ -0,0 +1,355 @@
+"""Local SQLite copy of a library's items, kept current by library version.
+
+The first sync pages through every item (trashed ones included); later syncs fetch
+only the items changed since the stored version (item_versions(since=...)) and drop
+the ones reported by deleted(). A store that is already at the library's version
+costs a single request.
+
+Besides the raw item JSON, the store keeps the columns and side tables that local
+queries filter on (item type, year, dates, tags, collections, creators), each with
+an index.
+"""
+import json
+import re
+import sqlite3
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator
+
+from .bulk import chunked
+from .utils import get_cache_path, library_cache_key
+
+ITEM_STORE_FILE = "items.sqlite"
+# Bump when the table layout changes; an outdated store is rebuilt from scratch
+SCHEMA_VERSION = 2
+PAGE_SIZE = 100
+# The API accepts at most 50 keys in an itemKey filter
+KEYS_PER_REQUEST = 50
+
+_YEAR_RE = re.compile(r"\b(\d{4})\b")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS libraries (
+    library TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS items (
+    library TEXT NOT NULL,
+    key TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    item_type TEXT NOT NULL,
+    parent TEXT,
+    year INTEGER,
+    date_added TEXT,
+    date_modified TEXT,
+    deleted INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL,
+    PRIMARY KEY (library, key)
+);
+CREATE INDEX IF NOT EXISTS items_type ON items (library, item_type);
+CREATE INDEX IF NOT EXISTS items_year ON items (library, year);
+CREATE INDEX IF NOT EXISTS items_date_added ON items (library, date_added);
+CREATE TABLE IF NOT EXISTS item_tags (
+    library TEXT NOT NULL,
+    key TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    type INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS item_tags_tag ON item_tags (library, tag COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS item_tags_key ON item_tags (library, key);
+CREATE TABLE IF NOT EXISTS item_collections (
+    library TEXT NOT NULL,
+    key TEXT NOT NULL,
+    collection TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS item_collections_collection ON item_collections (library, collection);
+CREATE INDEX IF NOT EXISTS item_collections_key ON item_collections (library, key);
+CREATE TABLE IF NOT EXISTS item_creators (
+    library TEXT NOT NULL,
+    key TEXT NOT NULL,
+    name TEXT NOT NULL,
+    creator_type TEXT
+);
+CREATE INDEX IF NOT EXISTS item_creators_name ON item_creators (library, name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS item_creators_key ON item_creators (library, key);
+"""
+
+_SIDE_TABLES = ("item_tags", "item_collections", "item_creators")
+
+
+def parse_year(date: Any) -> int | None:
+    """First four-digit year in a free-form Zotero date ('May 01, 1980', '08/1993', ...)."""
+    match = _YEAR_RE.search(date) if isinstance(date, str) else None
+    return int(match.group(1)) if match else None
+
+
+def creator_name(creator: dict[str, Any]) -> str:
+    """The name a creator is searched by: 'lastName', or the single-field 'name'."""
+    return (creator.get("lastName") or creator.get("name") or "").strip()
+
+
+@dataclass
+class Clause:
+    """One filter condition of a local query.
+
+    ``index`` returns the keys matching the condition from the store's indexes;
+    ``predicate`` tests a stored item. A clause needs at least one of the two; when
+    both are given, the index narrows the candidates and the predicate decides.
+    """
+    index: Callable[[], set[str]] | None = None
+    predicate: Callable[[dict[str, Any]], bool] | None = None
+    _keys: set[str] | None = None
+
+    def keys(self) -> set[str]:
+        if self._keys is None:
+            self._keys = self.index() if self.index else set()
+        return self._keys
+
+    def matches(self, item: dict[str, Any]) -> bool:
+        if self.index and item["key"] not in self.keys():
+            return False
+        return self.predicate(item) if self.predicate else True
+
+
+class ItemStore:
+    """SQLite-backed item cache shared by all libraries (rows are namespaced by library)."""
+
+    def __init__(self, path: str | None = None):
+        self.path = path or get_cache_path(ITEM_STORE_FILE)
+        self.conn = sqlite3.connect(self.path)
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            for table in ("libraries", "items", *_SIDE_TABLES):
+                self.conn.execute(f"DROP TABLE IF EXISTS {table}")
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "ItemStore":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    # ── Writing ──────────────────────────────────────────────────────────
+
+    def library_version(self, library: str) -> int | None:
+        row = self.conn.execute("SELECT version FROM libraries WHERE library = ?", (library,)).fetchone()
+        return row[0] if row else None
+
+    def _set_library_version(self, library: str, version: int) -> None:
+        self.conn.execute(
+            "INSERT INTO libraries (library, version) VALUES (?, ?) "
+            "ON CONFLICT (library) DO UPDATE SET version = excluded.version",
+            (library, version),
+        )
+
+    def remove(self, library: str, keys: Iterable[str]) -> int:
+        removed = 0
+        for key in keys:
+            for table in _SIDE_TABLES:
+                self.conn.execute(f"DELETE FROM {table} WHERE library = ? AND key = ?", (library, key))
+            removed += self.conn.execute("DELETE FROM items WHERE library = ? AND key = ?", (library, key)).rowcount
+        return removed
+
+    def upsert(self, library: str, items: Iterable[dict[str, Any]]) -> int:
+        count = 0
+        for item in items:
+            data = item.get("data", {})
+            key = item["key"]
+            self.remove(library, [key])
+            self.conn.execute(
+                "INSERT INTO items (library, key, version, item_type, parent, year, date_added, date_modified, "
+                "deleted, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    library, key, item.get("version", data.get("version", 0)), data.get("itemType", ""),
+                    data.get("parentItem"), parse_year(data.get("date")), data.get("dateAdded"),
+                    data.get("dateModified"), 1 if data.get("deleted") else 0,
+                    json.dumps(item, ensure_ascii=False),
+                ),
+            )
+            self.conn.executemany(
+                "INSERT INTO item_tags (library, key, tag, type) VALUES (?, ?, ?, ?)",
+                [(library, key, t["tag"], t.get("type", 0)) for t in data.get("tags", []) if t.get("tag")],
+            )
+            self.conn.executemany(
+                "INSERT INTO item_collections (library, key, collection) VALUES (?, ?, ?)",
+                [(library, key, c) for c in data.get("collections", [])],
+            )
+            self.conn.executemany(
+                "INSERT INTO item_creators (library, key, name, creator_type) VALUES (?, ?, ?, ?)",
+                [(library, key, creator_name(c), c.get("creatorType"))
+                 for c in data.get("creators", []) if creator_name(c)],
+            )
+            count += 1
+        return count
+
+    def clear(self, library: str) -> None:
+        for table in ("libraries", "items", *_SIDE_TABLES):
+            self.conn.execute(f"DELETE FROM {table} WHERE library = ?", (library,))
+        self.conn.commit()
+
+    def sync(self, zot_client: Any, full: bool = False) -> dict[str, Any]:
+        """Bring the client's library up to date. Returns counts of fetched and removed items."""
+        library = library_cache_key(zot_client)
+        remote_version = zot_client.last_modified_version()
+        local_version = None if full else self.library_version(library)
+        stats = {"library": library, "version": remote_version, "fetched": 0, "removed": 0, "full": False}
+        if local_version == remote_version:
+            return stats
+
+        if local_version is None:
+            stats["full"] = True
+            self.clear(library)
+            start = 0
+            while True:
+                page = zot_client.items(limit=PAGE_SIZE, start=start, includeTrashed=1)
+                stats["fetched"] += self.upsert(library, page)
+                if len(page) < PAGE_SIZE:
+                    break
+                start += PAGE_SIZE
+        else:
+            changed = zot_client.item_versions(since=local_version, includeTrashed=1) or {}
+            for batch in chunked(changed, KEYS_PER_REQUEST):
+                items = zot_client.items(itemKey=",".join(batch), includeTrashed=1, limit=KEYS_PER_REQUEST)
+                stats["fetched"] += self.upsert(library, items)
+            deleted = (zot_client.deleted(since=local_version) or {}).get("items", [])
+            stats["removed"] = self.remove(library, deleted)
+
+        # Recorded only after every page is in; an interrupted sync starts over next time
+        self._set_library_version(library, remote_version)
+        self.conn.commit()
+        return stats
+
+    # ── Reading ──────────────────────────────────────────────────────────
+
+    def count(self, library: str, include_trashed: bool = False) -> int:
+        sql = "SELECT COUNT(*) FROM items WHERE library = ?" + ("" if include_trashed else " AND deleted = 0")
+        return self.conn.execute(sql, (library,)).fetchone()[0]
+
+    def items(self, library: str, keys: Iterable[str] | None = None,
+              include_trashed: bool = False) -> Iterator[dict[str, Any]]:
+        """Stored items, newest first; restricted to ``keys`` when given."""
+        where = "library = ?" + ("" if include_trashed else " AND deleted = 0")
+        if keys is None:
+            rows = self.conn.execute(f"SELECT data FROM items WHERE {where} ORDER BY date_added DESC, key", (library,))
+            yield from (json.loads(row[0]) for row in rows)
+            return
+        # SQLite limits the number of bound parameters, so keys are looked up in chunks:
+        # first their sort keys, to order them across chunks, then the data in that order
+        order: list[tuple[str | None, str]] = []
+        for batch in chunked(keys, 500):
+            placeholders = ",".join("?" * len(batch))
+            order.extend(self.conn.execute(
+                f"SELECT date_added, key FROM items WHERE {where} AND key IN ({placeholders})", (library, *batch)
+            ))
+        order.sort(key=lambda row: row[1])
+        order.sort(key=lambda row: row[0] or "", reverse=True)  # stable; NULL dates last, as in SQLite
+        for batch in chunked([key for _, key in order], 500):
+            placeholders = ",".join("?" * len(batch))
+            rows = dict(self.conn.execute(
+                f"SELECT key, data FROM items WHERE library = ? AND key IN ({placeholders})", (library, *batch)
+            ))
+            yield from (json.loads(rows[key]) for key in batch if key in rows)
+
+    def tag_index(self, library: str, include_trashed: bool = False) -> dict[str, set[str]]:
+        """Tag name → keys of the items carrying it."""
+        sql = ("SELECT t.tag, t.key FROM item_tags t JOIN items i ON i.library = t.library AND i.key = t.key "
+               "WHERE t.library = ?" + ("" if include_trashed else " AND i.deleted = 0"))
+        index: dict[str, set[str]] = {}
+        for tag, key in self.conn.execute(sql, (library,)):
+            index.setdefault(tag, set()).add(key)
+        return index
+
+    def tag_types(self, library: str) -> dict[str, int]:
+        """Tag name → 0 if it is used as a manual tag anywhere, else 1 (automatic)."""
+        rows = self.conn.execute("SELECT tag, MIN(type) FROM item_tags WHERE library = ? GROUP BY tag", (library,))
+        return dict(rows.fetchall())
+
+    def _key_set(self, sql: str, params: Iterable[Any]) -> set[str]:
+        return {row[0] for row in self.conn.execute(sql, tuple(params))}
+
+    def keys_with_tag(self, library: str, tag: str) -> set[str]:
+        return self._key_set("SELECT key FROM item_tags WHERE library = ? AND tag = ? COLLATE NOCASE", (library, tag))
+
+    def keys_with_tag_like(self, library: str, fragment: str) -> set[str]:
+        """Keys of items with a tag containing ``fragment`` (case-insensitive)."""
+        escaped = fragment.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return self._key_set(
+            "SELECT key FROM item_tags WHERE library = ? AND tag LIKE ? ESCAPE '\\'", (library, f"%{escaped}%")
+        )
+
+    def keys_of_type(self, library: str, item_type: str) -> set[str]:
+        return self._key_set("SELECT key FROM items WHERE library = ? AND item_type = ?", (library, item_type))
+
+    def keys_with_creator(self, library: str, name: str) -> set[str]:
+        return self._key_set(
+            "SELECT key FROM item_creators WHERE library = ? AND name = ? COLLATE NOCASE", (library, name)
+        )
+
+    def keys_in_range(self, library: str, column: str, low: Any = None, high: Any = None,
+                      include_high: bool = False) -> set[str]:
+        """Keys with ``low <= column < high`` (``<=`` with include_high) on an indexed column."""
+        if column not in ("year", "date_added"):
+            raise ValueError(f"No range index on '{column}'")
+        sql, params = f"SELECT key FROM items WHERE library = ? AND {column} IS NOT NULL", [library]
+        if low is not None:
+            sql += f" AND {column} >= ?"
+            params.append(low)
+        if high is not None:
+            sql += f" AND {column} {'<=' if include_high else '<'} ?"
+            params.append(high)
+        return self._key_set(sql, params)
+
+    def select(self, library: str, clauses: list[Clause], join_mode: str = "all",
+               include_trashed: bool = False) -> Iterator[dict[str, Any]]:
+        """Stream the stored items matching ``clauses`` (all of them, or any with join_mode='any').
+
+        With 'all', index lookups are intersected first so only the remaining
+        candidates are loaded and tested; with 'any', a union of index lookups is used
+        when every clause has an index, otherwise the library is scanned once.
+        """
+        if not clauses:
+            yield from self.items(library, include_trashed=include_trashed)
+            return
+        indexed = [c for c in clauses if c.index]
+        if join_mode == "any":
+            if len(indexed) == len(clauses) and not any(c.predicate for c in clauses):
+                keys = set().union(*(c.keys() for c in clauses))
+                yield from self.items(library, sorted(keys), include_trashed=include_trashed)
+            else:
+                for item in self.items(library, include_trashed=include_trashed):
+                    if any(c.matches(item) for c in clauses):
+                        yield item
+            return
+
+        candidates = None
+        for clause in sorted(indexed, key=lambda c: len(c.keys())):
+            candidates = clause.keys() if candidates is None else candidates & clause.keys()
+            if not candidates:
+                return
+        predicates = [c.predicate for c in clauses if c.predicate]
+        source = self.items(library, None if candidates is None else sorted(candidates), include_trashed=include_trashed)
+        for item in source:
+            if all(predicate(item) for predicate in predicates):
+                yield item
+
+    def collection_members(self, library: str, collections: Iterable[str]) -> set[str]:
+        members: set[str] = set()
+        for collection in collections:
+            rows = self.conn.execute(
+                "SELECT key FROM item_collections WHERE library = ? AND collection = ?", (library, collection)
+            )
+            members.update(row[0] for row in rows)
+        return members
+
+
+def open_synced_store(zot_client: Any, refresh: bool = False) -> tuple[ItemStore, str]:
+    """Open the item store and sync the client's library. Returns (store, library id)."""
+    store = ItemStore()
+    try:
+        store.sync(zot_client, full=refresh)
+    except Exception:
+        store.close()
+        raise
+    return store, library_cache_key(zot_client)
@@ -0,0 +1,84 @@
+"""``zot --profile-run``: profile one CLI run with cProfile or tracemalloc.
+
+``cpu`` mode runs the command under cProfile and either writes the raw stats to
+``--profile-file`` (load them with ``python -m pstats`` or snakeviz) or prints the
+top functions by cumulative time. Only the main thread is profiled; work done on
+worker threads (``--workers``, ``--library-workers``) shows up as time spent waiting.
+
+``memory`` mode traces allocations with tracemalloc and reports the peak traced
+size and the largest allocation sites still alive at exit; ``--profile-file``
+receives the snapshot (``tracemalloc.Snapshot.load``).
+"""
+import cProfile
+import io
+import pstats
+import tracemalloc
+from typing import Callable
+
+import click
+
+PROFILE_MODES = ("cpu", "memory")
+DEFAULT_TOP = 25
+
+
+def _kib(num_bytes: int) -> str:
+    return f"{num_bytes / 1024:.1f} KiB"
+
+
+def _start_cpu(output: str | None, top: int) -> Callable[[], None] | None:
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as exc:
+        # Another profiler (e.g. a debugger or coverage tool) already owns the hook
+        click.echo(f"Warning: --profile-run cpu is unavailable: {exc}", err=True)
+        return None
+
+    def report() -> None:
+        profiler.disable()
+        if output:
+            profiler.dump_stats(output)
+            click.echo(f"Profile written to {output}", err=True)
+            return
+        buffer = io.StringIO()
+        stats = pstats.Stats(profiler, stream=buffer)
+        stats.strip_dirs().sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+        click.echo(buffer.getvalue().strip("\n"), err=True)
+
+    return report
+
+
+def _start_memory(output: str | None, top: int) -> Callable[[], None]:
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+
+    def report() -> None:
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        if not already_tracing:
+            tracemalloc.stop()
+        snapshot = snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ))
+        lines = [f"Memory: peak {_kib(peak)}, {_kib(current)} still allocated at exit"]
+        for stat in snapshot.statistics("lineno")[:top]:
+            frame = stat.traceback[0]
+            lines.append(f"  {_kib(stat.size):>12}  {stat.count:>7} blocks  {frame.filename}:{frame.lineno}")
+        click.echo("\n".join(lines), err=True)
+        if output:
+            snapshot.dump(output)
+            click.echo(f"Snapshot written to {output}", err=True)
+
+    return report
+
+
+def start(mode: str | None, output: str | None = None, top: int = DEFAULT_TOP) -> Callable[[], None] | None:
+    """Start profiling this run. Returns the callback that stops and reports, or None if off."""
+    if mode == "cpu":
+        return _start_cpu(output, top)
+    if mode == "memory":
+        return _start_memory(output, top)
+    return None
@@ -0,0 +1,301 @@
+"""A small query language evaluated over the local item store.
+
+Examples::
+
+    year>=2020 and creator:Smith and not tag:read
+    (type:journalArticle or type:preprint) and doi:10.1101/*
+    abstract="" and added>=2024-01-01
+
+Grammar (``and`` binds tighter than ``or``; keywords are case-insensitive)::
+
+    expr    := and_expr ("or" and_expr)*
+    and_expr:= unary ("and" unary)*
+    unary   := "not" unary | "(" expr ")" | term
+    term    := FIELD OP VALUE | "has:" FIELD
+    OP      := ":" | "=" | "!=" | ">=" | "<=" | ">" | "<"
+
+``field:value`` is an equality test for tag, collection, type, creator and key,
+and a substring test for other fields; a trailing ``*`` makes it a prefix test.
+``field=value`` is an exact test (``field=""`` matches missing or blank fields).
+Comparisons are numeric for ``year`` and ISO-date string comparisons otherwise.
+All text matching is case-insensitive.
+
+Queries are parsed into an AST and compiled into item_store.Clause trees: equality
+and range terms on indexed attributes (tags, collections, item type, creator last
+names, year, dateAdded) become index lookups; everything else is a predicate.
+"""
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Iterator, Union
+
+from .item_store import Clause, ItemStore, creator_name, parse_year
+
+FIELD_ALIASES = {
+    "type": "itemType",
+    "itemtype": "itemType",
+    "author": "creator",
+    "doi": "DOI",
+    "abstract": "abstractNote",
+    "added": "dateAdded",
+    "modified": "dateModified",
+    "journal": "publicationTitle",
+}
+# Attributes where ':' means equality rather than substring
+EQUALITY_FIELDS = {"tag", "collection", "itemType", "creator", "key"}
+
+_TOKEN_RE = re.compile(
+    r"""\s*(?:
+        (?P<lparen>\() | (?P<rparen>\)) |
+        (?P<term>[A-Za-z][\w.-]*\s*(?:>=|<=|!=|>|<|=|:)\s*(?:"(?:[^"\\]|\\.)*"|[^\s()"]+|(?=[\s()]|$))) |
+        (?P<word>[A-Za-z]+)
+    )""",
+    re.VERBOSE,
+)
+_TERM_RE = re.compile(r'^(?P<field>[A-Za-z][\w.-]*)\s*(?P<op>>=|<=|!=|>|<|=|:)\s*(?P<value>.*)$', re.DOTALL)
+_DAY_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+class QueryError(ValueError):
+    """The query text could not be parsed or compiled."""
+
+
+@dataclass
+class Term:
+    field: str
+    op: str
+    value: str
+
+
+@dataclass
+class Not:
+    operand: "Node"
+
+
+@dataclass
+class BoolOp:
+    op: str  # "and" | "or"
+    operands: list["Node"]
+
+
+Node = Union[Term, Not, BoolOp]
+
+
+# ── Parsing ──────────────────────────────────────────────────────────────
+
+def _tokenize(text: str) -> list[tuple[str, str]]:
+    tokens, position = [], 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKEN_RE.match(text, position)
+        if not match or match.end() == position:
+            raise QueryError(f"Unexpected input at position {position}: {text[position:position + 20]!r}")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind).strip()))
+        position = match.end()
+    return tokens
+
+
+def _parse_term(token: str) -> Term:
+    match = _TERM_RE.match(token)
+    field, op, value = match.group("field"), match.group("op"), match.group("value").strip()
+    if value.startswith('"'):
+        value = re.sub(r'\\(.)', r'\1', value[1:-1])
+    field = FIELD_ALIASES.get(field.lower(), field)
+    if field.lower() == "has" and op == ":":
+        return Term(FIELD_ALIASES.get(value.lower(), value), "has", "")
+    return Term(field, op, value)
+
+
+class _Parser:
+    def __init__(self, text: str):
+        self.tokens = _tokenize(text)
+        self.position = 0
+
+    def _peek(self) -> tuple[str, str] | None:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _keyword(self, word: str) -> bool:
+        token = self._peek()
+        if token and token[0] == "word" and token[1].lower() == word:
+            self.position += 1
+            return True
+        return False
+
+    def parse(self) -> Node:
+        if not self.tokens:
+            raise QueryError("Empty query")
+        node = self._or()
+        if self._peek():
+            raise QueryError(f"Unexpected {self._peek()[1]!r}")
+        return node
+
+    def _or(self) -> Node:
+        operands = [self._and()]
+        while self._keyword("or"):
+            operands.append(self._and())
+        return operands[0] if len(operands) == 1 else BoolOp("or", operands)
+
+    def _and(self) -> Node:
+        operands = [self._unary()]
+        while self._keyword("and"):
+            operands.append(self._unary())
+        return operands[0] if len(operands) == 1 else BoolOp("and", operands)
+
+    def _unary(self) -> Node:
+        if self._keyword("not"):
+            return Not(self._unary())
+        token = self._peek()
+        if token is None:
+            raise QueryError("Query ends unexpectedly")
+        self.position += 1
+        kind, text = token
+        if kind == "lparen":
+            node = self._or()
+            closing = self._peek()
+            if not closing or closing[0] != "rparen":
+                raise QueryError("Missing ')'")
+            self.position += 1
+            return node
+        if kind == "term":
+            return _parse_term(text)
+        raise QueryError(f"Expected a term like 'field:value', got {text!r}")
+
+
+def parse_query(text: str) -> Node:
+    """Parse query text into an AST of Term, Not and BoolOp nodes."""
+    return _Parser(text).parse()
+
+
+# ── Compilation ──────────────────────────────────────────────────────────
+
+def _next_day(day: str) -> str:
+    return (datetime.strptime(day, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+
+
+def _bounds(op: str, value: Any, step: Any) -> tuple[Any, Any]:
+    """(low inclusive, high exclusive) bounds for a comparison; ``step`` gives the next value up."""
+    return {
+        ">=": (value, None), ">": (step(value), None),
+        "<": (None, value), "<=": (None, step(value)),
+        "=": (value, step(value)), ":": (value, step(value)),
+    }[op]
+
+
+def _values(data: dict[str, Any], field: str) -> list[str]:
+    if field == "tag":
+        return [t.get("tag", "") for t in data.get("tags", [])]
+    if field == "collection":
+        return list(data.get("collections", []))
+    if field == "creator":
+        names = []
+        for creator in data.get("creators", []):
+            names.append(creator_name(creator))
+            if creator.get("firstName"):
+                names.append(f"{creator['firstName']} {creator.get('lastName', '')}".strip())
+        return names
+    value = data.get(field)
+    if isinstance(value, list):
+        return [str(v) for v in value]
+    return [] if value in (None, "") else [str(value)]
+
+
+def _text_predicate(term: Term):
+    field, op, needle = term.field, term.op, term.value.lower()
+    if op == "has":
+        return lambda item: bool(_values(item["data"], field))
+    if needle.endswith("*") and op in (":", "="):
+        prefix = needle[:-1]
+        return lambda item: any(v.lower().startswith(prefix) for v in _values(item["data"], field))
+    if op == ":" and field not in EQUALITY_FIELDS:
+        return lambda item: any(needle in v.lower() for v in _values(item["data"], field))
+    if op in (":", "="):
+        if needle == "":
+            return lambda item: not _values(item["data"], field)
+        return lambda item: any(v.lower() == needle for v in _values(item["data"], field))
+    if op == "!=":
+        return lambda item: all(v.lower() != needle for v in _values(item["data"], field))
+    compare = {">=": str.__ge__, "<=": str.__le__, ">": str.__gt__, "<": str.__lt__}[op]
+    return lambda item: any(compare(v.lower(), needle) for v in _values(item["data"], field))
+
+
+def _compile_term(term: Term, store: ItemStore, library: str) -> Clause:
+    field, op, value = term.field, term.op, term.value
+    if op != "has" and value == "" and op not in ("=", ":"):
+        raise QueryError(f"Missing value for '{field}{op}'")
+
+    if field == "year":
+        if op == "has":
+            return Clause(predicate=lambda item: parse_year(item["data"].get("date")) is not None)
+        try:
+            year = int(value)
+        except ValueError:
+            raise QueryError(f"Year must be a number, got {value!r}") from None
+        if op == "!=":
+            return Clause(predicate=lambda item: parse_year(item["data"].get("date")) != year)
+        low, high = _bounds(op, year, lambda y: y + 1)
+        return Clause(index=lambda: store.keys_in_range(library, "year", low, high))
+
+    if field == "dateAdded" and op not in ("has", "!=") and _DAY_RE.match(value):
+        low, high = _bounds(op, value, _next_day)
+        return Clause(index=lambda: store.keys_in_range(library, "date_added", low, high))
+
+    exact = op in (":", "=") and value and not value.endswith("*")
+    if exact and field == "tag":
+        return Clause(index=lambda: store.keys_with_tag(library, value))
+    if exact and field == "collection":
+        return Clause(index=lambda: store.collection_members(library, [value]))
+    if exact and field == "itemType":
+        return Clause(index=lambda: store.keys_of_type(library, value))
+    if exact and field == "creator":
+        # Index on last names; full names ("Jane Smith") fall through to the predicate
+        if " " not in value.strip():
+            return Clause(index=lambda: store.keys_with_creator(library, value))
+    if exact and field == "key":
+        return Clause(predicate=lambda item: item["key"].lower() == value.lower())
+    return Clause(predicate=_text_predicate(term))
+
+
+def compile_query(node: Node, store: ItemStore, library: str) -> Clause:
+    """Compile an AST into a single Clause for ItemStore.select().
+
+    A conjunction intersects the index lookups of its operands and checks the rest
+    as predicates; a disjunction keeps an index (the union) only when every
+    operand has one; a negation is always a predicate.
+    """
+    if isinstance(node, Term):
+        return _compile_term(node, store, library)
+    if isinstance(node, Not):
+        inner = compile_query(node.operand, store, library)
+        return Clause(predicate=lambda item: not inner.matches(item))
+
+    children = [compile_query(operand, store, library) for operand in node.operands]
+    if node.op == "and":
+        indexed = [c for c in children if c.index]
+        predicates = [c.predicate for c in children if c.predicate]
+
+        def intersection() -> set[str]:
+            sets = sorted((c.keys() for c in indexed), key=len)
+            result = set(sets[0])
+            for keys in sets[1:]:
+                result &= keys
+            return result
+
+        return Clause(
+            index=intersection if indexed else None,
+            predicate=(lambda item: all(p(item) for p in predicates)) if predicates else None,
+        )
+
+    if all(c.index for c in children):
+        index = lambda: set().union(*(c.keys() for c in children))  # noqa: E731
+    else:
+        index = None
+    if all(c.index and not c.predicate for c in children):
+        return Clause(index=index)
+    return Clause(index=index, predicate=lambda item: any(c.matches(item) for c in children))
+
+
+def run_query(text: str, store: ItemStore, library: str, include_trashed: bool = False) -> Iterator[dict[str, Any]]:
+    """Parse, compile and stream the stored items matching ``text``."""
+    clause = compile_query(parse_query(text), store, library)
+    return store.select(library, [clause], include_trashed=include_trashed)
@@ -0,0 +1,50 @@
+from itertools import islice
+
+import click
+from .item_store import open_synced_store
+from .query import QueryError, run_query
+from .records import compact
+from .utils import format_data_for_output, handle_zotero_exceptions_and_exit, create_usage_error, initialize_zotero_client
+
+
+@click.command(name='query')
+@click.argument('query_text', required=True)
+@click.option('--limit', type=click.IntRange(min=1), help='Maximum number of items to return.')
+@click.option('--include-trashed', is_flag=True, help='Also match items in the trash.')
+@click.option('--refresh', is_flag=True, help='Rebuild the local item store from scratch first.')
+@click.option('--output', type=click.Choice(['json', 'yaml', 'table', 'keys']), default='json', show_default=True, help='Output format.')
+@click.pass_context
+def query_command(ctx, query_text, limit, include_trashed, refresh, output):
+    """Filter library items with a query over a local copy of the library.
+
+    \b
+    Examples:
+      zot query 'year>=2020 and creator:Smith and not tag:read'
+      zot query '(type:journalArticle or type:preprint) and doi:10.1101/*'
+      zot query 'abstract="" and added>=2024-01-01' --output keys
+
+    Terms are FIELD OP VALUE with OP one of : = != >= <= > <, combined with
+    and, or, not and parentheses; 'has:FIELD' tests that a field is set.
+    'field:value' is an exact match for tag, collection, type, creator and key and
+    a substring match for other fields; a trailing '*' matches a prefix.
+
+    The library is synced into the local item store (incrementally, by library
+    version) before the query runs; tag, collection, type, creator, year and
+    dateAdded terms are answered from its indexes.
+    """
+    zot = initialize_zotero_client(ctx)
+    try:
+        store, library = open_synced_store(zot, refresh=refresh)
+        with store:
+            try:
+                matches = islice(run_query(query_text, store, library, include_trashed=include_trashed), limit)
+                if output == 'keys':
+                    for item in matches:
+                        click.echo(item['key'])
+                    return
+                results = compact(matches)
+            except QueryError as e:
+                raise create_usage_error(description="Invalid query", details=str(e))
+        click.echo(format_data_for_output(results, output, preset_key='item'))
+    except Exception as e:
+        handle_zotero_exceptions_and_exit(ctx, e)
@@ -0,0 +1,105 @@
+"""Compact in-memory item records for large result sets.
+
+A parsed Zotero item is a tree of dicts that repeats the same keys and envelopes
+(``links``, ``library``, ``meta``) for every item, several kilobytes each. An
+``ItemRecord`` keeps only what listing and table output read (key, version,
+type, title, date, creator summary and library, with repeated values shared)
+plus the zlib-compressed item JSON; the full item is decoded again only when it
+is written out. Commands that collect many items before printing them (``zot
+query`` and ``items list`` across libraries) hold records and hand them to
+``format_data_for_output``, which renders JSON one item at a time and tables
+from the summary fields alone.
+"""
+import json
+import sys
+import zlib
+from typing import Any, Iterable
+
+_COMPACT_SEPARATORS = (",", ":")
+
+
+# One shared summary dict per library, however many records point at it
+_libraries: dict[tuple[Any, ...], dict[str, Any]] = {}
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _shared_library(library: Any) -> dict[str, Any] | None:
+    if not isinstance(library, dict):
+        return None
+    summary = {field: library[field] for field in ("type", "id", "name") if field in library}
+    return _libraries.setdefault(tuple(summary.items()), summary)
+
+
+class ItemRecord:
+    """One item: summary fields as attributes, everything else compressed until to_item()."""
+
+    __slots__ = ("key", "version", "item_type", "title", "date", "creator_summary", "library", "_blob")
+
+    def __init__(self, key: str, version: int, item_type: str, title: str, date: str,
+                 creator_summary: str, blob: bytes, library: dict[str, Any] | None = None):
+        self.key = key
+        self.version = version
+        self.item_type = item_type
+        self.title = title
+        self.date = date
+        self.creator_summary = creator_summary
+        self.library = library
+        self._blob = blob
+
+    @classmethod
+    def from_item(cls, item: dict[str, Any]) -> "ItemRecord":
+        data = item.get("data", {})
+        text = json.dumps(item, ensure_ascii=False, separators=_COMPACT_SEPARATORS)
+        return cls(
+            item["key"],
+            item.get("version", data.get("version", 0)),
+            _intern(data.get("itemType", "")),
+            data.get("title", ""),
+            _intern(data.get("date", "")),
+            _intern(item.get("meta", {}).get("creatorSummary", "")),
+            zlib.compress(text.encode("utf-8")),
+            _shared_library(item.get("library")),
+        )
+
+    def to_item(self) -> dict[str, Any]:
+        """The full item JSON, decoded afresh on every call."""
+        return json.loads(zlib.decompress(self._blob))
+
+    def summary(self) -> dict[str, Any]:
+        """An item-shaped dict with only the summary fields (enough for table and keys output)."""
+        summary = {
+            "key": self.key,
+            "version": self.version,
+            "meta": {"creatorSummary": self.creator_summary},
+            "data": {"key": self.key, "itemType": self.item_type, "title": self.title, "date": self.date},
+        }
+        if self.library is not None:
+            summary["library"] = self.library
+        return summary
+
+    def __repr__(self) -> str:
+        return f"ItemRecord({self.key!r}, version={self.version})"
+
+
+def compact(items: Iterable[dict[str, Any]]) -> list[ItemRecord]:
+    """Records for ``items``; each dict can be freed as soon as it has been converted."""
+    return [ItemRecord.from_item(item) for item in items]
+
+
+def is_record_list(data: Any) -> bool:
+    return isinstance(data, list) and bool(data) and isinstance(data[0], ItemRecord)
+
+
+def dumps(records: list[ItemRecord], indent: int = 2) -> str:
+    """The same text as json.dumps([r.to_item() ...], indent=indent), materializing one item at a time."""
+    if not records:
+        return "[]"
+    pad = " " * indent
+    parts = []
+    for record in records:
+        text = json.dumps(record.to_item(), indent=indent, ensure_ascii=False)
+        parts.append(pad + text.replace("\n", "\n" + pad))
+    return "[\n" + ",\n".join(parts) + "\n]"
@@ -0,0 +1,219 @@
+"""Evaluate saved-search conditions against the local item store.
+
+The Zotero Web API stores saved searches but does not run them. Each stored
+condition is compiled into an item_store.Clause: tag, collection, item type,
+creator, year and dateAdded conditions use the store's indexes, everything else is a
+predicate over the item JSON. Matching is case-insensitive, as in Zotero.
+"""
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+
+from .item_store import Clause, ItemStore, parse_year
+
+# Conditions that change how the search runs rather than filtering items
+MODE_CONDITIONS = {"joinMode", "recursive", "noChildren", "deleted"}
+# Conditions that need data the item store does not have (full text, files, other searches, ...)
+UNSUPPORTED_CONDITIONS = {
+    "fulltextContent", "fulltextWord", "annotationText", "annotationComment", "childNote", "savedSearch",
+    "fileTypeID", "attachmentContent", "attachmentFileType", "includeParentsAndChildren", "unfiled",
+    "retracted", "publications", "feed", "libraryID", "itemID",
+}
+TEXT_OPERATORS = {"contains", "doesNotContain", "is", "isNot", "beginsWith"}
+DATE_OPERATORS = {"is", "isNot", "isBefore", "isAfter", "isInTheLast"}
+# Type-specific fields that Zotero matches for a 'title' condition
+TITLE_FIELDS = ("title", "caseName", "nameOfAct", "subject")
+
+_RELATIVE_RE = re.compile(r"^\s*(\d+)\s+(day|week|month|year)s?\s*$", re.IGNORECASE)
+_UNIT_DAYS = {"day": 1, "week": 7, "month": 30, "year": 365}
+
+
+class SavedSearchError(ValueError):
+    """A saved search uses conditions or operators that cannot be evaluated locally."""
+
+
+def _text_test(operator: str, value: str) -> Callable[[str], bool]:
+    needle = value.lower()
+    tests = {
+        "contains": lambda text: needle in text,
+        "doesNotContain": lambda text: needle not in text,
+        "is": lambda text: text == needle,
+        "isNot": lambda text: text != needle,
+        "beginsWith": lambda text: text.startswith(needle),
+    }
+    return tests[operator]
+
+
+def _values_test(operator: str, value: str) -> Callable[[list[str]], bool]:
+    """Test for multi-valued attributes (tags, creators): negative operators must hold for every value."""
+    negative = operator in ("doesNotContain", "isNot")
+    positive_test = _text_test({"doesNotContain": "contains", "isNot": "is"}.get(operator, operator), value)
+    if negative:
+        return lambda values: not any(positive_test(v.lower()) for v in values)
+    return lambda values: any(positive_test(v.lower()) for v in values)
+
+
+def _parse_day(value: str) -> str:
+    """Normalize a condition date ('2020-01-31', '2020-01-31 12:00:00') to 'YYYY-MM-DD'."""
+    try:
+        return datetime.strptime(value.strip()[:10], "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        raise SavedSearchError(f"Unsupported date value '{value}' (expected YYYY-MM-DD)") from None
+
+
+def _next_day(day: str) -> str:
+    return (datetime.strptime(day, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+
+
+def _date_clause(store: ItemStore, library: str, field: str, operator: str, value: str,
+                 now: datetime) -> Clause:
+    if operator == "isInTheLast":
+        match = _RELATIVE_RE.match(value)
+        if not match:
+            raise SavedSearchError(f"Unsupported relative date '{value}' (expected e.g. '7 days')")
+        since = now - timedelta(days=int(match.group(1)) * _UNIT_DAYS[match.group(2).lower()])
+        low, high = since.strftime("%Y-%m-%dT%H:%M:%SZ"), None
+    else:
+        day = _parse_day(value)
+        # Stored timestamps are ISO 8601, so day boundaries are plain string bounds
+        low, high = {
+            "is": (day, _next_day(day)),
+            "isNot": (day, _next_day(day)),
+            "isBefore": (None, day),
+            "isAfter": (_next_day(day), None),
+        }[operator]
+
+    def in_range(item: dict[str, Any]) -> bool:
+        stamp = item["data"].get(field) or ""
+        return bool(stamp) and (low is None or stamp >= low) and (high is None or stamp < high)
+
+    if operator == "isNot":
+        return Clause(predicate=lambda item: not in_range(item))
+    if field == "dateAdded":
+        return Clause(index=lambda: store.keys_in_range(library, "date_added", low, high))
+    return Clause(predicate=in_range)
+
+
+def _year_clause(store: ItemStore, library: str, operator: str, value: str) -> Clause:
+    """'year' matches the year parsed from the item's free-form date (the store's year column)."""
+    try:
+        year = int(value.strip())
+    except ValueError:
+        raise SavedSearchError(f"Unsupported year value '{value}'") from None
+    if operator == "is":
+        return Clause(index=lambda: store.keys_in_range(library, "year", year, year, include_high=True))
+    if operator == "isNot":
+        return Clause(predicate=lambda item: parse_year(item["data"].get("date")) != year)
+    if operator == "isBefore":
+        return Clause(index=lambda: store.keys_in_range(library, "year", None, year))
+    if operator == "isAfter":
+        return Clause(index=lambda: store.keys_in_range(library, "year", year + 1, None))
+    raise SavedSearchError(f"Unsupported operator '{operator}' for condition 'year'")
+
+
+def _field_text(data: dict[str, Any], field: str) -> str:
+    if field == "title":
+        return str(next((data[f] for f in TITLE_FIELDS if data.get(f)), "")).lower()
+    return str(data.get(field) or "").lower()
+
+
+def compile_conditions(conditions: list[dict[str, Any]], store: ItemStore, library: str,
+                       collection_subtree: Callable[[str], list[str]] | None = None,
+                       now: datetime | None = None) -> dict[str, Any]:
+    """Compile saved-search conditions into clauses for ItemStore.select().
+
+    Returns ``{"clauses", "join_mode", "include_trashed", "no_children"}``.
+    ``collection_subtree(key)`` expands a collection to its subtree when the search
+    has the 'recursive' flag. Raises SavedSearchError for anything unsupported.
+    """
+    now = now or datetime.now(timezone.utc)
+    # Mode conditions carry their setting in 'operator' ('any'/'all', 'true'/'false'); 'value' is empty
+    flags = {c.get("condition"): str(c.get("operator") or "").lower() for c in conditions
+             if c.get("condition") in MODE_CONDITIONS}
+    join_mode = "any" if flags.get("joinMode") == "any" else "all"
+    recursive = flags.get("recursive") == "true" and collection_subtree is not None
+
+    clauses: list[Clause] = []
+    for condition in conditions:
+        name, operator = condition.get("condition"), condition.get("operator")
+        value = str(condition.get("value", ""))
+        if name in MODE_CONDITIONS:
+            continue
+        if name in UNSUPPORTED_CONDITIONS or str(name).startswith("quicksearch"):
+            raise SavedSearchError(f"Condition '{name}' cannot be evaluated against the local item store")
+
+        if name == "tag":
+            if operator == "is":
+                clauses.append(Clause(index=lambda v=value: store.keys_with_tag(library, v)))
+            elif operator == "contains":
+                clauses.append(Clause(index=lambda v=value: store.keys_with_tag_like(library, v)))
+            elif operator in TEXT_OPERATORS:
+                test = _values_test(operator, value)
+                clauses.append(Clause(predicate=lambda item, t=test: t([x["tag"] for x in item["data"].get("tags", [])])))
+            else:
+                raise SavedSearchError(f"Unsupported operator '{operator}' for condition 'tag'")
+        elif name == "collection":
+            # Desktop-created searches may prefix the key with 'C'
+            key = value[1:] if len(value) == 9 and value.startswith("C") else value
+            keys = collection_subtree(key) if recursive else [key]
+            if operator == "is":
+                clauses.append(Clause(index=lambda k=keys: store.collection_members(library, k)))
+            elif operator == "isNot":
+                clauses.append(Clause(predicate=lambda item, k=set(keys): not k & set(item["data"].get("collections", []))))
+            else:
+                raise SavedSearchError(f"Unsupported operator '{operator}' for condition 'collection'")
+        elif name == "itemType":
+            if operator == "is":
+                clauses.append(Clause(index=lambda v=value: store.keys_of_type(library, v)))
+            elif operator == "isNot":
+                clauses.append(Clause(predicate=lambda item, v=value: item["data"].get("itemType") != v))
+            else:
+                raise SavedSearchError(f"Unsupported operator '{operator}' for condition 'itemType'")
+        elif name in ("creator", "lastName"):
+            if operator not in TEXT_OPERATORS:
+                raise SavedSearchError(f"Unsupported operator '{operator}' for condition '{name}'")
+            if name == "lastName" and operator == "is":
+                clauses.append(Clause(index=lambda v=value: store.keys_with_creator(library, v)))
+                continue
+            test = _values_test(operator, value)
+
+            def creator_names(item, full=(name == "creator")):
+                creators = item["data"].get("creators", [])
+                if full:
+                    return [c.get("name") or f"{c.get('firstName', '')} {c.get('lastName', '')}".strip() for c in creators]
+                return [c.get("lastName") or c.get("name") or "" for c in creators]
+
+            clauses.append(Clause(predicate=lambda item, t=test, names=creator_names: t(names(item))))
+        elif name == "year":
+            clauses.append(_year_clause(store, library, operator, value))
+        elif name in ("dateAdded", "dateModified"):
+            if operator not in DATE_OPERATORS:
+                raise SavedSearchError(f"Unsupported operator '{operator}' for condition '{name}'")
+            clauses.append(_date_clause(store, library, name, operator, value, now))
+        elif isinstance(name, str) and name and operator in TEXT_OPERATORS:
+            # Any other condition is an item field ('title', 'DOI', 'publicationTitle', ...)
+            test = _text_test(operator, value)
+            if name == "anyField":
+                clauses.append(Clause(predicate=lambda item, t=test: any(
+                    t(str(v).lower()) for v in item["data"].values() if isinstance(v, str))))
+            else:
+                clauses.append(Clause(predicate=lambda item, f=name, t=test: t(_field_text(item["data"], f))))
+        else:
+            raise SavedSearchError(f"Unsupported condition '{name}' with operator '{operator}'")
+
+    return {
+        "clauses": clauses,
+        "join_mode": join_mode,
+        "include_trashed": flags.get("deleted") == "true",
+        "no_children": flags.get("noChildren") == "true",
+    }
+
+
+def run_saved_search(conditions: list[dict[str, Any]], store: ItemStore, library: str,
+                     collection_subtree: Callable[[str], list[str]] | None = None):
+    """Yield the stored items matching a saved search's conditions."""
+    plan = compile_conditions(conditions, store, library, collection_subtree)
+    for item in store.select(library, plan["clauses"], plan["join_mode"], plan["include_trashed"]):
+        if plan["no_children"] and item["data"].get("parentItem"):
+            continue
+        yield item
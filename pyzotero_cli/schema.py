@@ -0,0 +1,280 @@
+"""Cached access to the global Zotero schema (item types, fields, creator types).
+
+The schema is fetched once from the API's ``/schema`` endpoint, stored in the zotcli
+cache directory with its ETag and revalidated at most once per ``SCHEMA_MAX_AGE``
+seconds. Within a process it is memoised, so repeated template and creator-type
+lookups (e.g. a large DOI import) cost no requests at all.
+
+Every helper falls back to the equivalent pyzotero call when the schema is not
+available (no network, local API without /schema, or a client without an httpx
+client such as the test doubles).
+"""
+import time
+from typing import Any, Callable
+
+import click
+
+from .utils import load_cache_json, save_cache_json
+
+SCHEMA_CACHE_FILE = "schema.json"
+SCHEMA_MAX_AGE = 24 * 60 * 60
+DEFAULT_LOCALE = "en-US"
+# Templates for these types depend on more than the schema (e.g. linkMode); always ask the API
+API_ONLY_TEMPLATE_TYPES = {"attachment", "note", "annotation"}
+
+# None records a failed load so it is not retried on every lookup in the same process
+_memo: dict[str, "ZoteroSchema | None"] = {}
+
+
+class ZoteroSchema:
+    """Lookup tables derived from a /schema document."""
+
+    def __init__(self, document: dict[str, Any], locale: str = DEFAULT_LOCALE):
+        self.version = document.get("version")
+        locales = document.get("locales") or {}
+        self.strings = locales.get(locale) or locales.get(DEFAULT_LOCALE) or {}
+        self.types: dict[str, dict[str, Any]] = {
+            entry["itemType"]: entry for entry in document.get("itemTypes", []) if "itemType" in entry
+        }
+
+    def _localized(self, section: str, name: str) -> str:
+        return (self.strings.get(section) or {}).get(name, name)
+
+    def has_type(self, item_type: str) -> bool:
+        return item_type in self.types
+
+    def item_types(self) -> list[dict[str, str]]:
+        return [{"itemType": t, "localized": self._localized("itemTypes", t)} for t in self.types]
+
+    def field_names(self, item_type: str) -> list[str]:
+        return [f["field"] for f in self.types[item_type].get("fields", [])]
+
+    def item_type_fields(self, item_type: str) -> list[dict[str, str]]:
+        return [{"field": f, "localized": self._localized("fields", f)} for f in self.field_names(item_type)]
+
+    def item_fields(self) -> list[dict[str, str]]:
+        seen: dict[str, None] = {}
+        for item_type in self.types:
+            for field in self.field_names(item_type):
+                seen.setdefault(field)
+        return [{"field": f, "localized": self._localized("fields", f)} for f in seen]
+
+    def item_creator_types(self, item_type: str) -> list[dict[str, str]]:
+        return [
+            {"creatorType": c["creatorType"], "localized": self._localized("creatorTypes", c["creatorType"])}
+            for c in self.types[item_type].get("creatorTypes", [])
+        ]
+
+    def item_template(self, item_type: str) -> dict[str, Any]:
+        """Build the same template the API's /items/new endpoint returns for a regular item type."""
+        template: dict[str, Any] = {"itemType": item_type}
+        creator_types = self.types[item_type].get("creatorTypes", [])
+        primary = next((c["creatorType"] for c in creator_types if c.get("primary")), None)
+        if primary is None and creator_types:
+            primary = creator_types[0]["creatorType"]
+        for field in self.types[item_type].get("fields", []):
+            template[field["field"]] = ""
+            # The API places creators right after the title field (or its type-specific alias)
+            if primary and "creators" not in template and "title" in (field["field"], field.get("baseField")):
+                template["creators"] = [{"creatorType": primary, "firstName": "", "lastName": ""}]
+        if primary and "creators" not in template:
+            template["creators"] = [{"creatorType": primary, "firstName": "", "lastName": ""}]
+        template.update({"tags": [], "collections": [], "relations": {}})
+        return template
+
+
+def _schema_url(zot_client: Any) -> str | None:
+    endpoint = getattr(zot_client, "endpoint", None)
+    return f"{endpoint.rstrip('/')}/schema" if endpoint else None
+
+
+def _fetch_schema(zot_client: Any, url: str, cached: dict[str, Any]) -> dict[str, Any] | None:
+    """Fetch or revalidate the schema document. Returns the updated cache entry, or None on failure."""
+    headers = {"If-None-Match": cached["etag"]} if cached.get("etag") and cached.get("schema") else {}
+    try:
+        response = zot_client.client.get(url, headers=headers)
+    except Exception:
+        return None
+    if response.status_code == 304:
+        return {**cached, "checked_at": time.time()}
+    if response.status_code != 200:
+        return None
+    try:
+        document = response.json()
+    except ValueError:
+        return None
+    if not isinstance(document, dict) or not isinstance(document.get("itemTypes"), list):
+        return None
+    return {"etag": response.headers.get("etag"), "checked_at": time.time(), "schema": document}
+
+
+def get_schema(zot_client: Any, refresh: bool = False) -> ZoteroSchema | None:
+    """Return the (memoised, disk-cached) schema for a client's API endpoint, or None if unavailable."""
+    url = _schema_url(zot_client)
+    if url is None or getattr(zot_client, "client", None) is None:
+        return None
+    locale = getattr(zot_client, "locale", None) or DEFAULT_LOCALE
+    memo_key = f"{url}|{locale}"
+    if not refresh and memo_key in _memo:
+        return _memo[memo_key]
+
+    cache = load_cache_json(SCHEMA_CACHE_FILE)
+    entry = cache.get(url) or {}
+    fresh = entry.get("schema") and time.time() - entry.get("checked_at", 0) < SCHEMA_MAX_AGE
+    if refresh or not fresh:
+        updated = _fetch_schema(zot_client, url, entry)
+        if updated is not None:
+            entry = updated
+            cache[url] = entry
+            save_cache_json(SCHEMA_CACHE_FILE, cache)
+    schema = ZoteroSchema(entry["schema"], locale) if entry.get("schema") else None
+    _memo[memo_key] = schema
+    return schema
+
+
+def clear_memo() -> None:
+    """Forget schemas loaded in this process (the on-disk cache is kept)."""
+    _memo.clear()
+
+
+def item_template(zot_client: Any, item_type: str, linkmode: str | None = None) -> Any:
+    """Item template from the cached schema, falling back to zot_client.item_template()."""
+    if linkmode is None and item_type not in API_ONLY_TEMPLATE_TYPES:
+        schema = get_schema(zot_client)
+        if schema and schema.has_type(item_type):
+            return schema.item_template(item_type)
+    if linkmode:
+        return zot_client.item_template(item_type, linkmode=linkmode)
+    return zot_client.item_template(item_type)
+
+
+def item_creator_types(zot_client: Any, item_type: str) -> Any:
+    schema = get_schema(zot_client)
+    if schema and schema.has_type(item_type):
+        return schema.item_creator_types(item_type)
+    return zot_client.item_creator_types(itemtype=item_type)
+
+
+def item_type_fields(zot_client: Any, item_type: str) -> Any:
+    schema = get_schema(zot_client)
+    if schema and schema.has_type(item_type):
+        return schema.item_type_fields(item_type)
+    return zot_client.item_type_fields(itemtype=item_type)
+
+
+def item_types(zot_client: Any) -> Any:
+    schema = get_schema(zot_client)
+    return schema.item_types() if schema else zot_client.item_types()
+
+
+def item_fields(zot_client: Any) -> Any:
+    schema = get_schema(zot_client)
+    return schema.item_fields() if schema else zot_client.item_fields()
+
+
+# Keys accepted on any item besides its type's fields
+ITEM_META_KEYS = {
+    "key", "version", "itemType", "creators", "tags", "collections", "relations", "parentItem",
+    "deleted", "dateAdded", "dateModified", "inPublications",
+}
+
+
+class ItemValidator:
+    """Checks item payloads locally before they are sent to the API.
+
+    Allowed fields come from the cached schema or, when it is unavailable, from the
+    keys of the item template (one lookup per item type and link mode, reused across
+    records). If neither source can be read, the field check is skipped with a warning
+    rather than blocking the write.
+    """
+
+    def __init__(self, zot_client: Any, warn: Callable[[str], None] | None = None):
+        self.zot_client = zot_client
+        self.warn = warn or (lambda message: click.echo(f"Warning: {message}", err=True))
+        self._fields: dict[tuple[str, str | None], set[str] | None] = {}
+        self._creator_types: dict[str, set[str] | None] = {}
+
+    def is_unknown_type(self, item_type: str) -> bool:
+        """True only when the schema is available and does not list the type."""
+        schema = get_schema(self.zot_client)
+        return bool(schema) and item_type not in API_ONLY_TEMPLATE_TYPES and not schema.has_type(item_type)
+
+    def allowed_fields(self, item_type: str, linkmode: str | None = None) -> set[str] | None:
+        """Valid keys for an item type, or None if they could not be looked up."""
+        cache_key = (item_type, linkmode if item_type == "attachment" else None)
+        if cache_key not in self._fields:
+            schema = get_schema(self.zot_client)
+            fields: set[str] | None = None
+            if schema and schema.has_type(item_type) and item_type not in API_ONLY_TEMPLATE_TYPES:
+                fields = set(schema.field_names(item_type))
+            else:
+                try:
+                    template = item_template(self.zot_client, item_type, linkmode=cache_key[1])
+                except Exception as e:
+                    self.warn(f"Could not look up the fields of item type '{item_type}' ({e}); "
+                              "skipping the field check.")
+                    template = None
+                fields = set(template) if isinstance(template, dict) else None
+            self._fields[cache_key] = fields | ITEM_META_KEYS if fields is not None else None
+        return self._fields[cache_key]
+
+    def allowed_creator_types(self, item_type: str) -> set[str] | None:
+        if item_type not in self._creator_types:
+            try:
+                entries = item_creator_types(self.zot_client, item_type)
+                allowed = {e["creatorType"] for e in entries if isinstance(e, dict) and e.get("creatorType")}
+            except Exception:
+                allowed = set()
+            # An empty answer means we cannot tell, not that no creators are allowed
+            self._creator_types[item_type] = allowed or None
+        return self._creator_types[item_type]
+
+    def errors(self, payload: Any, item_type: str | None = None, linkmode: str | None = None) -> list[str]:
+        """Return the problems found in an item payload (an empty list means valid).
+
+        ``item_type`` (and, for attachments, ``linkmode``) are given for partial payloads
+        (updates) that only carry the changed keys; otherwise the payload's own
+        ``itemType`` is required.
+        """
+        if not isinstance(payload, dict):
+            return ["Item payload must be a JSON object"]
+        item_type = payload.get("itemType", item_type)
+        if not isinstance(item_type, str) or not item_type:
+            return ["Missing 'itemType'"]
+        if self.is_unknown_type(item_type):
+            return [f"Unknown item type '{item_type}'"]
+
+        allowed = self.allowed_fields(item_type, payload.get("linkMode", linkmode))
+        problems = [] if allowed is None else [
+            f"Field '{key}' is not valid for item type '{item_type}'" for key in payload if key not in allowed
+        ]
+        problems.extend(self._creator_errors(payload.get("creators"), item_type))
+        tags = payload.get("tags")
+        if tags is not None and not (
+            isinstance(tags, list) and all(isinstance(t, dict) and isinstance(t.get("tag"), str) for t in tags)
+        ):
+            problems.append("'tags' must be a list of objects with a string 'tag'")
+        collections = payload.get("collections")
+        if collections is not None and not (isinstance(collections, list) and all(isinstance(c, str) for c in collections)):
+            problems.append("'collections' must be a list of collection keys")
+        return problems
+
+    def _creator_errors(self, creators: Any, item_type: str) -> list[str]:
+        if creators is None:
+            return []
+        if not isinstance(creators, list):
+            return ["'creators' must be a list"]
+        problems = []
+        allowed_types = self.allowed_creator_types(item_type)
+        for index, creator in enumerate(creators):
+            if not isinstance(creator, dict):
+                problems.append(f"Creator {index} must be an object")
+                continue
+            creator_type = creator.get("creatorType")
+            if allowed_types is not None and creator_type not in allowed_types:
+                problems.append(f"Creator {index}: creator type '{creator_type}' is not valid for item type '{item_type}'")
+            if not any(name_key in creator for name_key in ("name", "firstName", "lastName")):
+                problems.append(f"Creator {index} needs 'name' or 'firstName'/'lastName'")
+            if creator.get("name") and (creator.get("lastName") or creator.get("firstName")):
+                problems.append(f"Creator {index} cannot have both 'name' and 'firstName'/'lastName'")
+        return problems
@@ -122,5 +122,52 @@ def delete_search(ctx, search_keys, force):
     except Exception as e:
         handle_zotero_exceptions_and_exit(ctx, e)
 
+@search_group.command('run')
+@click.argument('search_key', required=True)
+@click.option('--limit', type=click.IntRange(min=1), help='Maximum number of items to return.')
+@click.option('--refresh', is_flag=True, help='Rebuild the local item store from scratch first.')
+@click.option('--output', type=click.Choice(['json', 'yaml', 'table', 'keys']), default='json', show_default=True, help='Output format.')
+@click.pass_context
+def run_search(ctx, search_key, limit, refresh, output):
+    """Run a saved search against a local copy of the library.
+
+    The Zotero API stores saved searches but cannot execute them, so the library's
+    items are synced into the local item store (incrementally, by library version)
+    and the search conditions are evaluated there.
+    """
+    from itertools import islice
+    from .collection_tree import load_collection_tree
+    from .item_store import open_synced_store
+    from .saved_search import SavedSearchError, run_saved_search
+
+    z = ctx.obj['zot']
+    try:
+        saved = next((s for s in z.searches() if s.get('key') == search_key or s.get('data', {}).get('key') == search_key), None)
+        if saved is None:
+            raise create_click_exception(
+                description=f"Saved search '{search_key}' not found",
+                hint="Use 'zot search list' to see the available saved searches."
+            )
+        conditions = saved.get('data', saved).get('conditions', [])
+
+        tree = None
+        def collection_subtree(key):
+            nonlocal tree
+            tree = tree or load_collection_tree(z)
+            return tree.subtree_keys(key) if key in tree else [key]
+
+        store, library = open_synced_store(z, refresh=refresh)
+        with store:
+            try:
+                matches = list(islice(run_saved_search(conditions, store, library, collection_subtree), limit))
+            except SavedSearchError as e:
+                raise create_click_exception(
+                    description=f"Saved search '{search_key}' cannot be evaluated locally",
+                    details=str(e)
+                )
+        click.echo(format_data_for_output(matches, output, preset_key='item'))
+    except Exception as e:
+        handle_zotero_exceptions_and_exit(ctx, e)
+
 # Expose search_group to be imported in zot_cli.py
 __all__ = ['search_group']
@@ -1,7 +1,25 @@
+import heapq
 import time
+from collections import Counter
+from urllib.parse import quote
+
 import click
 from pyzotero import zotero_errors
-from .utils import common_options, format_data_for_output, handle_zotero_exceptions_and_exit, initialize_zotero_client
+from . import telemetry
+from .bulk import (
+    WRITE_BATCH_SIZE, backoff_delay, batched_update, chunked, map_concurrently, thread_local_client_factory
+)
+from .fanout import echo_fanned_out, library_fanout_options, resolve_libraries
+from .utils import (
+    common_options, output_option, format_data_for_output, handle_zotero_exceptions_and_exit,
+    initialize_zotero_client, check_batch_operation_results, create_usage_error
+)
+
+TAGGED_ITEMS_PAGE_SIZE = 100
+# Limits for one DELETE /tags request: the API's 50-tag cap and a URL-safe query length
+TAGS_PER_DELETE = 50
+MAX_TAG_QUERY_CHARS = 4000
+DELETE_MAX_ATTEMPTS = 5
 
 @click.group(name='tags')
 @click.pass_context
@@ -11,9 +29,10 @@ def tag_group(ctx):
 
 @tag_group.command(name='list')
 @common_options
+@library_fanout_options
 @click.pass_context
-def list_tags(ctx, **kwargs):
-    """List all tags in the library."""
+def list_tags(ctx, all_groups, libraries_spec, library_workers, **kwargs):
+    """List all tags in the library (or several, with --all-groups/--libraries)."""
     zot = ctx.obj['zot']
     
     # Extract relevant parameters for the tags call
@@ -21,6 +40,12 @@ def list_tags(ctx, **kwargs):
              ['limit', 'start', 'sort', 'direction']}
     
     try:
+        libraries = resolve_libraries(ctx, zot, all_groups, libraries_spec)
+        if libraries is not None:
+            echo_fanned_out(ctx, libraries, lambda client: client.tags(**params), library_workers,
+                            kwargs.get('output', 'json'), 'tag', keys_field='tag')
+            return
+
         # Get tags from the library
         tags = zot.tags(**params)
         
@@ -54,33 +79,255 @@ def list_item_tags(ctx, item_key, **kwargs):
     except Exception as e:
         handle_zotero_exceptions_and_exit(ctx, e)
 
+def _tag_delete_chunks(tag_names):
+    """Split tag names into groups the API accepts in one DELETE.
+
+    Each request takes at most 50 tags, and the encoded ``tag=a || b || ...`` query is
+    kept under MAX_TAG_QUERY_CHARS so long tag names do not overflow URL limits.
+    """
+    chunk, length = [], 0
+    separator_cost = len(quote(' || ', safe=''))
+    for name in tag_names:
+        cost = len(quote(name, safe='')) + separator_cost
+        if chunk and (len(chunk) == TAGS_PER_DELETE or length + cost > MAX_TAG_QUERY_CHARS):
+            yield chunk
+            chunk, length = [], 0
+        chunk.append(name)
+        length += cost
+    if chunk:
+        yield chunk
+
+
+def _delete_tag_chunk(zot, chunk):
+    """Delete one chunk of tags, retrying library version conflicts with backoff.
+
+    Pyzotero reads the current library version before every delete_tags() call, so
+    each retry is sent against the refreshed version.
+    """
+    for attempt in range(1, DELETE_MAX_ATTEMPTS + 1):
+        try:
+            return zot.delete_tags(*chunk)
+        except zotero_errors.PreConditionFailedError:
+            if attempt == DELETE_MAX_ATTEMPTS:
+                raise zotero_errors.PreConditionFailedError(
+                    "Library version conflict persisted after retries. "
+                    "Another process may be modifying the library."
+                )
+            telemetry.add_retry('version_conflict')
+            time.sleep(backoff_delay(attempt))
+
 @tag_group.command(name='delete')
 @click.argument('tag_names', nargs=-1, required=True)
 @click.option('--force', is_flag=True, help='Skip confirmation prompt.')
+@click.option('--workers', type=click.IntRange(1, 8), default=1, show_default=True,
+              help='Number of delete requests in flight. Concurrent deletes compete for the '
+                   'library version, so values above 2 mostly add conflict retries.')
 @click.pass_context
-def delete_tags(ctx, tag_names, force):
-    """Delete tag(s) from the library."""
+def delete_tags(ctx, tag_names, force, workers):
+    """Delete tag(s) from the library.
+
+    Any number of tags can be given; they are deleted in chunks of up to 50.
+    """
     zot = ctx.obj['zot']
-    
+    tag_names = list(dict.fromkeys(tag_names))
+    described = ', '.join(tag_names) if len(tag_names) <= TAGS_PER_DELETE else f"{len(tag_names)} tags"
+
     if not force and not ctx.obj.get('NO_INTERACTION'):
-        if not click.confirm(f"Are you sure you want to delete the following tags: {', '.join(tag_names)}?"):
+        if not click.confirm(f"Are you sure you want to delete the following tags: {described}?"):
             click.echo("Operation cancelled.")
             return
-    
-    max_retries = 3
-    for attempt in range(max_retries):
-        try:
-            zot.delete_tags(*tag_names)
-            click.echo(f"Successfully deleted tags: {', '.join(tag_names)}")
+
+    chunks = list(_tag_delete_chunks(tag_names))
+    get_client = thread_local_client_factory(ctx, zot)
+    failures = []
+    deleted = 0
+    try:
+        for chunk, _, error in map_concurrently(lambda c: _delete_tag_chunk(get_client(), c), chunks, max_workers=workers):
+            if error is None:
+                deleted += len(chunk)
+            else:
+                failures.append((chunk, error))
+    except Exception as e:
+        handle_zotero_exceptions_and_exit(ctx, e)
+
+    if not failures:
+        click.echo(f"Successfully deleted tags: {described}")
+        return
+    if len(chunks) == 1:
+        handle_zotero_exceptions_and_exit(ctx, failures[0][1])
+    click.echo(f"Deleted {deleted} of {len(tag_names)} tags.")
+    for chunk, error in failures:
+        click.echo(f"Error: failed to delete {len(chunk)} tags ({chunk[0]!r}...): {error}", err=True)
+    ctx.exit(1)
+
+def _fetch_tagged_items(zot, tag_names):
+    """All (non-trashed) items carrying any of ``tag_names``, deduplicated by key."""
+    found = {}
+    for tag_name in tag_names:
+        start = 0
+        while True:
+            page = zot.items(tag=tag_name, limit=TAGGED_ITEMS_PAGE_SIZE, start=start)
+            for item in page:
+                found.setdefault(item['key'], item)
+            if len(page) < TAGGED_ITEMS_PAGE_SIZE:
+                break
+            start += TAGGED_ITEMS_PAGE_SIZE
+    return list(found.values())
+
+
+def _refetch_items(zot, keys):
+    items = []
+    for batch in chunked(keys, WRITE_BATCH_SIZE):
+        items.extend(zot.items(itemKey=",".join(batch), limit=WRITE_BATCH_SIZE))
+    return items
+
+
+def _replace_tags(tags, sources, target):
+    """Return ``tags`` with every tag in ``sources`` renamed to ``target``, or None if nothing matched.
+
+    The tag type (manual/automatic) of the first replaced tag is kept; duplicates
+    created by the rename are dropped.
+    """
+    if not any(t.get('tag') in sources for t in tags):
+        return None
+    rewritten = []
+    seen = set()
+    for tag in tags:
+        if tag.get('tag') in sources:
+            tag = {**tag, 'tag': target}
+        if tag['tag'] in seen:
+            continue
+        seen.add(tag['tag'])
+        rewritten.append(tag)
+    return rewritten
+
+
+def _rewrite_tags(ctx, sources, target, force, dry_run, output):
+    zot = ctx.obj['zot']
+    try:
+        items = _fetch_tagged_items(zot, sources)
+        if not items:
+            click.echo(f"No items tagged {', '.join(repr(s) for s in sources)}.", err=True)
             return
-        except zotero_errors.PreConditionFailedError:
-            if attempt < max_retries - 1:
-                time.sleep(1)
-                continue
+        if dry_run:
+            summary = [{item['key']: f"Would retag ({item['data'].get('title') or item['data'].get('itemType', '')})"}
+                       for item in items]
+            click.echo(format_data_for_output(summary, output, preset_key='item'))
+            return
+        if not force and not ctx.obj.get('NO_INTERACTION'):
+            if not click.confirm(f"Rewrite tags on {len(items)} item(s): {', '.join(sources)} -> {target}?"):
+                click.echo("Operation cancelled.")
+                return
+
+        def transform(data):
+            tags = _replace_tags(data.get('tags', []), set(sources), target)
+            return None if tags is None else {'tags': tags}
+
+        results_summary = batched_update(zot, items, transform, lambda keys: _refetch_items(zot, keys))
+        click.echo(format_data_for_output(results_summary, output, preset_key='item'))
+        check_batch_operation_results(results_summary, ctx)
+    except Exception as e:
+        handle_zotero_exceptions_and_exit(ctx, e)
+
+@tag_group.command(name='rename')
+@click.argument('old_name', required=True)
+@click.argument('new_name', required=True)
+@click.option('--force', is_flag=True, help='Skip confirmation prompt.')
+@click.option('--dry-run', is_flag=True, help='List the affected items without changing them.')
+@output_option
+@click.pass_context
+def rename_tag(ctx, old_name, new_name, force, dry_run, output):
+    """Rename a tag on every item that carries it.
+
+    Affected items are rewritten in version-checked batches of 50; items changed
+    elsewhere in the meantime are fetched again and retried.
+    """
+    if old_name == new_name:
+        raise create_usage_error("OLD_NAME and NEW_NAME are the same.")
+    _rewrite_tags(ctx, [old_name], new_name, force, dry_run, output)
+
+@tag_group.command(name='merge')
+@click.argument('tag_names', nargs=-1, required=True)
+@click.option('--into', 'target', required=True, help='Tag that replaces all of TAG_NAMES.')
+@click.option('--force', is_flag=True, help='Skip confirmation prompt.')
+@click.option('--dry-run', is_flag=True, help='List the affected items without changing them.')
+@output_option
+@click.pass_context
+def merge_tags(ctx, tag_names, target, force, dry_run, output):
+    """Merge one or more tags into a single tag (e.g. 'merge ml machine-learning --into "machine learning"')."""
+    sources = [name for name in dict.fromkeys(tag_names) if name != target]
+    if not sources:
+        raise create_usage_error("Provide at least one tag different from the --into tag.")
+    _rewrite_tags(ctx, sources, target, force, dry_run, output)
+
+def _server_tags(zot):
+    tags = []
+    start = 0
+    while True:
+        page = zot.tags(limit=TAGGED_ITEMS_PAGE_SIZE, start=start)
+        tags.extend(page)
+        if len(page) < TAGGED_ITEMS_PAGE_SIZE:
+            return tags
+        start += TAGGED_ITEMS_PAGE_SIZE
+
+@tag_group.command(name='stats')
+@click.option('--top', 'top_n', type=click.IntRange(min=1), default=20, show_default=True,
+              help='Number of tags to show.')
+@click.option('--collection', 'collection_key', help='Only count items in this collection (and its subcollections with --recursive).')
+@click.option('--recursive', is_flag=True, help='With --collection, include items of subcollections.')
+@click.option('--cooccur', 'cooccur_tag', help='Count tags appearing on the same items as this tag.')
+@click.option('--orphans', is_flag=True, help='List tags that no item in the library (outside the trash) carries.')
+@click.option('--refresh', is_flag=True, help='Rebuild the local item store from scratch first.')
+@click.option('--output', type=click.Choice(['json', 'yaml', 'table', 'keys']), default='json', show_default=True,
+              help='Output format.')
+@click.pass_context
+def tag_stats(ctx, top_n, collection_key, recursive, cooccur_tag, orphans, refresh, output):
+    """Tag frequencies computed from the local item store.
+
+    The store is synced incrementally by library version before counting, so
+    repeated runs only fetch what changed. Counts are reported as meta.numItems.
+    """
+    from .item_store import open_synced_store
+
+    if recursive and not collection_key:
+        raise create_usage_error("--recursive requires --collection.")
+    if orphans and (collection_key or cooccur_tag):
+        raise create_usage_error("--orphans cannot be combined with --collection or --cooccur.")
+    zot = ctx.obj['zot']
+    try:
+        store, library = open_synced_store(zot, refresh=refresh)
+        with store:
+            index = store.tag_index(library)
+            types = store.tag_types(library)
+            if collection_key:
+                collections = [collection_key]
+                if recursive:
+                    from .collection_tree import load_collection_tree
+                    tree = load_collection_tree(zot)
+                    if collection_key in tree:
+                        collections = tree.subtree_keys(collection_key)
+                scope = store.collection_members(library, collections)
             else:
-                handle_zotero_exceptions_and_exit(ctx, zotero_errors.PreConditionFailedError(
-                    "Library version conflict persisted after retries. "
-                    "Another process may be modifying the library."
-                ))
-        except Exception as e:
-            handle_zotero_exceptions_and_exit(ctx, e)
+                scope = None
+
+        if orphans:
+            rows = [{'tag': name, 'type': types.get(name, 0), 'meta': {'numItems': 0}}
+                    for name in _server_tags(zot) if name not in index]
+            click.echo(format_data_for_output(rows, output, requested_fields_or_key='tag', preset_key='tag'))
+            return
+
+        if cooccur_tag is not None:
+            anchor = index.get(cooccur_tag, set())
+            scope = anchor if scope is None else anchor & scope
+        counts = Counter()
+        for name, keys in index.items():
+            if name == cooccur_tag:
+                continue
+            count = len(keys) if scope is None else len(keys & scope)
+            if count:
+                counts[name] = count
+        top = heapq.nsmallest(top_n, counts.items(), key=lambda kv: (-kv[1], kv[0].lower()))
+        rows = [{'tag': name, 'type': types.get(name, 0), 'meta': {'numItems': count}} for name, count in top]
+        click.echo(format_data_for_output(rows, output, requested_fields_or_key='tag', preset_key='tag'))
+    except Exception as e:
+        handle_zotero_exceptions_and_exit(ctx, e)
@@ -0,0 +1,365 @@
+"""Optional OpenTelemetry spans and metrics for CLI runs.
+
+Set ``ZOTCLI_OTEL_EXPORTER`` to ``otlp`` (an OTLP/HTTP collector, configured with the
+standard ``OTEL_EXPORTER_OTLP_*`` variables) or ``file`` (JSON lines appended to
+``ZOTCLI_OTEL_FILE``, by default ``otel.jsonl`` in the cache directory). This needs
+the ``otel`` extra (``pip install 'pyzotero-cli[otel]'``); OpenTelemetry is only
+imported when an exporter is configured.
+
+Each run produces one span for the invoked command (``zot items list``) carrying the
+library, the number of records output and the number of conflict retries, and one
+child span per outbound request to the Zotero API or doi.org. Metrics:
+
+* ``zotcli.http.requests`` - request count by method, host and status
+* ``zotcli.http.duration`` - request latency histogram (seconds)
+* ``zotcli.http.cache.requests`` - conditional requests by ``zotcli.cache.result``
+  (``hit`` for a 304 served from the HTTP cache, ``miss`` otherwise)
+* ``zotcli.retries`` - conflict retries by reason
+"""
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from importlib.metadata import PackageNotFoundError, version
+from typing import Any, Callable, Iterator
+from urllib.parse import urlsplit
+
+import click
+
+EXPORTER_ENV_VAR = "ZOTCLI_OTEL_EXPORTER"
+FILE_ENV_VAR = "ZOTCLI_OTEL_FILE"
+DEFAULT_TELEMETRY_FILE = "otel.jsonl"
+INSTRUMENTATION_NAME = "pyzotero_cli"
+
+_LIBRARY_PREFIXES = {"users": "user", "groups": "group"}
+
+
+class Telemetry:
+    """Tracer, meter and instruments for one configured pipeline."""
+
+    def __init__(self, tracer_provider: Any, meter_provider: Any, owned: bool = True):
+        self.tracer_provider = tracer_provider
+        self.meter_provider = meter_provider
+        # Providers built from the environment are shut down (flushed) at the end of the run
+        self.owned = owned
+        self.tracer = tracer_provider.get_tracer(INSTRUMENTATION_NAME, _package_version())
+        meter = meter_provider.get_meter(INSTRUMENTATION_NAME, _package_version())
+        self.request_counter = meter.create_counter(
+            "zotcli.http.requests", unit="{request}", description="Outbound HTTP requests")
+        self.request_duration = meter.create_histogram(
+            "zotcli.http.duration", unit="s", description="Outbound HTTP request latency")
+        self.cache_counter = meter.create_counter(
+            "zotcli.http.cache.requests", unit="{request}",
+            description="Conditional requests sent by the HTTP cache, by result (hit = 304)")
+        self.retry_counter = meter.create_counter(
+            "zotcli.retries", unit="{retry}", description="Requests retried after a version conflict")
+        self.command_span: Any = None
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def parent_context(self) -> Any:
+        from opentelemetry import trace
+
+        return trace.set_span_in_context(self.command_span) if self.command_span is not None else None
+
+    def record_request(self, method: str, url: str, start: float, status: int | None,
+                       error: BaseException | None = None, conditional: bool = False) -> None:
+        """Emit the span and metrics for a request that started at ``start`` (perf_counter)."""
+        from opentelemetry.trace import SpanKind, Status, StatusCode
+
+        seconds = time.perf_counter() - start
+        parts = urlsplit(url)
+        attributes: dict[str, Any] = {
+            "http.request.method": method,
+            "server.address": parts.hostname or "",
+            "url.path": parts.path,
+        }
+        segments = parts.path.strip("/").split("/")
+        if len(segments) >= 2 and segments[0] in _LIBRARY_PREFIXES:
+            attributes["zotero.library_type"] = _LIBRARY_PREFIXES[segments[0]]
+            attributes["zotero.library_id"] = segments[1]
+        if status is not None:
+            attributes["http.response.status_code"] = status
+
+        end_ns = time.time_ns()
+        span = self.tracer.start_span(
+            f"{method} {parts.hostname or ''}", context=self.parent_context(), kind=SpanKind.CLIENT,
+            attributes=attributes, start_time=end_ns - int(seconds * 1e9),
+        )
+        if error is not None:
+            span.record_exception(error)
+        if error is not None or (status is not None and status >= 400):
+            span.set_status(Status(StatusCode.ERROR))
+        span.end(end_time=end_ns)
+
+        metric_attributes = {k: attributes[k] for k in ("http.request.method", "server.address")}
+        if status is not None:
+            metric_attributes["http.response.status_code"] = status
+        self.request_counter.add(1, metric_attributes)
+        self.request_duration.record(seconds, metric_attributes)
+        if conditional:
+            self.cache_counter.add(1, {"zotcli.cache.result": "hit" if status == 304 else "miss"})
+
+    def add_retry(self, reason: str) -> None:
+        with self._lock:
+            self.retries += 1
+        self.retry_counter.add(1, {"zotcli.retry.reason": reason})
+
+    def flush(self) -> None:
+        if self.owned:
+            self.tracer_provider.shutdown()
+            self.meter_provider.shutdown()
+        else:
+            self.tracer_provider.force_flush()
+            self.meter_provider.force_flush()
+
+
+_active: Telemetry | None = None
+_warned_missing = False
+
+
+def _package_version() -> str:
+    try:
+        return version("pyzotero-cli")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def _file_exporters(path: str) -> tuple[Any, Any]:
+    from opentelemetry.sdk.metrics.export import ConsoleMetricExporter
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+    out = open(path, "a", encoding="utf-8")
+    return (
+        ConsoleSpanExporter(out=out, formatter=lambda span: span.to_json(indent=None) + os.linesep),
+        ConsoleMetricExporter(out=out, formatter=lambda data: data.to_json(indent=None) + os.linesep),
+    )
+
+
+def _otlp_exporters() -> tuple[Any, Any]:
+    from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+    return OTLPSpanExporter(), OTLPMetricExporter()
+
+
+def configure(span_exporter: Any = None, metric_reader: Any = None) -> Telemetry | None:
+    """Activate telemetry.
+
+    With explicit exporters (e.g. in-memory ones in tests or when embedding the CLI)
+    they are used as-is and stay active until ``disable()``. Otherwise the exporter is
+    chosen from ``ZOTCLI_OTEL_EXPORTER``; returns None when it is unset or OpenTelemetry
+    is not installed.
+    """
+    global _active, _warned_missing
+    owned = span_exporter is None and metric_reader is None
+    exporter_name = os.environ.get(EXPORTER_ENV_VAR, "").strip().lower()
+    if owned and exporter_name in ("", "none"):
+        return None
+    try:
+        from opentelemetry.sdk.metrics import MeterProvider
+        from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, SimpleSpanProcessor
+    except ImportError:
+        if not _warned_missing:
+            click.echo(f"Warning: {EXPORTER_ENV_VAR} is set but OpenTelemetry is not installed "
+                       "(pip install 'pyzotero-cli[otel]').", err=True)
+            _warned_missing = True
+        return None
+
+    if owned:
+        if exporter_name == "otlp":
+            try:
+                span_exporter, metric_exporter = _otlp_exporters()
+            except ImportError:
+                click.echo("Warning: the OTLP exporter is not installed "
+                           "(pip install opentelemetry-exporter-otlp-proto-http).", err=True)
+                return None
+        elif exporter_name == "file":
+            from .utils import get_cache_path
+
+            path = os.environ.get(FILE_ENV_VAR) or get_cache_path(DEFAULT_TELEMETRY_FILE)
+            try:
+                span_exporter, metric_exporter = _file_exporters(path)
+            except OSError as exc:
+                click.echo(f"Warning: could not open telemetry file '{path}': {exc}", err=True)
+                return None
+        else:
+            click.echo(f"Warning: unknown {EXPORTER_ENV_VAR} '{exporter_name}' (use 'otlp' or 'file').", err=True)
+            return None
+        # Metrics are exported once, when the providers are shut down at the end of the run
+        metric_reader = PeriodicExportingMetricReader(metric_exporter, export_interval_millis=60_000)
+
+    resource = Resource.create({"service.name": "pyzotero-cli", "service.version": _package_version()})
+    tracer_provider = TracerProvider(resource=resource)
+    if span_exporter is not None:
+        processor = BatchSpanProcessor(span_exporter) if exporter_name == "otlp" and owned else SimpleSpanProcessor(span_exporter)
+        tracer_provider.add_span_processor(processor)
+    meter_provider = MeterProvider(resource=resource, metric_readers=[metric_reader] if metric_reader else [])
+    _active = Telemetry(tracer_provider, meter_provider, owned=owned)
+    return _active
+
+
+def disable() -> None:
+    """Flush and deactivate the current pipeline."""
+    global _active
+    telemetry, _active = _active, None
+    if telemetry is not None:
+        telemetry.owned = True
+        telemetry.flush()
+
+
+def enabled() -> bool:
+    return _active is not None
+
+
+class TracedGroup(click.Group):
+    """Group that keeps its raw arguments, so the full command path can name the run's span."""
+
+    def parse_args(self, ctx: click.Context, args: list[str]) -> list[str]:
+        ctx.meta["zotcli.argv"] = list(args)
+        return super().parse_args(ctx, args)
+
+
+def command_path(ctx: click.Context, argv: list[str]) -> list[str]:
+    """Subcommand names in ``argv`` (e.g. ['items', 'list']), skipping group options and their values."""
+    names, command = [], ctx.command
+    tokens = iter(argv)
+    for token in tokens:
+        if not isinstance(command, click.Group):
+            break
+        if token.startswith("-"):
+            name = token.split("=", 1)[0]
+            option = next((p for p in command.params if name in p.opts + p.secondary_opts), None)
+            if isinstance(option, click.Option) and not option.is_flag and not option.count and "=" not in token:
+                next(tokens, None)
+            continue
+        subcommand = command.get_command(ctx, token)
+        if subcommand is None:
+            break
+        names.append(token)
+        command = subcommand
+    return names
+
+
+def start_command(ctx: click.Context) -> Callable[[], None] | None:
+    """Open the span for this run. Returns the close callback, or None when telemetry is off."""
+    telemetry = _active or configure()
+    if telemetry is None:
+        return None
+    from opentelemetry.trace import SpanKind, Status, StatusCode
+
+    path = command_path(ctx, ctx.meta.get("zotcli.argv", []))
+    name = " ".join([ctx.info_name or "zot", *path])
+    telemetry.retries = 0
+    telemetry.command_span = telemetry.tracer.start_span(
+        name, kind=SpanKind.INTERNAL, attributes={"zotcli.command": " ".join(path)})
+
+    def finish() -> None:
+        span = telemetry.command_span
+        # Close callbacks run while an exception (if any) is propagating out of the context
+        error = sys.exc_info()[1]
+        exit_code = 0
+        if isinstance(error, click.exceptions.Exit):
+            exit_code = error.exit_code
+        elif isinstance(error, click.ClickException):
+            exit_code = error.exit_code
+        elif error is not None:
+            exit_code = 1
+            span.record_exception(error)
+        span.set_attribute("zotcli.exit_code", exit_code)
+        span.set_attribute("zotcli.retry_count", telemetry.retries)
+        if exit_code:
+            span.set_status(Status(StatusCode.ERROR))
+        span.end()
+        telemetry.command_span = None
+        if telemetry.owned:
+            disable()
+        else:
+            telemetry.flush()
+
+    return finish
+
+
+def set_command_attributes(**attributes: Any) -> None:
+    """Add ``zotero.<name>``/``zotcli.<name>`` attributes to the command span, if any."""
+    span = _active.command_span if _active is not None else None
+    if span is None:
+        return
+    for name, value in attributes.items():
+        if value is not None:
+            span.set_attribute(name, value)
+
+
+def set_item_count(count: int) -> None:
+    set_command_attributes(**{"zotcli.item_count": count})
+
+
+def add_retry(reason: str) -> None:
+    if _active is not None:
+        _active.add_retry(reason)
+
+
+class TracingTransport:
+    """Transport wrapper emitting a client span and request metrics for every request."""
+
+    def __init__(self, inner: Any, telemetry: Telemetry | None = None):
+        self.inner = inner
+        self.telemetry = telemetry or _active
+
+    def handle_request(self, request: Any) -> Any:
+        start = time.perf_counter()
+        conditional = "if-modified-since-version" in request.headers
+        try:
+            response = self.inner.handle_request(request)
+        except Exception as exc:
+            self.telemetry.record_request(request.method, str(request.url), start, None, exc, conditional)
+            raise
+        self.telemetry.record_request(request.method, str(request.url), start, response.status_code,
+                                      conditional=conditional)
+        return response
+
+    async def handle_async_request(self, request: Any) -> Any:
+        start = time.perf_counter()
+        conditional = "if-modified-since-version" in request.headers
+        try:
+            response = await self.inner.handle_async_request(request)
+        except Exception as exc:
+            self.telemetry.record_request(request.method, str(request.url), start, None, exc, conditional)
+            raise
+        self.telemetry.record_request(request.method, str(request.url), start, response.status_code,
+                                      conditional=conditional)
+        return response
+
+    def close(self) -> None:
+        self.inner.close()
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+    def __enter__(self) -> "TracingTransport":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+@contextmanager
+def request_span(method: str, url: str) -> Iterator[Callable[[int], None]]:
+    """Trace a request made outside httpx (e.g. urllib); call the yielded function with the status."""
+    telemetry = _active
+    status: list[int] = []
+    if telemetry is None:
+        yield status.append
+        return
+    start = time.perf_counter()
+    try:
+        yield status.append
+    except Exception as exc:
+        code = getattr(exc, "code", None)
+        telemetry.record_request(method, url, start, code if isinstance(code, int) else None, exc)
+        raise
+    telemetry.record_request(method, url, start, status[-1] if status else None)
@@ -1,4 +1,5 @@
 import click
+from . import schema
 from .utils import format_data_for_output, handle_zotero_exceptions_and_exit, initialize_zotero_client
 from typing import cast
 from tabulate import tabulate
@@ -54,11 +55,9 @@ def last_modified_version(ctx):
 def item_types(ctx, output):
     """List all available item types."""
     try:
-        # For item_types, we don't need full Zotero client, can call class method
-        # However, to respect potential 'local' or 'locale' settings if they were to influence this,
-        # we instantiate, though pyzotero's item_types is static currently.
+        # The client is still needed for its endpoint, locale and HTTP settings
         zot = initialize_zotero_client(ctx)
-        types_data = zot.item_types()
+        types_data = schema.item_types(zot)
         if output == 'table':
             headers = ["Item Type", "Localized Name"]
             rows = [[cast(dict, it).get('itemType', ''), cast(dict, it).get('localized', '')] for it in types_data]
@@ -75,7 +74,7 @@ def item_fields(ctx, output):
     """List all available item fields."""
     try:
         zot = initialize_zotero_client(ctx)
-        fields_data = zot.item_fields()
+        fields_data = schema.item_fields(zot)
         if output == 'table':
             headers = ["Field", "Localized Name"]
             rows = [[cast(dict, f).get('field', ''), cast(dict, f).get('localized', '')] for f in fields_data]
@@ -93,7 +92,7 @@ def item_type_fields(ctx, item_type, output):
     """List fields for a specific item type."""
     try:
         zot = initialize_zotero_client(ctx)
-        type_fields_data = zot.item_type_fields(itemtype=item_type)
+        type_fields_data = schema.item_type_fields(zot, item_type)
         if output == 'table':
             headers = ["Field", "Localized Name"]
             rows = [[cast(dict, f).get('field', ''), cast(dict, f).get('localized', '')] for f in type_fields_data]
@@ -112,10 +111,7 @@ def item_template(ctx, item_type, linkmode, output): # Added output param for co
     """Generate an item template (for item create)."""
     try:
         zot = initialize_zotero_client(ctx)
-        params = {}
-        if linkmode:
-            params['linkmode'] = linkmode
-        template_data = zot.item_template(item_type, **params)
+        template_data = schema.item_template(zot, item_type, linkmode=linkmode)
         # Per spec, only JSON output. format_data_for_output will handle this.
         click.echo(format_data_for_output(template_data, 'json'))
     except Exception as e:
@@ -3,6 +3,9 @@ import json as json_lib
 import os
 from typing import Any, Callable, cast
 
+from .instrumentation import timed
+from . import records, telemetry
+
 # --- Define a comprehensive list of known Zotero sort keys ---
 # This list is for user guidance; not all keys are valid for all endpoints.
 # The API/pyzotero will handle errors for invalid key/endpoint combinations.
@@ -268,6 +271,7 @@ TABLE_HEADER_PRESETS = {
     ]
 }
 
+@timed('format')
 def format_data_for_output(data, output_format, requested_fields_or_key=None, table_headers_map=None, preset_key=None):
     """
     Formats data for output based on the specified format.
@@ -285,6 +289,13 @@ def format_data_for_output(data, output_format, requested_fields_or_key=None, ta
         preset_key: String key for predefined table header mappings (e.g., 'collection', 'item').
                     If provided and matches an entry in TABLE_HEADER_PRESETS, those headers are used.
     """
+    if isinstance(data, list):
+        telemetry.set_item_count(len(data))
+    if records.is_record_list(data):
+        # Compact records: stream JSON item by item; tables and keys need only the summary fields
+        if output_format == 'json':
+            return records.dumps(data)
+        data = [r.summary() if output_format in ('table', 'keys') else r.to_item() for r in data]
     if output_format == 'json':
         return json_lib.dumps(data, indent=2, ensure_ascii=False)
     elif output_format == 'yaml':
@@ -649,7 +660,7 @@ def handle_zotero_exceptions_and_exit(ctx, e):
         import sys
         sys.exit(1)
 
-def initialize_zotero_client(ctx):
+def initialize_zotero_client(ctx, library_id=None, library_type=None):
     """
     Centralized Zotero client initialization function.
     
@@ -659,6 +670,8 @@ def initialize_zotero_client(ctx):
     
     Args:
         ctx: Click context object containing configuration
+        library_id: Optional library ID overriding the configured one (e.g. for multi-library commands)
+        library_type: Optional library type ('user' or 'group') to use with library_id
         
     Returns:
         zotero.Zotero: Initialized Zotero client instance
@@ -669,6 +682,7 @@ def initialize_zotero_client(ctx):
     """
     from pyzotero import zotero
     from pyzotero.zotero_errors import PyZoteroError
+    from .http_transport import configure_client
     
     config = ctx.obj
     
@@ -694,16 +708,65 @@ def initialize_zotero_client(ctx):
 
     try:
         client = zotero.Zotero(
-            library_id=config.get('LIBRARY_ID'),
-            library_type=config.get('LIBRARY_TYPE'),
+            library_id=library_id or config.get('LIBRARY_ID'),
+            library_type=library_type or config.get('LIBRARY_TYPE'),
             api_key=config.get('API_KEY'),
             locale=config.get('LOCALE', 'en-US'),
             local=use_local
         )
-        return client
+        return configure_client(client, config)
     except PyZoteroError as e:
         click.echo(f"Zotero API Error during client initialization: {e}", err=True)
         ctx.exit(1)
     except Exception as e:
         click.echo(f"An unexpected error occurred during Zotero client initialization: {e}", err=True)
-        ctx.exit(1) 
\ No newline at end of file
+        ctx.exit(1)
+
+def get_cache_path(filename):
+    """
+    Returns the path of a file inside the zotcli cache directory, creating the directory if needed.
+
+    The cache directory defaults to ~/.config/zotcli/cache and can be moved with the
+    ZOTCLI_CACHE_DIR environment variable.
+
+    Args:
+        filename: Name of the file inside the cache directory
+
+    Returns:
+        str: Absolute path of the cache file
+    """
+    cache_dir = os.environ.get('ZOTCLI_CACHE_DIR') or os.path.join(os.path.expanduser("~"), ".config", "zotcli", "cache")
+    os.makedirs(cache_dir, exist_ok=True)
+    return os.path.join(cache_dir, filename)
+
+def library_cache_key(zot_client):
+    """
+    Returns a stable identifier for the library a client points at, e.g. 'users:12345'.
+
+    Used to namespace cached state so several libraries can share one cache file.
+    """
+    library_type = getattr(zot_client, 'library_type', None) or 'unknown'
+    library_id = getattr(zot_client, 'library_id', None) or 'unknown'
+    return f"{library_type}:{library_id}"
+
+def load_cache_json(filename):
+    """Loads a JSON document from the cache directory, returning {} if it is missing or unreadable."""
+    try:
+        with open(get_cache_path(filename), 'r', encoding='utf-8') as f:
+            data = json_lib.load(f)
+        if isinstance(data, dict):
+            return data
+    except (FileNotFoundError, json_lib.JSONDecodeError, OSError):
+        pass
+    return {}
+
+def save_cache_json(filename, data):
+    """Atomically writes a JSON document to the cache directory. Write failures are ignored."""
+    path = get_cache_path(filename)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json_lib.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
@@ -1,3 +1,5 @@
+from . import instrumentation  # first, so the import phase covers everything below
+import time
 import click
 import os
 import configparser
@@ -5,6 +7,8 @@ from importlib.metadata import version
 from pyzotero import zotero as pyzotero_client # Import the client class
 from pyzotero import zotero_errors # Import exceptions
 from .utils import handle_zotero_exceptions_and_exit, create_click_exception, create_usage_error # Import error handler
+from .http_transport import configure_client, load_transport_factory, resolve_api_base_url, resolve_transport_spec
+from . import cassette, profiling, telemetry
 
 # Define the configuration directory and file path
 CONFIG_DIR = os.path.join(os.path.expanduser("~"), ".config", "zotcli")
@@ -34,7 +38,7 @@ def print_version(ctx, param, value):
     click.echo(version("pyzotero-cli"))
     ctx.exit()
 
-@click.group(name='zot')
+@click.group(name='zot', cls=telemetry.TracedGroup)
 @click.option('--version', is_flag=True, callback=print_version,
               expose_value=False, is_eager=True, help="Show the version and exit.")
 @click.option('--profile', default=None, help='Use a specific configuration profile.')
@@ -45,9 +49,30 @@ def print_version(ctx, param, value):
 @click.option('--verbose', '-v', is_flag=True, help='Verbose logging.')
 @click.option('--debug', is_flag=True, help='Debug logging.')
 @click.option('--no-interaction', is_flag=True, help='Disable interactive prompts.')
+@click.option('--http-cache/--no-http-cache', default=None, help='Cache API responses and revalidate them with If-Modified-Since-Version (default: ZOTCLI_HTTP_CACHE or profile "http_cache", else off).')
+@click.option('--timings', is_flag=True, help='Print per-phase and per-request timings to stderr (set ZOTCLI_TRACE_FILE to also write a JSON trace).')
+@click.option('--profile-run', type=click.Choice(profiling.PROFILE_MODES), default=None, help='Profile this run: "cpu" (cProfile, top functions by cumulative time) or "memory" (tracemalloc peak and largest allocations).')
+@click.option('--profile-file', type=click.Path(dir_okay=False, writable=True), default=None, help='With --profile-run, write the .pstats file (cpu) or tracemalloc snapshot (memory) here.')
+@click.option('--profile-top', type=click.IntRange(min=1), default=profiling.DEFAULT_TOP, show_default=True, help='Number of functions or allocation sites reported by --profile-run.')
+@click.option('--record', 'record_dir', type=click.Path(file_okay=False), default=None, help='Record every API request and response into a cassette in DIR (replaced if it exists).')
+@click.option('--replay', 'replay_dir', type=click.Path(exists=True, file_okay=False), default=None, help='Answer API requests from the cassette in DIR instead of the network.')
+@click.option('--replay-latency', default=None, metavar='SECONDS|recorded', help='With --replay, wait this long per request, or "recorded" to reproduce the recorded latencies.')
+@click.option('--max-concurrency', type=click.IntRange(min=1), default=None, help='Maximum API requests in flight at once for concurrent commands (default: ZOTCLI_MAX_CONCURRENCY or profile "max_concurrency", else 32).')
 @click.pass_context
-def _zot_main_group_logic(ctx, profile, api_key, library_id, library_type, local, verbose, debug, no_interaction): # version_ parameter is not needed due to expose_value=False
+def _zot_main_group_logic(ctx, profile, api_key, library_id, library_type, local, verbose, debug, no_interaction, http_cache, timings, profile_run, profile_file, profile_top, record_dir, replay_dir, replay_latency, max_concurrency): # version_ parameter is not needed due to expose_value=False
     """A CLI for interacting with Zotero libraries via Pyzotero."""
+    report_profile = profiling.start(profile_run, profile_file, profile_top)
+    if report_profile:
+        ctx.call_on_close(report_profile)
+    report_timings = instrumentation.start(timings)
+    if report_timings:
+        # Close callbacks run last-in first-out: the command phase is closed before the report
+        ctx.call_on_close(report_timings)
+        command_start = [time.perf_counter()]
+        ctx.call_on_close(lambda: instrumentation.recorder.add_phase('command', time.perf_counter() - command_start[0]))
+    finish_span = telemetry.start_command(ctx)
+    if finish_span:
+        ctx.call_on_close(finish_span)
     ctx.ensure_object(dict)
     ctx.obj['PROFILE'] = profile
     ctx.obj['API_KEY'] = api_key
@@ -57,12 +82,15 @@ def _zot_main_group_logic(ctx, profile, api_key, library_id, library_type, local
     ctx.obj['VERBOSE'] = verbose
     ctx.obj['DEBUG'] = debug
     ctx.obj['NO_INTERACTION'] = no_interaction
+    ctx.obj['HTTP_CACHE'] = http_cache
+    ctx.obj['MAX_CONCURRENCY'] = max_concurrency
 
     # Skip credential validation and client instantiation for 'configure' commands
     if ctx.invoked_subcommand == 'configure':
         return
 
-    config = load_config()
+    with instrumentation.recorder.phase('load_config'):
+        config = load_config()
     active_profile_name = profile or config.get('zotcli', 'current_profile', fallback='default')
 
     if active_profile_name == 'default' and 'default' not in config:
@@ -116,6 +144,7 @@ def _zot_main_group_logic(ctx, profile, api_key, library_id, library_type, local
     ctx.obj['API_KEY'] = final_api_key
     ctx.obj['LIBRARY_ID'] = final_library_id
     ctx.obj['LIBRARY_TYPE'] = final_library_type
+    telemetry.set_command_attributes(**{'zotero.library_id': final_library_id, 'zotero.library_type': final_library_type})
     
     # Locale and Local flag (original logic for these seemed okay, but let's ensure consistency if needed)
     # For Locale: CLI (--locale, though not a direct zot option) > ENV > Profile > Default
@@ -169,11 +198,38 @@ def _zot_main_group_logic(ctx, profile, api_key, library_id, library_type, local
             hint="Set via --library-type, ZOTERO_LIBRARY_TYPE, or profile"
         )
 
+    # API endpoint and transport hook: ENV > Profile (validated here so a typo is a usage error)
+    try:
+        ctx.obj['API_BASE_URL'] = resolve_api_base_url(ctx.obj)
+    except ValueError as e:
+        raise create_usage_error("Invalid API base URL", details=str(e),
+                                 hint="Set ZOTERO_API_BASE_URL or 'api_base_url' to e.g. http://localhost:8085") from e
+    transport_spec = resolve_transport_spec(ctx.obj)
+    if transport_spec:
+        try:
+            ctx.obj['TRANSPORT_FACTORY'] = load_transport_factory(transport_spec)
+        except ValueError as e:
+            raise create_usage_error("Invalid transport hook", details=str(e),
+                                     hint="Set ZOTCLI_TRANSPORT or 'transport' to 'package.module:factory'") from e
+
+    if record_dir and replay_dir:
+        raise create_usage_error("--record and --replay cannot be used together")
+    if replay_latency is not None and not replay_dir:
+        raise create_usage_error("--replay-latency requires --replay")
+    if record_dir or replay_dir:
+        try:
+            latency = cassette.parse_latency(replay_latency)
+        except click.BadParameter as e:
+            raise create_usage_error("Invalid --replay-latency", details=e.message) from e
+        ctx.obj['CASSETTE'] = cassette.Cassette(record_dir or replay_dir, 'record' if record_dir else 'replay', latency)
+        ctx.call_on_close(ctx.obj['CASSETTE'].close)
+
+    client_start = time.perf_counter()
     try:
         # <<< START DEBUG PRINTS >>>
         if ctx.obj['DEBUG']:
             # Log the actual values that will be passed to the constructor
-            click.echo(f"DEBUG: Instantiating Zotero with: library_id='{final_library_id}', library_type='{final_library_type}', api_key='{final_api_key if not ctx.obj['LOCAL'] else None}', local={ctx.obj['LOCAL']}, locale='{ctx.obj['LOCALE']}'", err=True)
+            click.echo(f"DEBUG: Instantiating Zotero with: library_id='{final_library_id}', library_type='{final_library_type}', api_key='{final_api_key if not ctx.obj['LOCAL'] else None}', local={ctx.obj['LOCAL']}, locale='{ctx.obj['LOCALE']}', api_base_url='{ctx.obj.get('API_BASE_URL')}'", err=True)
         # <<< END DEBUG PRINTS >>>
         zot_client = pyzotero_client.Zotero(
             library_id=final_library_id,  # Pass directly
@@ -183,7 +239,11 @@ def _zot_main_group_logic(ctx, profile, api_key, library_id, library_type, local
             locale=ctx.obj['LOCALE'],
             # preserve_json_order could be added as an option/config if needed
         )
-        ctx.obj['ZOTERO_CLIENT'] = zot_client
+        ctx.obj['ZOTERO_CLIENT'] = configure_client(zot_client, ctx.obj)
+        # The only place the 'client' phase is recorded; clients built later by command groups count towards 'command'
+        instrumentation.recorder.add_phase('client', time.perf_counter() - client_start)
+        if report_timings:
+            command_start[0] = time.perf_counter()
 
     except zotero_errors.PyZoteroError as e:
         # Use the shared handler for Zotero-specific errors during instantiation
@@ -201,6 +261,7 @@ from pyzotero_cli.search_cmds import search_group  # noqa: E402
 from pyzotero_cli.fulltext_cmds import fulltext_group  # noqa: E402
 from pyzotero_cli.group_cmds import group_group  # noqa: E402
 from pyzotero_cli.util_cmds import util_group  # noqa: E402
+from pyzotero_cli.query_cmds import query_command  # noqa: E402
 
 # Add command groups to the main zot application
 zot.add_command(item_group, name='items')
@@ -211,6 +272,7 @@ zot.add_command(search_group, name='search')
 zot.add_command(fulltext_group, name='fulltext')
 zot.add_command(group_group, name='groups')
 zot.add_command(util_group, name='util')
+zot.add_command(query_command, name='query')
 
 @zot.group()
 def configure():
@@ -270,8 +332,8 @@ def set_config(ctx, key, value, profile_name):
     if section_name not in config:
         config.add_section(section_name)
 
-    # Special handling for boolean 'local_zotero'
-    if key == 'local_zotero':
+    # Special handling for boolean keys
+    if key in ('local_zotero', 'http_cache'):
         value = str(value.lower() in ['true', '1', 'yes', 'on'])
     
     config[section_name][key] = value
@@ -48,6 +48,13 @@ def isolated_config():
         except OSError:
             pass
 
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    """Points the zotcli cache directory at a per-test temporary directory."""
+    cache_dir = tmp_path / "zotcli_cache"
+    monkeypatch.setenv("ZOTCLI_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
 @pytest.fixture(scope="session")
 def real_api_credentials():
     """Provides Zotero API credentials from environment variables. Skips test if not found."""
@@ -25,6 +25,7 @@ class MockZoteroClient:
         self._created_items = {}
         self._deleted_keys = set()
         self._counter = 0
+        self.updated_batches = []
 
     def _next_key(self):
         self._counter += 1
@@ -41,6 +42,13 @@ class MockZoteroClient:
         if kwargs.get("format") == "bibtex":
             return "@book{mock2024,\n  title={Mock Book},\n  author={Author, Mock},\n  year={2024}\n}"
         data = _load_json("items_doc.json")
+        if kwargs.get("tag"):
+            data = [i for i in data if any(t["tag"] == kwargs["tag"] for t in i["data"].get("tags", []))]
+        if kwargs.get("itemKey"):
+            keys = kwargs["itemKey"].split(",")
+            data = [i for i in data if i["key"] in keys]
+        if kwargs.get("start"):
+            data = data[int(kwargs["start"]):]
         limit = kwargs.get("limit")
         if limit:
             data = data[:int(limit)]
@@ -116,6 +124,10 @@ class MockZoteroClient:
             self._created_items[key]["version"] += 1
         return True
 
+    def update_items(self, payloads):
+        self.updated_batches.append(copy.deepcopy(payloads))
+        return True
+
     def delete_item(self, item_dict):
         key = item_dict.get("key") if isinstance(item_dict, dict) else None
         if key:
@@ -127,6 +139,11 @@ class MockZoteroClient:
         return True
 
     def item_template(self, item_type, linkmode=None):
+        if item_type == "attachment" and not linkmode:
+            # The API answers 400 when an attachment template is requested without a link mode
+            raise PyZoteroError("Code: 400\nResponse: Invalid linkMode ''")
+        if item_type == "note":
+            return {"itemType": "note", "note": "", "tags": [], "collections": [], "relations": {}}
         # Base fields common to all types
         base = {
             "itemType": item_type,
@@ -159,7 +176,6 @@ class MockZoteroClient:
             "webpage": {"websiteTitle": "", "websiteType": ""},
             "thesis": {"university": "", "thesisType": "", "place": ""},
             "attachment": {"linkMode": linkmode or "", "contentType": "", "charset": "", "filename": "", "parentItem": ""},
-            "note": {"note": "", "parentItem": ""},
         }
         if item_type in type_fields:
             base.update(type_fields[item_type])
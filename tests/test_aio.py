@@ -0,0 +1,129 @@
+import asyncio
+import importlib
+import json
+
+import pytest
+from pyzotero import zotero
+from pyzotero.zotero_errors import ResourceNotFoundError
+
+from pyzotero_cli import aio
+from pyzotero_cli import doi as doi_utils
+from pyzotero_cli.zot_cli import zot
+
+ITEMS = {f"ITEM{index:04d}": {"key": f"ITEM{index:04d}", "version": index, "data": {"title": f"Paper {index}"}}
+         for index in range(120)}
+SERVER = {"requests": []}
+
+
+def _httpx():
+    client = zotero.Zotero("12345", "user", "fake_api_key")
+    return importlib.import_module(type(client.client).__module__.split('.')[0])
+
+
+def items_server(inner):
+    """Transport hook (ZOTCLI_TRANSPORT) answering itemKey requests from ITEMS."""
+    httpx = _httpx()
+
+    def handler(request):
+        SERVER["requests"].append(str(request.url))
+        keys = request.url.params.get("itemKey", "").split(",")
+        # Answer in server order rather than request order
+        return httpx.Response(200, json=[ITEMS[key] for key in sorted(keys) if key in ITEMS])
+
+    return httpx.MockTransport(handler)
+
+
+@pytest.fixture
+def engine():
+    engines = []
+
+    def make(handler, limit=4):
+        httpx = _httpx()
+        created = aio.AsyncEngine({"TRANSPORT_FACTORY": lambda inner: httpx.MockTransport(handler)}, limit=limit)
+        engines.append(created)
+        return created
+
+    yield make
+    for created in engines:
+        created.close()
+
+
+def test_map_respects_the_global_limit(engine):
+    httpx = _httpx()
+    state = {"in_flight": 0, "peak": 0}
+
+    async def handler(request):
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        await asyncio.sleep(0.01)
+        state["in_flight"] -= 1
+        return httpx.Response(200, json={"content": request.url.path})
+
+    client = zotero.Zotero("12345", "user", "fake_api_key")
+    running = engine(handler, limit=3)
+    results = {key: data for key, data, error in
+               running.map(lambda key: running.zotero_get(client, f"/items/{key}/fulltext"), range(20), limit=10)}
+    assert results == {key: {"content": f"/users/12345/items/{key}/fulltext"} for key in range(20)}
+    assert state["peak"] == 3
+
+
+def test_rate_limited_requests_are_retried(engine):
+    httpx = _httpx()
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0.01"})
+        return httpx.Response(200, json={"content": "ok"}, headers={"Backoff": "0.01"})
+
+    client = zotero.Zotero("12345", "user", "fake_api_key")
+    running = engine(handler)
+    assert running.run(running.zotero_get(client, "/items/AAAA1111/fulltext")) == {"content": "ok"}
+    assert len(calls) == 2
+
+
+def test_error_responses_raise_pyzotero_errors(engine):
+    httpx = _httpx()
+    client = zotero.Zotero("12345", "user", "fake_api_key")
+    running = engine(lambda request: httpx.Response(404, text="Not found"))
+    [(_, result, error)] = list(running.map(lambda key: running.zotero_get(client, f"/items/{key}/fulltext"), ["X"]))
+    assert result is None
+    assert isinstance(error, ResourceNotFoundError)
+
+
+def test_doi_lookups_go_through_the_engine(engine):
+    httpx = _httpx()
+
+    def handler(request):
+        if request.url.path.endswith("missing"):
+            return httpx.Response(404)
+        assert request.headers["accept"] == doi_utils.DOI_CSL_ACCEPT_HEADER
+        return httpx.Response(200, json={"DOI": request.url.path.lstrip("/"), "type": "article-journal"})
+
+    running = engine(handler)
+    assert running.run(doi_utils.fetch_csl_json_for_doi_async(running, "10.1000/a"))["DOI"] == "10.1000/a"
+    with pytest.raises(doi_utils.DOIError, match="HTTP 404"):
+        running.run(doi_utils.fetch_csl_json_for_doi_async(running, "10.1000/missing"))
+
+
+def test_max_concurrency_precedence(monkeypatch):
+    monkeypatch.delenv(aio.MAX_CONCURRENCY_ENV_VAR, raising=False)
+    assert aio.max_concurrency({}) == aio.DEFAULT_MAX_CONCURRENCY
+    assert aio.max_concurrency({"PROFILE_CONFIG": {"max_concurrency": "8"}}) == 8
+    monkeypatch.setenv(aio.MAX_CONCURRENCY_ENV_VAR, "16")
+    assert aio.max_concurrency({"PROFILE_CONFIG": {"max_concurrency": "8"}}) == 16
+    assert aio.max_concurrency({"MAX_CONCURRENCY": 2, "PROFILE_CONFIG": {"max_concurrency": "8"}}) == 2
+
+
+def test_items_get_fetches_chunks_concurrently(runner, isolated_config, monkeypatch):
+    monkeypatch.setenv("ZOTERO_API_KEY", "fake_api_key")
+    monkeypatch.setenv("ZOTERO_LIBRARY_ID", "12345")
+    monkeypatch.setenv("ZOTERO_LIBRARY_TYPE", "user")
+    monkeypatch.setenv("ZOTCLI_TRANSPORT", "test_aio:items_server")
+    SERVER["requests"] = []
+    keys = list(reversed(ITEMS))
+    result = runner.invoke(zot, ['--no-interaction', '--max-concurrency', '2', 'items', 'get', *keys])
+    assert result.exit_code == 0, result.output
+    assert [item["key"] for item in json.loads(result.output)] == keys
+    assert len(SERVER["requests"]) == 3  # itemKey accepts at most 50 keys per request
@@ -0,0 +1,106 @@
+import importlib
+import json
+
+import pytest
+from pyzotero import zotero
+
+from pyzotero_cli import cassette
+from pyzotero_cli.http_transport import configure_client
+from pyzotero_cli.zot_cli import zot
+
+ITEMS = [{"key": f"ITEM{index:04d}", "version": index, "data": {"key": f"ITEM{index:04d}", "title": f"Paper {index}"}}
+         for index in range(5)]
+SERVER = {"requests": 0}
+
+
+def _httpx():
+    client = zotero.Zotero("12345", "user", "fake_api_key")
+    return importlib.import_module(type(client.client).__module__.split('.')[0])
+
+
+def paging_server(inner):
+    """Transport hook (ZOTCLI_TRANSPORT) serving ITEMS two per page with Link headers."""
+    httpx = _httpx()
+
+    def handler(request):
+        SERVER["requests"] += 1
+        params = dict(request.url.params)
+        start, limit = int(params.get("start", 0)), int(params.get("limit", 2))
+        headers = {"Content-Type": "application/json", "Last-Modified-Version": "5", "Total-Results": str(len(ITEMS))}
+        if start + limit < len(ITEMS):
+            headers["Link"] = f'<{request.url.copy_merge_params({"start": start + limit})}>; rel="next"'
+        return httpx.Response(200, headers=headers, json=ITEMS[start:start + limit])
+
+    return httpx.MockTransport(handler)
+
+
+def failing_network(inner):
+    def handler(request):
+        raise AssertionError(f"network used during replay: {request.url}")
+
+    return _httpx().MockTransport(handler)
+
+
+@pytest.fixture
+def credentials(isolated_config, monkeypatch):
+    monkeypatch.setenv("ZOTERO_API_KEY", "fake_api_key")
+    monkeypatch.setenv("ZOTERO_LIBRARY_ID", "12345")
+    monkeypatch.setenv("ZOTERO_LIBRARY_TYPE", "user")
+
+
+def test_record_then_replay_cli(runner, credentials, tmp_path, monkeypatch):
+    directory = str(tmp_path / "cassette")
+    monkeypatch.setenv("ZOTCLI_TRANSPORT", "test_cassette:paging_server")
+    recorded = runner.invoke(zot, ['--no-interaction', '--record', directory, 'items', 'list', '--limit', '2'])
+    assert recorded.exit_code == 0, recorded.output
+
+    monkeypatch.setenv("ZOTCLI_TRANSPORT", "test_cassette:failing_network")
+    replayed = runner.invoke(zot, ['--no-interaction', '--replay', directory, 'items', 'list', '--limit', '2'])
+    assert replayed.exit_code == 0, replayed.output
+    assert replayed.output == recorded.output
+    assert json.loads(replayed.output)[0]["key"] == "ITEM0000"
+
+    missing = runner.invoke(zot, ['--no-interaction', '--replay', directory, 'items', 'list', '--limit', '3'])
+    assert missing.exit_code == 1
+    assert "No recorded response" in missing.output
+
+
+def test_replay_preserves_paging_headers(tmp_path):
+    directory = str(tmp_path / "cassette")
+    recorder = cassette.Cassette(directory, "record")
+    client = configure_client(zotero.Zotero("12345", "user", "fake_api_key"),
+                              {"TRANSPORT_FACTORY": paging_server, "CASSETTE": recorder})
+    SERVER["requests"] = 0
+    assert client.everything(client.top(limit=2)) == ITEMS
+    recorder.close()
+    assert SERVER["requests"] == 3
+
+    player = cassette.Cassette(directory, "replay")
+    assert len(player) == 3
+    client = configure_client(zotero.Zotero("12345", "user", "other_key"),
+                              {"TRANSPORT_FACTORY": failing_network, "CASSETTE": player})
+    assert client.everything(client.top(limit=2)) == ITEMS
+    assert SERVER["requests"] == 3
+
+
+def test_repeated_requests_replay_in_order(tmp_path):
+    httpx = _httpx()
+    directory = str(tmp_path / "cassette")
+    recorder = cassette.Cassette(directory, "record")
+    request = httpx.Request("GET", "https://api.zotero.org/users/1/items?limit=1")
+    recorder.record(request, 200, {"Last-Modified-Version": "1"}, b"[1]", 0.5)
+    recorder.record(request, 200, {"Last-Modified-Version": "2"}, b"[2]", 0.5)
+    recorder.close()
+
+    player = cassette.Cassette(directory, "replay", latency=cassette.RECORDED_LATENCY)
+    # Host and credentials are not part of the fingerprint
+    replayed = httpx.Request("GET", "http://127.0.0.1:8085/users/1/items?limit=1", headers={"Zotero-API-Key": "x"})
+    assert [player.lookup(replayed)[2] for _ in range(3)] == [b"[1]", b"[2]", b"[2]"]
+
+
+def test_record_and_replay_are_exclusive(runner, credentials, tmp_path):
+    result = runner.invoke(zot, ['--record', str(tmp_path / "a"), '--replay', str(tmp_path), 'items', 'list'])
+    assert result.exit_code == 2
+    result = runner.invoke(zot, ['--replay', str(tmp_path), '--replay-latency', 'fast', 'items', 'list'])
+    assert result.exit_code == 2
+    assert "Invalid --replay-latency" in result.output
@@ -812,3 +812,60 @@ def test_mock_collection_remove_item(runner, mock_active_profile, mock_zotero_pa
     """Test collections remove-item returns success."""
     result = runner.invoke(zot, ['collections', 'remove-item', 'N7W92H48', 'X42A7DEE'])
     assert result.exit_code == 0
+
+def test_mock_collection_all_with_parent_uses_tree(runner, mock_active_profile, mock_zotero_patched):
+    """Test collections all --parent-collection-id returns the collection and its descendants."""
+    result = runner.invoke(zot, ['collections', 'all', '--parent-collection-id', 'N7W92H48'])
+    assert result.exit_code == 0
+    assert [c['key'] for c in json.loads(result.output)] == ['N7W92H48', 'M7MNCCXU']
+
+def test_mock_collection_subcollections_recursive(runner, mock_active_profile, mock_zotero_patched):
+    """Test subcollections --recursive is served from the local collection tree."""
+    result = runner.invoke(zot, ['collections', 'subcollections', 'QM6T3KHX', '--recursive'])
+    assert result.exit_code == 0
+    assert [c['key'] for c in json.loads(result.output)] == ['TVPC4XK4']
+
+def test_mock_collection_path(runner, mock_active_profile, mock_zotero_patched):
+    """Test collections path prints the ancestry and rejects unknown keys."""
+    result = runner.invoke(zot, ['collections', 'path', 'TVPC4XK4'])
+    assert result.exit_code == 0
+    assert result.output.strip() == "Non-English items / sherlock films"
+
+    result = runner.invoke(zot, ['collections', 'path', 'NOSUCHKEY'])
+    assert result.exit_code != 0
+    assert "Collection not found" in result.output
+
+def test_mock_collection_items_recursive_dedupes(runner, mock_active_profile, mock_zotero_patched):
+    """Test collections items --recursive merges the subtree and lists each item once."""
+    per_collection = {
+        'QM6T3KHX': [{"key": "ITEM0001"}, {"key": "ITEM0002"}],
+        'TVPC4XK4': [{"key": "ITEM0002"}, {"key": "ITEM0003"}],
+    }
+    requested = []
+
+    def collection_items(key, **kwargs):
+        requested.append(key)
+        return per_collection[key]
+
+    mock_zotero_patched.collection_items = collection_items
+    result = runner.invoke(zot, ['collections', 'items', 'QM6T3KHX', '--recursive', '--output', 'keys'])
+    assert result.exit_code == 0
+    assert sorted(result.output.split()) == ["ITEM0001", "ITEM0002", "ITEM0003"]
+    assert sorted(requested) == ['QM6T3KHX', 'TVPC4XK4']
+
+    result = runner.invoke(zot, ['collections', 'items', 'QM6T3KHX', '--recursive', '--limit', '2'])
+    assert result.exit_code == 0
+    assert len(json.loads(result.output)) == 2
+
+def test_mock_collection_items_recursive_reports_failures(runner, mock_active_profile, mock_zotero_patched):
+    """Test a collection that cannot be listed makes --recursive exit 1 after printing the rest."""
+    def collection_items(key, **kwargs):
+        if key == 'TVPC4XK4':
+            raise PyZoteroError("boom")
+        return [{"key": "ITEM0001"}]
+
+    mock_zotero_patched.collection_items = collection_items
+    result = runner.invoke(zot, ['collections', 'items', 'QM6T3KHX', '--recursive', '--workers', '1'])
+    assert result.exit_code == 1
+    assert [i['key'] for i in json.loads(result.stdout)] == ["ITEM0001"]
+    assert "Could not list items of collection 'TVPC4XK4'" in result.stderr
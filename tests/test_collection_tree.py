@@ -0,0 +1,69 @@
+from pyzotero_cli.collection_tree import CollectionTree, load_collection_tree
+from mock_zotero import MockZoteroClient
+
+
+def _coll(key, name, parent=False, version=1):
+    return {"key": key, "version": version, "data": {"key": key, "name": name, "parentCollection": parent}}
+
+
+def _sample_tree():
+    return CollectionTree([
+        _coll("C", "Child", "A"),
+        _coll("A", "Alpha"),
+        _coll("D", "Deep", "C"),
+        _coll("B", "Beta"),
+        _coll("E", "Echo", "A"),
+    ])
+
+
+def test_preorder_and_subtrees():
+    tree = _sample_tree()
+    assert [c["key"] for c in tree.all()] == ["A", "C", "D", "E", "B"]
+    assert tree.subtree_keys("A") == ["A", "C", "D", "E"]
+    assert tree.subtree_keys("A", include_self=False) == ["C", "D", "E"]
+    assert tree.subtree_keys("B", include_self=False) == []
+    assert tree.is_descendant("D", "A")
+    assert not tree.is_descendant("B", "A")
+    assert not tree.is_descendant("A", "A")
+
+
+def test_ancestors_and_orphans():
+    tree = CollectionTree([_coll("A", "Alpha"), _coll("C", "Child", "A"), _coll("X", "Orphan", "GONE")])
+    assert [c["key"] for c in tree.ancestors("C")] == ["A", "C"]
+    assert tree.subtree_keys("X") == ["X"]
+
+
+def test_deep_tree_does_not_recurse():
+    chain = [_coll("K0", "n0")] + [_coll(f"K{i}", f"n{i}", f"K{i - 1}") for i in range(1, 5000)]
+    tree = CollectionTree(chain)
+    assert len(tree.subtree_keys("K0")) == 5000
+    assert len(tree.ancestors("K4999")) == 5000
+
+
+def test_load_is_cached_and_incremental():
+    zot = MockZoteroClient()
+    calls = []
+    versions = {"library": 10}
+    collections = {"A": _coll("A", "Alpha"), "B": _coll("B", "Beta")}
+
+    def list_collections(**kwargs):
+        calls.append(kwargs)
+        keys = kwargs.get("collectionKey")
+        wanted = keys.split(",") if keys else list(collections)
+        return [collections[k] for k in wanted if k in collections]
+
+    zot.last_modified_version = lambda: versions["library"]
+    zot.collections = list_collections
+    zot.collection_versions = lambda since=None: {"C": 11}
+    zot.deleted = lambda since=None: {"collections": ["B"]}
+
+    assert len(load_collection_tree(zot)) == 2
+    assert len(load_collection_tree(zot)) == 2
+    assert len(calls) == 1
+
+    collections["C"] = _coll("C", "Child", "A", version=11)
+    versions["library"] = 11
+    tree = load_collection_tree(zot)
+    assert tree.subtree_keys("A") == ["A", "C"]
+    assert "B" not in tree
+    assert calls[-1]["collectionKey"] == "C"
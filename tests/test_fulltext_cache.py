@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+from pyzotero_cli.fulltext_cache import FullTextCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    with FullTextCache(str(tmp_path / "fulltext")) as c:
+        yield c
+
+
+def test_put_get_roundtrip_is_compressed(cache):
+    data = {"content": "repetitive text " * 1000, "indexedPages": 3, "totalPages": 3}
+    cache.put("user:1", "AAAA1111", 5, data)
+    assert cache.get("user:1", "AAAA1111") == data
+    assert cache.get("user:1", "BBBB2222") is None
+    assert cache.total_size() < len(data["content"]) / 10
+
+
+def test_identical_content_is_stored_once(cache):
+    data = {"content": "same", "indexedChars": 4, "totalChars": 4}
+    cache.put("user:1", "AAAA1111", 1, data)
+    cache.put("user:1", "BBBB2222", 1, data)
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["blobs"] == 1
+
+
+def test_invalidate_only_drops_older_versions(cache):
+    cache.put("user:1", "AAAA1111", 5, {"content": "a"})
+    cache.put("user:1", "BBBB2222", 5, {"content": "b"})
+    assert cache.invalidate("user:1", {"AAAA1111": 5, "BBBB2222": 6}) == 1
+    assert cache.get("user:1", "AAAA1111") == {"content": "a"}
+    assert cache.get("user:1", "BBBB2222") is None
+    assert cache.stats()["blobs"] == 1
+
+
+def test_lru_eviction_respects_size_cap(tmp_path):
+    with FullTextCache(str(tmp_path / "fulltext"), max_bytes=10**9) as cache:
+        for i in range(3):
+            cache.put("user:1", f"KEY{i}", 1, {"content": os.urandom(400).hex()})
+        # Touch KEY0 so KEY1 becomes the least recently used
+        cache.get("user:1", "KEY0")
+        cache.max_bytes = cache.total_size() - 1
+        cache.evict()
+    assert cache_keys(tmp_path) == {"KEY0", "KEY2"}
+
+
+def cache_keys(tmp_path):
+    with FullTextCache(str(tmp_path / "fulltext")) as cache:
+        return {key for key, in cache.conn.execute("SELECT item_key FROM entries")}
+
+
+def test_corrupt_blob_is_treated_as_miss(cache):
+    cache.put("user:1", "AAAA1111", 1, {"content": "x"})
+    digest, suffix = cache.conn.execute("SELECT digest, suffix FROM blobs").fetchone()
+    with open(cache._blob_path(digest, suffix), "wb") as f:
+        f.write(b"garbage")
+    assert cache.get("user:1", "AAAA1111") is None
+    assert cache.stats()["entries"] == 0
@@ -557,3 +557,156 @@ def test_mock_fulltext_set_missing_counts(runner, mock_active_profile, mock_zote
     result = runner.invoke(zot, ['fulltext', 'set', 'SOMEKEY', '--from-json', payload])
     assert result.exit_code != 0
     assert "Error: Incomplete payload format" in result.output
+
+def test_mock_fulltext_dump_ndjson_and_high_water_mark(runner, mock_active_profile, mock_zotero_patched):
+    """Test dump streams NDJSON and only fetches deltas on the next run."""
+    seen_since = []
+
+    def new_fulltext(since=None):
+        seen_since.append(since)
+        return {"AAAA1111": 10, "BBBB2222": 11} if since == 0 else {}
+
+    mock_zotero_patched.new_fulltext = new_fulltext
+    result = runner.invoke(zot, ['fulltext', 'dump', '--workers', '2'])
+    assert result.exit_code == 0
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    assert sorted(r['key'] for r in records) == ["AAAA1111", "BBBB2222"]
+    assert all('content' in r and 'version' in r for r in records)
+
+    result = runner.invoke(zot, ['fulltext', 'dump'])
+    assert result.exit_code == 0
+    assert result.stdout == ""
+    assert seen_since == [0, 12345]
+
+def test_mock_fulltext_dump_output_dir(runner, mock_active_profile, mock_zotero_patched, tmp_path):
+    """Test dump writes one file per key with --output-dir."""
+    mock_zotero_patched.new_fulltext = lambda since=None: {"AAAA1111": 10}
+    out_dir = tmp_path / "dump"
+    result = runner.invoke(zot, ['fulltext', 'dump', '--output-dir', str(out_dir)])
+    assert result.exit_code == 0
+    with open(out_dir / "AAAA1111.json") as f:
+        assert json.load(f)["key"] == "AAAA1111"
+
+def test_mock_fulltext_dump_failure_keeps_high_water_mark(runner, mock_active_profile, mock_zotero_patched):
+    """Test a failed fetch exits 1 and leaves the stored version untouched."""
+    seen_since = []
+
+    def new_fulltext(since=None):
+        seen_since.append(since)
+        return {"NONEXIST1": 10}
+
+    mock_zotero_patched.new_fulltext = new_fulltext
+    result = runner.invoke(zot, ['fulltext', 'dump'])
+    assert result.exit_code == 1
+    assert "Could not fetch full-text for item 'NONEXIST1'" in result.stderr
+    runner.invoke(zot, ['fulltext', 'dump'])
+    assert seen_since == [0, 0]
+
+def test_mock_fulltext_index_and_search(runner, mock_active_profile, mock_zotero_patched):
+    """Test index builds incrementally, drops deleted items, and search ranks matches."""
+    seen_since = []
+
+    def new_fulltext(since=None):
+        seen_since.append(since)
+        return {"AAAA1111": 10, "BBBB2222": 11} if since == 0 else {}
+
+    mock_zotero_patched.new_fulltext = new_fulltext
+    mock_zotero_patched.fulltext_item = lambda key: {
+        "content": f"Notes on photosynthesis for {key}" if key == "AAAA1111" else "Plate tectonics overview",
+        "indexedPages": 1, "totalPages": 1,
+    }
+    result = runner.invoke(zot, ['fulltext', 'index'])
+    assert result.exit_code == 0, result.output
+    assert "Indexed 2 item(s)" in result.output
+
+    result = runner.invoke(zot, ['fulltext', 'search', 'photosynthesis'])
+    assert result.exit_code == 0
+    hits = json.loads(result.output)
+    assert [h['key'] for h in hits] == ["AAAA1111"]
+    assert "[photosynthesis]" in hits[0]['snippet']
+
+    mock_zotero_patched.deleted = lambda **kwargs: {"items": ["AAAA1111"]}
+    result = runner.invoke(zot, ['fulltext', 'index'])
+    assert result.exit_code == 0
+    assert "removed 1" in result.output
+    assert seen_since == [0, 12345]
+
+    result = runner.invoke(zot, ['fulltext', 'search', 'photosynthesis', '--output', 'keys'])
+    assert result.exit_code == 0
+    assert result.output.strip() == ""
+
+def test_mock_fulltext_search_without_index(runner, mock_active_profile, mock_zotero_patched):
+    """Test search on an empty index points the user at 'fulltext index'."""
+    result = runner.invoke(zot, ['fulltext', 'search', 'anything'])
+    assert result.exit_code != 0
+    assert "zot fulltext index" in result.output
+
+def test_mock_fulltext_set_batch_report(runner, mock_active_profile, mock_zotero_patched, tmp_path):
+    """Test set-batch validates each record, uploads the valid ones and reports per key."""
+    uploaded = []
+
+    def set_fulltext(key, payload):
+        if key.startswith("NONEXIST"):
+            raise Exception("Not found")
+        uploaded.append((key, payload))
+        return True
+
+    mock_zotero_patched.set_fulltext = set_fulltext
+    lines = [
+        json.dumps({"key": "AAAA1111", "content": "page text", "indexedPages": 2, "totalPages": 2}),
+        json.dumps({"key": "BBBB2222", "content": "char text", "indexedChars": 9, "totalChars": 9}),
+        json.dumps({"key": "CCCC3333", "content": "no counts"}),
+        "not json",
+        json.dumps({"key": "NONEXIST1", "content": "x", "indexedChars": 1, "totalChars": 1}),
+    ]
+    input_path = tmp_path / "ocr.ndjson"
+    input_path.write_text("\n".join(lines) + "\n")
+    report_path = tmp_path / "report.ndjson"
+
+    result = runner.invoke(zot, ['fulltext', 'set-batch', str(input_path), '--report', str(report_path), '--workers', '2'])
+    assert result.exit_code == 1
+    assert sorted(key for key, _ in uploaded) == ["AAAA1111", "BBBB2222"]
+    assert all('key' not in payload for _, payload in uploaded)
+    assert "Set full-text for 2 item(s); 2 invalid record(s), 1 failed request(s)." in result.stderr
+
+    entries = {e['line']: e for e in map(json.loads, report_path.read_text().splitlines())}
+    assert entries[1]['status'] == "ok"
+    assert entries[3]['status'] == "invalid" and "Incomplete payload format" in entries[3]['message']
+    assert entries[4]['status'] == "invalid" and entries[4]['key'] is None
+    assert entries[5] == {"line": 5, "key": "NONEXIST1", "status": "error", "message": "Not found"}
+
+def test_mock_fulltext_set_batch_stdin(runner, mock_active_profile, mock_zotero_patched):
+    """Test set-batch reads NDJSON from stdin by default."""
+    payload = json.dumps({"key": "AAAA1111", "content": "text", "indexedChars": 4, "totalChars": 4})
+    result = runner.invoke(zot, ['fulltext', 'set-batch', '--rate', '50'], input=payload + "\n")
+    assert result.exit_code == 0
+    assert "Set full-text for 1 item(s)" in result.stderr
+
+def test_mock_fulltext_get_reads_through_cache(runner, mock_active_profile, mock_zotero_patched):
+    """Test get serves repeated reads from the cache and refetches after a full-text change."""
+    fetched = []
+    changes = {}
+    original_fulltext_item = mock_zotero_patched.fulltext_item
+
+    def fulltext_item(key):
+        fetched.append(key)
+        return original_fulltext_item(key)
+
+    mock_zotero_patched.fulltext_item = fulltext_item
+    mock_zotero_patched.new_fulltext = lambda since=None: dict(changes)
+
+    for _ in range(2):
+        result = runner.invoke(zot, ['fulltext', 'get', 'AAAA1111', '--output', 'raw_content'])
+        assert result.exit_code == 0
+        assert "full text content of the mock item" in result.output
+    assert fetched == ["AAAA1111"]
+
+    changes["AAAA1111"] = 12346
+    runner.invoke(zot, ['fulltext', 'get', 'AAAA1111'])
+    runner.invoke(zot, ['fulltext', 'get', 'AAAA1111', '--no-cache'])
+    assert fetched == ["AAAA1111", "AAAA1111", "AAAA1111"]
+
+    result = runner.invoke(zot, ['fulltext', 'cache'])
+    assert json.loads(result.output)["entries"] == 1
+    result = runner.invoke(zot, ['fulltext', 'cache', '--clear'])
+    assert json.loads(result.output)["entries"] == 0
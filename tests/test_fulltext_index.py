@@ -0,0 +1,53 @@
+import pytest
+
+from pyzotero_cli.fulltext_index import FullTextIndex
+
+
+@pytest.fixture
+def index(tmp_path):
+    with FullTextIndex(str(tmp_path / "index.sqlite")) as idx:
+        yield idx
+
+
+def test_upsert_replaces_content(index):
+    index.upsert("user:1", "AAAA1111", 1, "old wording about glaciers")
+    index.upsert("user:1", "AAAA1111", 2, "new wording about volcanoes")
+    index.commit()
+    assert index.count("user:1") == 1
+    assert index.search("user:1", "glaciers") == []
+    hits = index.search("user:1", "volcanoes")
+    assert hits[0]["key"] == "AAAA1111"
+    assert hits[0]["version"] == 2
+
+
+def test_search_is_scoped_to_library(index):
+    index.upsert("user:1", "AAAA1111", 1, "shared term")
+    index.upsert("group:2", "BBBB2222", 1, "shared term")
+    assert [h["key"] for h in index.search("group:2", "shared")] == ["BBBB2222"]
+
+
+def test_search_ranks_by_relevance_and_stems(index):
+    index.upsert("user:1", "LOW00001", 1, "a single mention of running among many other words here")
+    index.upsert("user:1", "HIGH0001", 1, "runs running runner run")
+    index.upsert("user:1", "NONE0001", 1, "unrelated text about walking")
+    index.upsert("user:1", "NONE0002", 1, "more unrelated text")
+    index.upsert("user:1", "NONE0003", 1, "nothing relevant here either")
+    hits = index.search("user:1", "run")
+    assert [h["key"] for h in hits] == ["HIGH0001", "LOW00001"]
+    assert hits[0]["score"] > hits[1]["score"]
+
+
+def test_search_falls_back_for_invalid_syntax(index):
+    index.upsert("user:1", "AAAA1111", 1, "C++ templates (advanced)")
+    assert [h["key"] for h in index.search("user:1", "templates (advanced")] == ["AAAA1111"]
+
+
+def test_remove_and_clear(index):
+    index.upsert("user:1", "AAAA1111", 1, "alpha")
+    index.upsert("user:1", "BBBB2222", 1, "beta")
+    index.set_library_version("user:1", 42)
+    assert index.remove("user:1", ["AAAA1111", "MISSING1"]) == 1
+    assert index.count("user:1") == 1
+    index.clear("user:1")
+    assert index.count("user:1") == 0
+    assert index.library_version("user:1") == 0
@@ -0,0 +1,165 @@
+import importlib
+
+import pytest
+from pyzotero import zotero
+
+from pyzotero_cli.http_transport import (
+    API_BASE_URL_ENV_VAR, TRANSPORT_ENV_VAR, ConditionalCacheTransport, configure_client, http_cache_enabled,
+    install_transport_wrapper, load_transport_factory, resolve_api_base_url, resolve_transport_spec
+)
+from pyzotero_cli.zot_cli import zot
+from mock_zotero import MockZoteroClient
+
+
+def _httpx_module(zot):
+    """The httpx distribution pyzotero was built against (httpx or httpx2)."""
+    return importlib.import_module(type(zot.client).__module__.split('.')[0])
+
+
+@pytest.fixture
+def versioned_server():
+    """A fake Zotero API honouring If-Modified-Since-Version."""
+    state = {"version": 10, "requests": []}
+
+    def handler(request):
+        state["requests"].append(dict(request.headers))
+        since = request.headers.get("if-modified-since-version")
+        headers = {"Last-Modified-Version": str(state["version"]), "Content-Type": "application/json"}
+        if since and int(since) >= state["version"]:
+            return httpx.Response(304, headers=headers)
+        return httpx.Response(200, headers=headers, json=[{"key": "AAAA1111", "version": state["version"]}])
+
+    zot = zotero.Zotero("12345", "user", "fake_api_key")
+    httpx = _httpx_module(zot)
+    zot.client._transport = httpx.MockTransport(handler)
+    state["zot"] = zot
+    return state
+
+
+def test_repeat_reads_are_served_from_304(versioned_server, tmp_path):
+    zot = versioned_server["zot"]
+    install_transport_wrapper(zot, lambda inner: ConditionalCacheTransport(inner, str(tmp_path / "http.sqlite")))
+
+    first = zot.top(limit=5)
+    second = zot.top(limit=5)
+    assert first == second == [{"key": "AAAA1111", "version": 10}]
+    requests = versioned_server["requests"]
+    assert "if-modified-since-version" not in requests[0]
+    assert requests[1]["if-modified-since-version"] == "10"
+    assert zot.client._transport.hits == 1
+
+    versioned_server["version"] = 11
+    assert zot.top(limit=5)[0]["version"] == 11
+    assert zot.client._transport.misses == 2
+
+
+def test_throttling_headers_are_not_replayed_from_the_cache(versioned_server, tmp_path):
+    zot = versioned_server["zot"]
+    httpx = _httpx_module(zot)
+    responses = [
+        httpx.Response(200, headers={"Last-Modified-Version": "10", "Backoff": "5"}, json=[]),
+        httpx.Response(304, headers={"Last-Modified-Version": "10"}),
+        httpx.Response(304, headers={"Last-Modified-Version": "10", "Retry-After": "2"}),
+    ]
+    cache = ConditionalCacheTransport(httpx.MockTransport(lambda request: responses.pop(0)), str(tmp_path / "http.sqlite"))
+    request = lambda: httpx.Request("GET", "https://api.zotero.org/users/1/items/top")
+    assert cache.handle_request(request()).headers["backoff"] == "5"
+    served = cache.handle_request(request())
+    assert served.status_code == 200 and "backoff" not in served.headers
+    assert cache.handle_request(request()).headers["retry-after"] == "2"
+
+
+def test_cache_evicts_the_oldest_responses(versioned_server, tmp_path):
+    httpx = _httpx_module(versioned_server["zot"])
+    inner = httpx.MockTransport(lambda request: httpx.Response(200, headers={"Last-Modified-Version": "1"}, json=[]))
+    cache = ConditionalCacheTransport(inner, str(tmp_path / "http.sqlite"), max_entries=2)
+    for start in range(3):
+        cache.handle_request(httpx.Request("GET", f"https://api.zotero.org/users/1/items?start={start}"))
+    urls = [row[0] for row in cache._conn.execute("SELECT url FROM responses")]
+    assert sorted(urls) == ["https://api.zotero.org/users/1/items?start=1", "https://api.zotero.org/users/1/items?start=2"]
+
+
+def test_cache_key_ignores_param_order_but_not_api_key(versioned_server):
+    httpx = _httpx_module(versioned_server["zot"])
+    a = httpx.Request("GET", "https://api.zotero.org/users/1/items?limit=5&start=0", headers={"Zotero-API-Key": "k1"})
+    b = httpx.Request("GET", "https://api.zotero.org/users/1/items?start=0&limit=5", headers={"Zotero-API-Key": "k1"})
+    c = httpx.Request("GET", "https://api.zotero.org/users/1/items?start=0&limit=5", headers={"Zotero-API-Key": "k2"})
+    assert ConditionalCacheTransport.cache_key(a) == ConditionalCacheTransport.cache_key(b)
+    assert ConditionalCacheTransport.cache_key(a) != ConditionalCacheTransport.cache_key(c)
+
+
+def test_http_cache_setting_precedence(monkeypatch):
+    monkeypatch.delenv("ZOTCLI_HTTP_CACHE", raising=False)
+    assert http_cache_enabled({"PROFILE_CONFIG": {"http_cache": "True"}})
+    monkeypatch.setenv("ZOTCLI_HTTP_CACHE", "0")
+    assert not http_cache_enabled({"PROFILE_CONFIG": {"http_cache": "True"}})
+    assert http_cache_enabled({"HTTP_CACHE": True})
+
+
+def test_configure_client_ignores_clients_without_http_client():
+    mock = MockZoteroClient()
+    assert configure_client(mock, {"HTTP_CACHE": True}) is mock
+
+
+def test_api_base_url_setting_precedence(monkeypatch):
+    monkeypatch.delenv(API_BASE_URL_ENV_VAR, raising=False)
+    assert resolve_api_base_url({}) is None
+    profile = {"PROFILE_CONFIG": {"api_base_url": "http://proxy.internal:8080/"}}
+    assert resolve_api_base_url(profile) == "http://proxy.internal:8080"
+    monkeypatch.setenv(API_BASE_URL_ENV_VAR, "http://127.0.0.1:8085")
+    assert resolve_api_base_url(profile) == "http://127.0.0.1:8085"
+    monkeypatch.setenv(API_BASE_URL_ENV_VAR, "api.zotero.org")
+    with pytest.raises(ValueError):
+        resolve_api_base_url(profile)
+
+
+def test_transport_spec_precedence(monkeypatch):
+    monkeypatch.delenv(TRANSPORT_ENV_VAR, raising=False)
+    assert resolve_transport_spec({"PROFILE_CONFIG": {"transport": "a:b"}}) == "a:b"
+    monkeypatch.setenv(TRANSPORT_ENV_VAR, "c:d")
+    assert resolve_transport_spec({"PROFILE_CONFIG": {"transport": "a:b"}}) == "c:d"
+
+
+def test_load_transport_factory():
+    assert load_transport_factory("pyzotero_cli.http_transport:ConditionalCacheTransport") is ConditionalCacheTransport
+    for spec in ("no_colon", "no_such_module_xyz:factory", "pyzotero_cli.http_transport:missing",
+                 "pyzotero_cli.http_transport:HTTP_CACHE_FILE"):
+        with pytest.raises(ValueError):
+            load_transport_factory(spec)
+
+
+def test_configure_client_applies_base_url_and_transport_hook():
+    zot_client = zotero.Zotero("12345", "user", "fake_api_key")
+    httpx = _httpx_module(zot_client)
+    seen = []
+
+    def factory(inner):
+        def handler(request):
+            seen.append(str(request.url))
+            return httpx.Response(200, headers={"Content-Type": "application/json"}, json=[])
+        return httpx.MockTransport(handler)
+
+    configure_client(zot_client, {"API_BASE_URL": "http://127.0.0.1:8085", "TRANSPORT_FACTORY": factory})
+    assert zot_client.top(limit=1) == []
+    assert seen and seen[0].startswith("http://127.0.0.1:8085/users/12345/items/top")
+
+
+def test_configure_client_keeps_local_endpoint():
+    zot_client = zotero.Zotero("12345", "user", local=True)
+    endpoint = zot_client.endpoint
+    configure_client(zot_client, {"API_BASE_URL": "http://127.0.0.1:8085", "LOCAL": True})
+    assert zot_client.endpoint == endpoint
+
+
+@pytest.mark.parametrize("env_var, value, message", [
+    (API_BASE_URL_ENV_VAR, "not a url", "Invalid API base URL"),
+    (TRANSPORT_ENV_VAR, "no_such_module_xyz:factory", "Invalid transport hook"),
+])
+def test_invalid_endpoint_settings_are_usage_errors(runner, isolated_config, monkeypatch, env_var, value, message):
+    monkeypatch.setenv("ZOTERO_API_KEY", "fake_api_key")
+    monkeypatch.setenv("ZOTERO_LIBRARY_ID", "12345")
+    monkeypatch.setenv("ZOTERO_LIBRARY_TYPE", "user")
+    monkeypatch.setenv(env_var, value)
+    result = runner.invoke(zot, ['--no-interaction', 'items', 'list'])
+    assert result.exit_code == 2
+    assert message in result.output
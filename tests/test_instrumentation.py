@@ -0,0 +1,76 @@
+import importlib
+import json
+
+import pytest
+from pyzotero import zotero
+
+from pyzotero_cli import instrumentation
+from pyzotero_cli.http_transport import install_transport_wrapper
+from pyzotero_cli.zot_cli import zot
+
+
+@pytest.fixture
+def recorder():
+    rec = instrumentation.Recorder()
+    rec.enabled = True
+    return rec
+
+
+def test_timing_transport_records_requests(recorder):
+    client = zotero.Zotero("12345", "user", "fake_api_key")
+    httpx = importlib.import_module(type(client.client).__module__.split('.')[0])
+
+    def handler(request):
+        return httpx.Response(200, headers={"Content-Type": "application/json"}, json=[{"key": "AAAA1111"}])
+
+    client.client._transport = httpx.MockTransport(handler)
+    install_transport_wrapper(client, lambda inner: instrumentation.TimingTransport(inner, recorder))
+    assert client.top(limit=5) == [{"key": "AAAA1111"}]
+
+    [record] = recorder.requests
+    assert record["method"] == "GET"
+    assert record["status"] == 200
+    assert record["path"].startswith("/users/12345/items/top?")
+    assert record["bytes"] == len(json.dumps([{"key": "AAAA1111"}]).replace(" ", ""))
+    assert record["seconds"] >= 0
+
+
+def test_disabled_recorder_ignores_phases():
+    rec = instrumentation.Recorder()
+    with rec.phase("command"):
+        pass
+    assert rec.phases == {}
+
+
+def test_summary_lists_phases_and_slowest_requests(recorder):
+    recorder.add_phase("client", 0.25)
+    for i in range(3):
+        recorder.add_request({"method": "GET", "path": f"/p{i}", "status": 200, "seconds": i / 10, "bytes": 2048})
+    summary = instrumentation.format_summary(recorder.trace(), max_requests=2)
+    assert "client" in summary and "0.250s" in summary
+    assert "HTTP: 3 request(s), 0.300s, 6.0 KB" in summary
+    assert summary.index("/p2") < summary.index("/p1")
+    assert "/p0" not in summary and "1 faster request(s) not shown" in summary
+
+
+def test_mock_timings_flag_and_trace_file(runner, mock_active_profile, mock_zotero_patched, tmp_path, monkeypatch):
+    """Test --timings prints a summary to stderr and ZOTCLI_TRACE_FILE writes the JSON trace."""
+    trace_path = tmp_path / "trace.json"
+    monkeypatch.setenv(instrumentation.TRACE_FILE_ENV_VAR, str(trace_path))
+    result = runner.invoke(zot, ['--timings', 'tags', 'list'])
+    assert result.exit_code == 0, result.output
+    assert "Timings (total" in result.output
+    trace = json.loads(trace_path.read_text())
+    assert {"load_config", "client", "format", "command"} <= set(trace["phases"])
+    assert trace["http"]["count"] == 0
+    assert not instrumentation.recorder.enabled
+
+
+def test_mock_client_phase_is_recorded_once(runner, mock_active_profile, mock_zotero_patched, monkeypatch):
+    """Test the 'client' phase is not counted again when a command group builds its own client."""
+    phases = []
+    add_phase = instrumentation.recorder.add_phase
+    monkeypatch.setattr(instrumentation.recorder, "add_phase", lambda name, seconds: phases.append(name) or add_phase(name, seconds))
+    result = runner.invoke(zot, ['--timings', 'items', 'list', '--limit', '1'])
+    assert result.exit_code == 0, result.output
+    assert phases.count("client") == 1
@@ -789,3 +789,178 @@ def test_mock_item_add_tags(runner, mock_active_profile, mock_zotero_patched):
     data = json.loads(result.output)
     assert data.get('status') == 'success'
     assert sorted(data.get('tags_added', [])) == ['tag1', 'tag2']
+
+def test_mock_item_create_validation_blocks_send(runner, mock_active_profile, mock_zotero_patched):
+    """Test items create reports per-record errors and sends nothing if any record is invalid."""
+    sent = []
+    mock_zotero_patched.create_items = lambda payloads: sent.append(payloads) or {"success": {}}
+    payload = json.dumps([
+        {"itemType": "book", "title": "Good"},
+        {"itemType": "book", "title": "Bad", "notAField": "x"},
+    ])
+    result = runner.invoke(zot, ['items', 'create', '--from-json', payload])
+    assert result.exit_code == 1
+    assert sent == []
+    data = json.loads(result.stdout)
+    assert data == [{"1": "Error: Field 'notAField' is not valid for item type 'book'"}]
+    assert "1 of 2 item(s) failed validation" in result.stderr
+
+def test_mock_item_create_validate_only(runner, mock_active_profile, mock_zotero_patched):
+    """Test items create --validate-only reports every record without creating anything."""
+    mock_zotero_patched.create_items = lambda payloads: pytest.fail("create_items must not be called")
+    result = runner.invoke(zot, ['items', 'create', '--template', 'book', '--field', 'title', 'T', '--validate-only'])
+    assert result.exit_code == 0
+    assert json.loads(result.output) == [{"0": "Valid"}]
+
+def test_mock_item_update_validation(runner, mock_active_profile, mock_zotero_patched):
+    """Test items update validates only the changed fields."""
+    result = runner.invoke(zot, ['items', 'update', 'X42A7DEE', '--field', 'publicationTitle', 'J', '--validate-only'])
+    assert result.exit_code == 1
+    data = json.loads(result.stdout)
+    assert data["status"] == "invalid"
+    assert data["errors"] == ["Field 'publicationTitle' is not valid for item type 'book'"]
+
+    result = runner.invoke(zot, ['items', 'update', 'X42A7DEE', '--field', 'title', 'T', '--validate-only'])
+    assert result.exit_code == 0
+    assert json.loads(result.output)["status"] == "valid"
+
+
+def test_mock_item_create_attachment_and_note(runner, mock_active_profile, mock_zotero_patched):
+    """Test items create validates attachments against the template for their link mode, and notes."""
+    payload = json.dumps([
+        {"itemType": "attachment", "linkMode": "linked_url", "title": "Site", "url": "https://example.org",
+         "parentItem": "X42A7DEE", "contentType": "text/html"},
+        {"itemType": "note", "note": "<p>Hi</p>", "parentItem": "X42A7DEE"},
+    ])
+    result = runner.invoke(zot, ['items', 'create', '--from-json', payload, '--validate-only'])
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.stdout) == [{"0": "Valid"}, {"1": "Valid"}]
+
+    result = runner.invoke(zot, ['items', 'create', '--from-json', json.dumps([{"itemType": "note", "notAField": "x"}])])
+    assert result.exit_code == 1
+    assert json.loads(result.stdout) == [{"0": "Error: Field 'notAField' is not valid for item type 'note'"}]
+
+def test_mock_item_create_skips_field_check_when_template_lookup_fails(runner, mock_active_profile, mock_zotero_patched):
+    """Test items create warns instead of rejecting when the template cannot be fetched."""
+    sent = []
+    mock_zotero_patched.create_items = lambda payloads: sent.append(payloads) or {"success": {"0": "NEW00001"}}
+    result = runner.invoke(zot, ['items', 'create', '--from-json', json.dumps([{"itemType": "attachment", "title": "T"}])])
+    assert result.exit_code == 0, result.output
+    assert len(sent) == 1
+    assert "skipping the field check" in result.stderr
+
+def test_mock_item_update_attachment_and_note(runner, mock_active_profile, mock_zotero_patched):
+    """Test items update validates attachment and note changes using the stored item's type and link mode."""
+    stored = {
+        "ATTACH01": {"itemType": "attachment", "linkMode": "imported_file", "title": "paper.pdf",
+                     "filename": "paper.pdf", "parentItem": "X42A7DEE"},
+        "NOTE0001": {"itemType": "note", "note": "<p>Old</p>", "parentItem": "X42A7DEE"},
+    }
+    mock_zotero_patched.item = lambda key, **kwargs: {"key": key, "version": 5, "data": {"key": key, **stored[key]}}
+    result = runner.invoke(zot, ['items', 'update', 'ATTACH01', '--field', 'filename', 'renamed.pdf'])
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.stdout)["status"] == "success"
+    result = runner.invoke(zot, ['items', 'update', 'NOTE0001', '--field', 'note', '<p>New</p>'])
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.stdout)["status"] == "success"
+    result = runner.invoke(zot, ['items', 'update', 'NOTE0001', '--field', 'title', 'T', '--validate-only'])
+    assert result.exit_code == 1
+    assert json.loads(result.stdout)["errors"] == ["Field 'title' is not valid for item type 'note'"]
+
+def test_mock_item_update_batch_ndjson(runner, mock_active_profile, mock_zotero_patched):
+    """Test items update-batch streams one result per key and only writes real changes."""
+    records = [
+        {"key": "X42A7DEE", "patch": {"title": "Electron Microscopy"}},
+        {"key": "AGTZDBRQ", "patch": {"title": "Cell Activation and Apoptosis in HIV Infection: Implications for Pathogenesis and Therapy"}},
+        {"key": "9AIAUW49", "patch": {"publicationTitle": "J"}},
+        {"key": "MISSING1", "patch": {"title": "T"}},
+        {"key": "33TK9NH9", "patch": {"version": 3}},
+    ]
+    stdin = "\n".join(json.dumps(r) for r in records) + "\nnot json\n"
+    result = runner.invoke(zot, ['items', 'update-batch'], input=stdin)
+    assert result.exit_code == 1
+    results = {r["key"]: r for r in map(json.loads, result.stdout.splitlines())}
+    assert results["X42A7DEE"]["status"] == "updated"
+    assert results["AGTZDBRQ"]["status"] == "unchanged"
+    assert results["9AIAUW49"]["message"] == "Field 'publicationTitle' is not valid for item type 'book'"
+    assert results["MISSING1"] == {"key": "MISSING1", "status": "error", "line": 4, "message": "Item not found"}
+    assert results["33TK9NH9"]["status"] == "invalid"
+    assert results[None]["line"] == 6
+    assert mock_zotero_patched.updated_batches == [[{"key": "X42A7DEE", "version": 1, "title": "Electron Microscopy"}]]
+    assert "Updated 1 item(s); 1 unchanged, 3 invalid record(s), 1 failed." in result.stderr
+
+
+def test_mock_item_update_batch_csv_retries_conflicts(runner, mock_active_profile, mock_zotero_patched, tmp_path):
+    """Test only the keys rejected with 412 are written again."""
+    class Response:
+        def __init__(self, body):
+            self.body = body
+        def json(self):
+            return self.body
+
+    responses = iter([
+        Response({'successful': {'0': {}}, 'failed': {'1': {'key': 'AGTZDBRQ', 'code': 412, 'message': 'Item has been modified'}}}),
+        Response({'successful': {'0': {}}, 'failed': {}}),
+    ])
+    original_update = mock_zotero_patched.update_items
+
+    def update_items(payloads):
+        original_update(payloads)
+        mock_zotero_patched.request = next(responses)
+        return True
+
+    mock_zotero_patched.update_items = update_items
+    path = tmp_path / "patches.csv"
+    path.write_text("key,extra,title\n2SS8NXZI,Reviewed,\nAGTZDBRQ,Reviewed,Apoptosis\n")
+    result = runner.invoke(zot, ['items', 'update-batch', str(path)])
+    assert result.exit_code == 0, result.output
+    assert [json.loads(line) for line in result.stdout.splitlines()] == [
+        {"key": "2SS8NXZI", "status": "updated", "line": 2},
+        {"key": "AGTZDBRQ", "status": "updated", "line": 3},
+    ]
+    assert mock_zotero_patched.updated_batches == [
+        [{"key": "2SS8NXZI", "version": 1, "extra": "Reviewed"},
+         {"key": "AGTZDBRQ", "version": 1, "extra": "Reviewed", "title": "Apoptosis"}],
+        [{"key": "AGTZDBRQ", "version": 1, "extra": "Reviewed", "title": "Apoptosis"}],
+    ]
+
+
+def test_mock_items_list_libraries_fanout(runner, mock_active_profile, mock_zotero_patched):
+    """Test items list --libraries queries every library and tags records with their library."""
+    result = runner.invoke(zot, ['items', 'list', '--limit', '2', '--libraries', '111,user:222'])
+    assert result.exit_code == 0, result.output
+    records = json.loads(result.output)
+    assert [(r['library']['type'], r['library']['id']) for r in records] == [
+        ('group', 111), ('group', 111), ('user', 222), ('user', 222)
+    ]
+
+
+def test_mock_items_list_all_groups_table(runner, mock_active_profile, mock_zotero_patched):
+    """Test items list --all-groups discovers groups and adds a Library column to tables."""
+    result = runner.invoke(zot, ['items', 'list', '--limit', '1', '--all-groups', '--output', 'table'])
+    assert result.exit_code == 0, result.output
+    assert 'Library' in result.output
+
+
+def test_mock_items_list_fanout_partial_failure(runner, mock_active_profile, mock_zotero_patched):
+    """Test a failing library is reported while the others are still printed."""
+    original_items = mock_zotero_patched.items
+    calls = []
+
+    def items(**kwargs):
+        calls.append(kwargs)
+        if len(calls) == 2:
+            raise RuntimeError("boom")
+        return original_items(**kwargs)
+
+    mock_zotero_patched.items = items
+    result = runner.invoke(zot, ['items', 'list', '--limit', '1', '--libraries', '1,2', '--library-workers', '1'])
+    assert result.exit_code == 1
+    assert 'library group:2 failed: boom' in result.output
+
+
+def test_mock_items_list_invalid_libraries(runner, mock_active_profile, mock_zotero_patched):
+    """Test malformed --libraries values are usage errors."""
+    result = runner.invoke(zot, ['items', 'list', '--libraries', 'team:abc'])
+    assert result.exit_code == 2
+    assert "Invalid library 'team:abc'" in result.output
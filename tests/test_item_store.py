@@ -0,0 +1,97 @@
+import pytest
+
+from pyzotero_cli.item_store import Clause, ItemStore, parse_year
+from tests.mock_zotero import MockZoteroClient
+
+
+@pytest.fixture
+def store(tmp_path):
+    with ItemStore(str(tmp_path / "items.sqlite")) as item_store:
+        yield item_store
+
+
+class VersionedClient(MockZoteroClient):
+    """Mock client whose library version and change feeds can be set per test."""
+
+    def __init__(self):
+        super().__init__()
+        self.version = 10
+        self.changed = {}
+        self.removed = []
+        self.requests = []
+
+    def last_modified_version(self):
+        return self.version
+
+    def item_versions(self, **kwargs):
+        self.requests.append(("item_versions", kwargs))
+        return self.changed
+
+    def deleted(self, **kwargs):
+        return {"items": self.removed, "collections": [], "searches": [], "tags": []}
+
+    def items(self, **kwargs):
+        self.requests.append(("items", kwargs))
+        return super().items(**kwargs)
+
+
+@pytest.mark.parametrize("date, year", [
+    ("May 01, 1980", 1980), ("08/1993", 1993), ("2008-12-14", 2008), ("", None), (None, None),
+])
+def test_parse_year(date, year):
+    assert parse_year(date) == year
+
+
+def test_full_sync_indexes_items(store):
+    zot = VersionedClient()
+    stats = store.sync(zot)
+    assert stats["full"] and stats["fetched"] == 20
+    library = "user:12345"
+    assert store.count(library) == 20
+    index = store.tag_index(library)
+    assert index["T-Lymphocytes"] == {"2SS8NXZI", "AGTZDBRQ"}
+    assert store.collection_members(library, ["QM6T3KHX"]) == {"6MCAN2NC"}
+
+
+def test_sync_is_a_single_request_when_current(store):
+    zot = VersionedClient()
+    store.sync(zot)
+    zot.requests.clear()
+    stats = store.sync(zot)
+    assert stats["fetched"] == 0
+    assert zot.requests == []
+
+
+def test_incremental_sync_fetches_changes_and_drops_deleted(store):
+    zot = VersionedClient()
+    store.sync(zot)
+    zot.version = 11
+    zot.changed = {"Z8N84QAJ": 11}
+    zot.removed = ["PQKBRC33"]
+    zot.requests.clear()
+    stats = store.sync(zot)
+    assert stats == {"library": "user:12345", "version": 11, "fetched": 1, "removed": 1, "full": False}
+    assert zot.requests[0] == ("item_versions", {"since": 10, "includeTrashed": 1})
+    assert zot.requests[1][1]["itemKey"] == "Z8N84QAJ"
+    assert store.count("user:12345") == 19
+    assert store.library_version("user:12345") == 11
+
+
+def test_trashed_items_are_excluded_by_default(store):
+    item = {"key": "TRASHED1", "version": 3, "data": {"itemType": "book", "deleted": 1, "tags": [{"tag": "gone"}]}}
+    store.upsert("user:1", [item])
+    assert store.count("user:1") == 0
+    assert store.count("user:1", include_trashed=True) == 1
+    assert "gone" not in store.tag_index("user:1")
+
+
+def test_keyed_lookups_are_ordered_across_chunks(store):
+    # Newer items have later keys, so the newest ones are in the last 500-key chunk
+    items = [{"key": f"K{index:05d}", "version": 1,
+              "data": {"itemType": "book", "dateAdded": f"2020-01-01T00:{index // 60:02d}:{index % 60:02d}Z"}}
+             for index in range(1200)]
+    store.upsert("user:1", items)
+    keys = [item["key"] for item in items]
+    assert [item["key"] for item in store.items("user:1", keys)] == keys[::-1]
+    clause = Clause(index=lambda: set(keys[::2]))
+    assert [item["key"] for item in store.select("user:1", [clause])][:3] == ["K01198", "K01196", "K01194"]
@@ -0,0 +1,33 @@
+import pstats
+import tracemalloc
+
+from pyzotero_cli.zot_cli import zot
+
+
+def test_mock_profile_run_cpu_prints_top_functions(runner, mock_active_profile, mock_zotero_patched):
+    """Test --profile-run cpu prints the top functions by cumulative time."""
+    result = runner.invoke(zot, ['--profile-run', 'cpu', '--profile-top', '5', 'tags', 'list'])
+    assert result.exit_code == 0, result.output
+    assert "Community / Economic Development" in result.output
+    assert "cumulative" in result.output
+    assert "due to restriction <5>" in result.output
+
+
+def test_mock_profile_run_cpu_writes_pstats(runner, mock_active_profile, mock_zotero_patched, tmp_path):
+    """Test --profile-file receives stats loadable by pstats."""
+    path = tmp_path / "run.pstats"
+    result = runner.invoke(zot, ['--profile-run', 'cpu', '--profile-file', str(path), 'tags', 'list'])
+    assert result.exit_code == 0, result.output
+    assert f"Profile written to {path}" in result.output
+    stats = pstats.Stats(str(path))
+    assert any(func[2] == "format_data_for_output" for func in stats.stats)
+
+
+def test_mock_profile_run_memory(runner, mock_active_profile, mock_zotero_patched, tmp_path):
+    """Test --profile-run memory reports peak allocations and writes a snapshot."""
+    path = tmp_path / "run.snapshot"
+    result = runner.invoke(zot, ['--profile-run', 'memory', '--profile-file', str(path), 'items', 'list'])
+    assert result.exit_code == 0, result.output
+    assert "Memory: peak" in result.output
+    assert tracemalloc.Snapshot.load(str(path)).traces
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,76 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from pyzotero_cli.item_store import ItemStore
+from pyzotero_cli.query import BoolOp, Not, QueryError, Term, compile_query, parse_query, run_query
+from pyzotero_cli.zot_cli import zot
+
+LIBRARY = "user:12345"
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory):
+    items = json.loads((Path(__file__).parent / "api_responses" / "items_doc.json").read_text())
+    with ItemStore(str(tmp_path_factory.mktemp("store") / "items.sqlite")) as item_store:
+        item_store.upsert(LIBRARY, items)
+        yield item_store
+
+
+def keys(store, text):
+    return sorted(item["key"] for item in run_query(text, store, LIBRARY))
+
+
+def test_parse_precedence_and_aliases():
+    assert parse_query('year>=2020 and author:Smith or not tag:"to read"') == BoolOp("or", [
+        BoolOp("and", [Term("year", ">=", "2020"), Term("creator", ":", "Smith")]),
+        Not(Term("tag", ":", "to read")),
+    ])
+    assert parse_query("(type:book OR type:film) AND has:doi") == BoolOp("and", [
+        BoolOp("or", [Term("itemType", ":", "book"), Term("itemType", ":", "film")]),
+        Term("DOI", "has", ""),
+    ])
+
+
+@pytest.mark.parametrize("text", ["", "year>=", "Smith", "(tag:a", "tag:a and", "tag:a )", "year>=soon"])
+def test_invalid_queries(store, text):
+    with pytest.raises(QueryError):
+        compile_query(parse_query(text), store, LIBRARY)
+
+
+def test_index_backed_terms_use_no_predicate(store):
+    clause = compile_query(parse_query("year>=2005 and tag:Congresses"), store, LIBRARY)
+    assert clause.predicate is None
+    assert clause.keys() == set()
+    clause = compile_query(parse_query("type:book and title:sherlock"), store, LIBRARY)
+    assert clause.index is not None and clause.predicate is not None
+
+
+def test_query_results(store):
+    assert keys(store, "year>=2005") == ["2SS8NXZI", "33TK9NH9", "3EWF3P9V", "6MCAN2NC", "85MTWF4F"]
+    assert keys(store, "creator:Doyle and not tag:Fiction") == ["PG5ZCTJT"]
+    assert keys(store, "(type:film or type:artwork) and year>2004") == ["6MCAN2NC"]
+    assert keys(store, "doi:10.1109/*") == ["85MTWF4F", "R39UWNFK"]
+    assert keys(store, "has:doi and year<2005") == ["PQKBRC33"]
+    assert keys(store, 'creator:"Arthur Conan Doyle" and type:book') == ["Z8N84QAJ"]
+    assert keys(store, "added<=2011-01-13") == ["33TK9NH9", "9AIAUW49", "U52JBZ4X", "X42A7DEE"]
+    assert keys(store, "tag:congresses or tag:fiction") == ["AGTZDBRQ", "X42A7DEE", "Z8N84QAJ"]
+    assert "PQKBRC33" not in keys(store, 'doi=""')
+
+
+def test_mock_query_command(runner, mock_active_profile, mock_zotero_patched):
+    """Test zot query syncs the store and streams matching keys."""
+    result = runner.invoke(zot, ["query", "type:conferencePaper and doi:10.1109/*", "--output", "keys"])
+    assert result.exit_code == 0, result.output
+    assert sorted(result.output.split()) == ["85MTWF4F", "R39UWNFK"]
+    result = runner.invoke(zot, ["query", "year>=2008", "--limit", "2"])
+    assert result.exit_code == 0, result.output
+    assert len(json.loads(result.output)) == 2
+
+
+def test_mock_query_command_invalid(runner, mock_active_profile, mock_zotero_patched):
+    """Test a malformed query is a usage error."""
+    result = runner.invoke(zot, ["query", "year>= and"])
+    assert result.exit_code == 2
+    assert "Invalid query" in result.output
@@ -0,0 +1,33 @@
+import json
+import sys
+from pathlib import Path
+
+from pyzotero_cli.records import ItemRecord, compact, dumps
+from pyzotero_cli.utils import format_data_for_output
+
+ITEMS = json.loads((Path(__file__).parent / "api_responses" / "items_doc.json").read_text())
+
+
+def test_records_round_trip_and_share_repeated_strings():
+    records = compact(json.loads(json.dumps(ITEMS)))
+    assert [record.to_item() for record in records] == ITEMS
+    first, second = compact([ITEMS[0], json.loads(json.dumps(ITEMS[0]))])
+    assert first.item_type is second.item_type
+    assert not hasattr(first, "__dict__")
+    assert sys.getsizeof(first) < sys.getsizeof(ITEMS[0])
+
+
+def test_output_from_records_matches_output_from_items():
+    records = compact(ITEMS)
+    for output in ('json', 'yaml', 'table', 'keys'):
+        assert format_data_for_output(records, output, preset_key='item') == \
+            format_data_for_output(ITEMS, output, preset_key='item')
+    assert dumps([]) == json.dumps([], indent=2)
+    assert ItemRecord.from_item(ITEMS[0]).summary()["data"]["title"] == ITEMS[0]["data"]["title"]
+
+
+def test_records_keep_a_shared_library_summary():
+    tagged = [{**item, "library": {**item["library"], "type": "group", "id": 111}} for item in ITEMS[:3]]
+    records = compact(json.loads(json.dumps(tagged)))
+    assert records[0].library is records[2].library
+    assert records[0].summary()["library"]["id"] == 111
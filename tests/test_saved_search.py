@@ -0,0 +1,89 @@
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from pyzotero_cli.item_store import ItemStore
+from pyzotero_cli.saved_search import SavedSearchError, compile_conditions, run_saved_search
+
+LIBRARY = "user:12345"
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory):
+    items = json.loads((Path(__file__).parent / "api_responses" / "items_doc.json").read_text())
+    with ItemStore(str(tmp_path_factory.mktemp("store") / "items.sqlite")) as item_store:
+        item_store.upsert(LIBRARY, items)
+        yield item_store
+
+
+def keys(store, conditions, **kwargs):
+    return {item["key"] for item in run_saved_search(conditions, store, LIBRARY, **kwargs)}
+
+
+def cond(condition, operator, value):
+    return {"condition": condition, "operator": operator, "value": value}
+
+
+def mode(condition, setting):
+    """A mode condition as Zotero stores it: the setting in 'operator', an empty 'value'."""
+    return {"condition": condition, "operator": setting, "value": ""}
+
+
+def test_all_conditions_must_match(store):
+    conditions = [cond("itemType", "is", "book"), cond("tag", "is", "T-Lymphocytes")]
+    assert keys(store, conditions) == {"AGTZDBRQ"}
+
+
+def test_join_mode_any(store):
+    conditions = [mode("joinMode", "any"), cond("tag", "is", "Fiction"), cond("itemType", "is", "film")]
+    assert keys(store, conditions) == {"Z8N84QAJ", "PG5ZCTJT"}
+
+
+def test_any_with_predicate_scans(store):
+    conditions = [mode("joinMode", "any"), cond("tag", "is", "Fiction"), cond("DOI", "beginsWith", "10.1109/")]
+    assert keys(store, conditions) == {"Z8N84QAJ", "R39UWNFK", "85MTWF4F"}
+
+
+def test_field_and_creator_conditions(store):
+    assert keys(store, [cond("title", "contains", "SHERLOCK"), cond("creator", "contains", "doyle")]) >= {"Z8N84QAJ"}
+    assert keys(store, [cond("lastName", "is", "Zolman")]) == {"9AIAUW49"}
+    assert "Z8N84QAJ" not in keys(store, [cond("tag", "isNot", "Fiction"), cond("itemType", "is", "book")])
+
+
+def test_collection_condition_recursive(store):
+    subtree = {"QM6T3KHX": ["QM6T3KHX", "TVPC4XK4"]}
+    conditions = [cond("collection", "is", "QM6T3KHX"), mode("recursive", "true")]
+    assert keys(store, conditions, collection_subtree=lambda k: subtree.get(k, [k])) == {"6MCAN2NC"}
+    assert keys(store, [cond("collection", "is", "BX9965IJ"), cond("itemType", "is", "webpage")]) == {"Z6TE2UMT"}
+
+
+def test_mode_flags_are_read_from_the_operator(store):
+    plan = compile_conditions([mode("joinMode", "any"), mode("noChildren", "true"), mode("deleted", "true"),
+                               cond("tag", "is", "Fiction")], store, LIBRARY)
+    assert (plan["join_mode"], plan["no_children"], plan["include_trashed"]) == ("any", True, True)
+    plan = compile_conditions([mode("joinMode", "all"), mode("noChildren", "false")], store, LIBRARY)
+    assert (plan["join_mode"], plan["no_children"], plan["include_trashed"]) == ("all", False, False)
+
+
+def test_year_conditions(store):
+    assert keys(store, [cond("year", "is", "1993")]) == {"GIFZST3I", "9AIAUW49", "X42A7DEE"}
+    assert keys(store, [cond("year", "isBefore", "1980")]) == {"B2VNV5Q7"}
+    assert keys(store, [cond("year", "isAfter", "2010")]) == {"3EWF3P9V", "33TK9NH9"}
+    assert "GIFZST3I" not in keys(store, [cond("year", "isNot", "1993")])
+
+
+def test_date_added_conditions(store):
+    assert keys(store, [cond("dateAdded", "isBefore", "2011-01-14")]) == {"9AIAUW49", "X42A7DEE", "33TK9NH9", "U52JBZ4X"}
+    assert keys(store, [cond("dateAdded", "is", "2011-01-18")]) == {"R39UWNFK", "85MTWF4F", "3EWF3P9V"}
+    plan = compile_conditions([cond("dateAdded", "isInTheLast", "10 days")], store, LIBRARY,
+                              now=datetime(2011, 2, 3, tzinfo=timezone.utc))
+    assert len(list(store.select(LIBRARY, plan["clauses"]))) == 11
+
+
+def test_unsupported_condition(store):
+    with pytest.raises(SavedSearchError):
+        list(run_saved_search([cond("fulltextContent", "contains", "x")], store, LIBRARY))
+    with pytest.raises(SavedSearchError):
+        list(run_saved_search([cond("tag", "isGreaterThan", "x")], store, LIBRARY))
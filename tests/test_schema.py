@@ -0,0 +1,124 @@
+import importlib
+import json
+import os
+
+import pytest
+from pyzotero import zotero
+
+from pyzotero_cli import schema
+from mock_zotero import MockZoteroClient
+
+SCHEMA_DOC = os.path.join(os.path.dirname(__file__), "api_responses", "schema_doc.json")
+
+
+@pytest.fixture(autouse=True)
+def fresh_memo():
+    schema.clear_memo()
+    yield
+    schema.clear_memo()
+
+
+@pytest.fixture
+def schema_server():
+    """A real pyzotero client whose HTTP transport serves /schema with an ETag."""
+    with open(SCHEMA_DOC) as f:
+        document = json.load(f)
+    state = {"requests": []}
+
+    def handler(request):
+        state["requests"].append(request)
+        assert request.url.path == "/schema"
+        if request.headers.get("if-none-match") == '"v29"':
+            return httpx.Response(304)
+        return httpx.Response(200, headers={"ETag": '"v29"'}, json=document)
+
+    zot = zotero.Zotero("12345", "user", "fake_api_key")
+    httpx = importlib.import_module(type(zot.client).__module__.split('.')[0])
+    zot.client._transport = httpx.MockTransport(handler)
+    state["zot"] = zot
+    return state
+
+
+def test_template_and_creator_types_come_from_one_schema_request(schema_server):
+    zot = schema_server["zot"]
+    for _ in range(3):
+        template = schema.item_template(zot, "book")
+        creator_types = schema.item_creator_types(zot, "book")
+    assert list(template) == ["itemType", "title", "creators", "abstractNote", "publisher", "date",
+                              "tags", "collections", "relations"]
+    assert template["creators"] == [{"creatorType": "author", "firstName": "", "lastName": ""}]
+    assert [c["creatorType"] for c in creator_types] == ["author", "editor"]
+    assert len(schema_server["requests"]) == 1
+
+
+def test_creators_follow_title_alias(schema_server):
+    template = schema.item_template(schema_server["zot"], "case")
+    assert list(template)[:3] == ["itemType", "caseName", "creators"]
+
+
+def test_localized_lists(schema_server):
+    zot = schema_server["zot"]
+    assert {"itemType": "book", "localized": "Book"} in schema.item_types(zot)
+    assert schema.item_type_fields(zot, "case")[0] == {"field": "caseName", "localized": "Case Name"}
+    fields = [f["field"] for f in schema.item_fields(zot)]
+    assert fields.count("title") == 1 and "court" in fields
+
+
+def test_disk_cache_is_reused_then_revalidated_with_etag(schema_server, monkeypatch):
+    zot = schema_server["zot"]
+    schema.get_schema(zot)
+    schema.clear_memo()
+    schema.get_schema(zot)
+    assert len(schema_server["requests"]) == 1
+
+    # Once the cached copy is stale it is revalidated, and a 304 keeps it
+    monkeypatch.setattr(schema, "SCHEMA_MAX_AGE", -1)
+    schema.clear_memo()
+    assert schema.get_schema(zot).has_type("book")
+    assert schema_server["requests"][-1].headers["if-none-match"] == '"v29"'
+
+
+def test_unknown_and_api_only_types_fall_back_to_client(schema_server, monkeypatch):
+    zot = schema_server["zot"]
+    calls = []
+    monkeypatch.setattr(zot, "item_template", lambda item_type, **kwargs: calls.append(item_type) or {"itemType": item_type})
+    schema.item_template(zot, "note")
+    schema.item_template(zot, "notAType")
+    assert calls == ["note", "notAType"]
+
+
+def test_clients_without_http_client_use_pyzotero_methods():
+    mock = MockZoteroClient()
+    assert schema.get_schema(mock) is None
+    assert schema.item_template(mock, "book") == mock.item_template("book")
+
+
+def test_validator_reports_per_field_problems(schema_server):
+    validator = schema.ItemValidator(schema_server["zot"])
+    assert validator.errors({"itemType": "book", "title": "T", "creators": [{"creatorType": "author", "name": "A"}]}) == []
+    problems = validator.errors({
+        "itemType": "book",
+        "court": "Supreme",
+        "creators": [{"creatorType": "counsel", "lastName": "X"}, {"creatorType": "author"}],
+        "tags": ["not-an-object"],
+    })
+    assert "Field 'court' is not valid for item type 'book'" in problems
+    assert any("creator type 'counsel'" in p for p in problems)
+    assert any("Creator 1 needs" in p for p in problems)
+    assert any("'tags' must be" in p for p in problems)
+    assert validator.errors({"itemType": "spaceship"}) == ["Unknown item type 'spaceship'"]
+    assert len(schema_server["requests"]) == 1
+
+
+def test_validator_checks_partial_payloads_against_given_type(schema_server):
+    validator = schema.ItemValidator(schema_server["zot"])
+    assert validator.errors({"court": "High"}, item_type="case") == []
+    assert validator.errors({"publisher": "X"}, item_type="case") == ["Field 'publisher' is not valid for item type 'case'"]
+
+
+def test_validator_falls_back_to_template_keys():
+    validator = schema.ItemValidator(MockZoteroClient())
+    assert validator.errors({"itemType": "book", "title": "T", "ISBN": "1"}) == []
+    assert validator.errors({"itemType": "book", "publicationTitle": "J"}) == [
+        "Field 'publicationTitle' is not valid for item type 'book'"
+    ]
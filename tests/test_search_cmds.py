@@ -437,3 +437,30 @@ def test_mock_delete_search_confirm_no(runner, mock_active_profile, mock_zotero_
     result = runner.invoke(cli_entry_point, ['search', 'delete', 'SRCH0001'], input='n')
     assert result.exit_code == 1
     assert "Aborted!" in result.output
+
+def test_mock_run_search(runner, mock_active_profile, mock_zotero_patched):
+    """Test search run evaluates the saved conditions over the local item store."""
+    mock_zotero_patched.searches = lambda: [{
+        "key": "SRCH0002", "version": 1,
+        "data": {"key": "SRCH0002", "name": "Holmes books", "conditions": [
+            {"condition": "itemType", "operator": "is", "value": "book"},
+            {"condition": "tag", "operator": "is", "value": "Holmes, Sherlock (Fictitious character)"},
+        ]},
+    }]
+    result = runner.invoke(cli_entry_point, ['search', 'run', 'SRCH0002', '--output', 'keys'])
+    assert result.exit_code == 0, result.output
+    assert result.output.split() == ['Z8N84QAJ']
+
+def test_mock_run_search_not_found(runner, mock_active_profile, mock_zotero_patched):
+    """Test search run with an unknown key exits with an error."""
+    result = runner.invoke(cli_entry_point, ['search', 'run', 'NOPE0000'])
+    assert result.exit_code == 1
+    assert "not found" in result.output
+
+def test_mock_run_search_unsupported_condition(runner, mock_active_profile, mock_zotero_patched):
+    """Test search run reports conditions that cannot be evaluated locally."""
+    mock_zotero_patched.searches = lambda: [{"key": "SRCH0003", "data": {"key": "SRCH0003", "conditions": [
+        {"condition": "fulltextContent", "operator": "contains", "value": "x"}]}}]
+    result = runner.invoke(cli_entry_point, ['search', 'run', 'SRCH0003'])
+    assert result.exit_code == 1
+    assert "fulltextContent" in result.output
@@ -288,3 +288,156 @@ def test_mock_delete_tag_force(runner, mock_active_profile, mock_zotero_patched)
     result = runner.invoke(zot, ['tags', 'delete', 'some-tag', '--force'])
     assert result.exit_code == 0
     assert "Successfully deleted tags: some-tag" in result.output
+
+def test_mock_rename_tag_rewrites_tagged_items(runner, mock_active_profile, mock_zotero_patched):
+    """Test tags rename rewrites only items carrying the tag, keeping their other tags."""
+    result = runner.invoke(zot, ['tags', 'rename', 'T-Lymphocytes', 'T cells', '--force'])
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output) == [{'2SS8NXZI': 'Updated'}, {'AGTZDBRQ': 'Updated'}]
+    [batch] = mock_zotero_patched.updated_batches
+    by_key = {obj['key']: obj for obj in batch}
+    assert set(by_key) == {'2SS8NXZI', 'AGTZDBRQ'}
+    assert by_key['2SS8NXZI']['version'] == 1
+    assert [t['tag'] for t in by_key['2SS8NXZI']['tags']] == ['Helicobacter pylori', 'T cells']
+
+def test_mock_merge_tags_dedupes(runner, mock_active_profile, mock_zotero_patched):
+    """Test tags merge replaces every source tag and drops the resulting duplicates."""
+    result = runner.invoke(zot, ['tags', 'merge', 'Congresses', 'Apoptosis', '--into', 'Apoptosis', '--force'])
+    assert result.exit_code == 0, result.output
+    [batch] = mock_zotero_patched.updated_batches
+    by_key = {obj['key']: [t['tag'] for t in obj['tags']] for obj in batch}
+    assert by_key['AGTZDBRQ'].count('Apoptosis') == 1
+    assert 'Congresses' not in by_key['AGTZDBRQ']
+    assert by_key['X42A7DEE'][0] == 'Analysis' and 'Apoptosis' in by_key['X42A7DEE']
+
+def test_mock_rename_tag_dry_run(runner, mock_active_profile, mock_zotero_patched):
+    """Test tags rename --dry-run lists affected items without writing."""
+    result = runner.invoke(zot, ['tags', 'rename', 'Fiction', 'Novels', '--dry-run'])
+    assert result.exit_code == 0, result.output
+    assert list(json.loads(result.output)[0]) == ['Z8N84QAJ']
+    assert mock_zotero_patched.updated_batches == []
+
+def test_mock_rename_tag_retries_version_conflicts(runner, mock_active_profile, mock_zotero_patched):
+    """Test objects rejected with 412 are refetched and written again."""
+    class Response:
+        def __init__(self, body):
+            self.body = body
+        def json(self):
+            return self.body
+
+    responses = iter([
+        Response({'successful': {'0': {}}, 'failed': {'1': {'key': 'AGTZDBRQ', 'code': 412, 'message': 'Item has been modified'}}}),
+        Response({'successful': {'0': {}}, 'failed': {}}),
+    ])
+    original_update = mock_zotero_patched.update_items
+
+    def update_items(payloads):
+        original_update(payloads)
+        mock_zotero_patched.request = next(responses)
+        return True
+
+    mock_zotero_patched.update_items = update_items
+    result = runner.invoke(zot, ['tags', 'rename', 'T-Lymphocytes', 'T cells', '--force'])
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output) == [{'2SS8NXZI': 'Updated'}, {'AGTZDBRQ': 'Updated'}]
+    assert [[obj['key'] for obj in b] for b in mock_zotero_patched.updated_batches] == [['2SS8NXZI', 'AGTZDBRQ'], ['AGTZDBRQ']]
+
+def test_mock_rename_tag_reports_failures(runner, mock_active_profile, mock_zotero_patched):
+    """Test non-retryable per-object failures exit with code 1."""
+    class Response:
+        def json(self):
+            return {'failed': {'0': {'key': 'Z8N84QAJ', 'code': 400, 'message': 'Invalid tag'}}}
+
+    mock_zotero_patched.request = Response()
+    result = runner.invoke(zot, ['tags', 'rename', 'Fiction', 'Novels', '--force'])
+    assert result.exit_code == 1
+    assert 'Invalid tag' in result.output
+
+def test_mock_delete_tags_in_chunks(runner, mock_active_profile, mock_zotero_patched):
+    """Test deleting more than 50 tags splits them across requests."""
+    calls = []
+    mock_zotero_patched.delete_tags = lambda *tags: calls.append(tags) or True
+    names = [f"auto-tag-{i}" for i in range(120)]
+    result = runner.invoke(zot, ['tags', 'delete', *names, '--force'])
+    assert result.exit_code == 0, result.output
+    assert [len(c) for c in calls] == [50, 50, 20]
+    assert [t for c in calls for t in c] == names
+    assert "Successfully deleted tags: 120 tags" in result.output
+
+def test_tag_delete_chunks_respect_query_length():
+    """Test long tag names start a new chunk before the encoded query gets too long."""
+    from pyzotero_cli.tag_cmds import MAX_TAG_QUERY_CHARS, _tag_delete_chunks
+    names = ["x" * 1500 + str(i) for i in range(5)]
+    chunks = list(_tag_delete_chunks(names))
+    assert [t for c in chunks for t in c] == names
+    assert all(sum(len(t) + 10 for t in c) <= MAX_TAG_QUERY_CHARS for c in chunks)
+    assert len(chunks) == 3
+
+def test_mock_delete_tags_retries_conflicts(runner, mock_active_profile, mock_zotero_patched, monkeypatch):
+    """Test a 412 on one chunk is retried with backoff and the other chunks still go through."""
+    from pyzotero import zotero_errors
+    sleeps = []
+    monkeypatch.setattr("pyzotero_cli.tag_cmds.time.sleep", sleeps.append)
+    attempts = []
+
+    def delete_tags(*tags):
+        attempts.append(tags[0])
+        if tags[0] == "t-50" and attempts.count("t-50") < 3:
+            raise zotero_errors.PreConditionFailedError("412")
+        return True
+
+    mock_zotero_patched.delete_tags = delete_tags
+    result = runner.invoke(zot, ['tags', 'delete', *[f"t-{i}" for i in range(60)], '--force'])
+    assert result.exit_code == 0, result.output
+    assert attempts == ["t-0", "t-50", "t-50", "t-50"]
+    assert len(sleeps) == 2
+
+def test_mock_delete_tags_reports_partial_failure(runner, mock_active_profile, mock_zotero_patched, monkeypatch):
+    """Test chunks that keep conflicting are reported and exit with code 1."""
+    from pyzotero import zotero_errors
+    monkeypatch.setattr("pyzotero_cli.tag_cmds.time.sleep", lambda s: None)
+
+    def delete_tags(*tags):
+        if tags[0] == "t-50":
+            raise zotero_errors.PreConditionFailedError("412")
+        return True
+
+    mock_zotero_patched.delete_tags = delete_tags
+    result = runner.invoke(zot, ['tags', 'delete', *[f"t-{i}" for i in range(60)], '--force'])
+    assert result.exit_code == 1
+    assert "Deleted 50 of 60 tags." in result.output
+
+def test_mock_tag_stats_top(runner, mock_active_profile, mock_zotero_patched):
+    """Test tags stats counts tag usage from the local item store."""
+    result = runner.invoke(zot, ['tags', 'stats', '--top', '3'])
+    assert result.exit_code == 0, result.output
+    rows = json.loads(result.output)
+    assert [(r['tag'], r['meta']['numItems']) for r in rows] == [
+        ('Congresses', 2), ('Detective and mystery stories, English', 2), ('Holmes, Sherlock (Fictitious character)', 2),
+    ]
+
+def test_mock_tag_stats_cooccur_and_collection(runner, mock_active_profile, mock_zotero_patched):
+    """Test tags stats --cooccur and --collection restrict the counted items."""
+    result = runner.invoke(zot, ['tags', 'stats', '--cooccur', 'T-Lymphocytes', '--output', 'keys'])
+    assert result.exit_code == 0, result.output
+    assert set(result.output.strip().split('\n')) == {
+        'Helicobacter pylori', 'Apoptosis', 'Congresses', 'HIV infections', 'Lymphocyte transformation',
+        'Pathophysiology', 'immunology', 'therapy',
+    }
+    result = runner.invoke(zot, ['tags', 'stats', '--collection', 'QM6T3KHX', '--output', 'keys'])
+    assert result.exit_code == 0, result.output
+    assert set(result.output.strip().split('\n')) == {'judelaw', 'robertdowneyjr', 'sherlockholmes'}
+
+def test_mock_tag_stats_orphans(runner, mock_active_profile, mock_zotero_patched):
+    """Test tags stats --orphans lists server tags no stored item carries."""
+    result = runner.invoke(zot, ['tags', 'stats', '--orphans', '--output', 'table'])
+    assert result.exit_code == 0, result.output
+    assert 'Community / Economic Development' in result.output
+
+def test_mock_list_tags_fanout(runner, mock_active_profile, mock_zotero_patched):
+    """Test tags list --libraries turns tag names into records carrying their library."""
+    result = runner.invoke(zot, ['tags', 'list', '--libraries', '10,20', '--output', 'json'])
+    assert result.exit_code == 0, result.output
+    records = json.loads(result.output)
+    assert {r['library']['id'] for r in records} == {10, 20}
+    assert all('tag' in r for r in records)
@@ -0,0 +1,121 @@
+import importlib
+import json
+
+import pytest
+from pyzotero import zotero, zotero_errors
+
+from pyzotero_cli import telemetry
+from pyzotero_cli.http_transport import install_transport_wrapper
+from pyzotero_cli.zot_cli import zot
+
+
+def test_telemetry_is_off_without_exporter(monkeypatch):
+    monkeypatch.delenv(telemetry.EXPORTER_ENV_VAR, raising=False)
+    assert telemetry.configure() is None
+    assert not telemetry.enabled()
+
+
+def test_command_path_skips_group_options():
+    import click
+
+    ctx = click.Context(zot)
+    argv = ['--profile', 'items', '--timings', 'items', 'list', '--limit', '5']
+    assert telemetry.command_path(ctx, argv) == ['items', 'list']
+
+
+@pytest.fixture
+def otel():
+    pytest.importorskip("opentelemetry.sdk")
+    from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+    spans, metrics = InMemorySpanExporter(), InMemoryMetricReader()
+    telemetry.configure(span_exporter=spans, metric_reader=metrics)
+    yield spans, metrics
+    telemetry.disable()
+
+
+def _metric_points(reader):
+    points = {}
+    for resource_metrics in reader.get_metrics_data().resource_metrics:
+        for scope_metrics in resource_metrics.scope_metrics:
+            for metric in scope_metrics.metrics:
+                points[metric.name] = list(metric.data.data_points)
+    return points
+
+
+def test_mock_command_span(otel, runner, mock_active_profile, mock_zotero_patched):
+    """Test a command run produces one span with the command path, library and item count."""
+    spans, _ = otel
+    result = runner.invoke(zot, ['tags', 'list'])
+    assert result.exit_code == 0, result.output
+    [span] = spans.get_finished_spans()
+    assert span.name == "zot tags list"
+    assert span.attributes["zotcli.command"] == "tags list"
+    assert span.attributes["zotero.library_id"] == "12345"
+    assert span.attributes["zotcli.item_count"] == 1
+    assert span.attributes["zotcli.exit_code"] == 0
+    assert span.status.is_ok
+
+
+def test_mock_failed_command_span(otel, runner, mock_active_profile, mock_zotero_patched, monkeypatch):
+    """Test a failing command marks its span as an error."""
+    from opentelemetry.trace import StatusCode
+
+    spans, _ = otel
+    monkeypatch.setattr(mock_zotero_patched, "tags", lambda **kwargs: (_ for _ in ()).throw(
+        zotero_errors.ResourceNotFoundError("gone")))
+    result = runner.invoke(zot, ['tags', 'list'])
+    assert result.exit_code != 0
+    [span] = spans.get_finished_spans()
+    assert span.attributes["zotcli.exit_code"] == result.exit_code
+    assert span.status.status_code == StatusCode.ERROR
+
+
+def test_tracing_transport_spans_and_metrics(otel):
+    spans, metrics = otel
+    client = zotero.Zotero("12345", "group", "fake_api_key")
+    httpx = importlib.import_module(type(client.client).__module__.split('.')[0])
+
+    def handler(request):
+        if "if-modified-since-version" in request.headers:
+            return httpx.Response(304)
+        return httpx.Response(200, headers={"Content-Type": "application/json"}, json=[{"key": "AAAA1111"}])
+
+    client.client._transport = httpx.MockTransport(handler)
+    install_transport_wrapper(client, telemetry.TracingTransport)
+    client.top(limit=5)
+    client.client.get("https://api.zotero.org/groups/12345/items", headers={"If-Modified-Since-Version": "7"})
+
+    first, second = spans.get_finished_spans()
+    assert first.name == "GET api.zotero.org"
+    assert first.attributes["http.response.status_code"] == 200
+    assert first.attributes["zotero.library_type"] == "group"
+    assert first.attributes["zotero.library_id"] == "12345"
+    assert second.attributes["http.response.status_code"] == 304
+
+    points = _metric_points(metrics)
+    assert sum(p.value for p in points["zotcli.http.requests"]) == 2
+    assert sum(p.count for p in points["zotcli.http.duration"]) == 2
+    [cache] = points["zotcli.http.cache.requests"]
+    assert cache.attributes == {"zotcli.cache.result": "hit"} and cache.value == 1
+
+
+def test_retries_are_counted(otel):
+    _, metrics = otel
+    telemetry.add_retry("version_conflict")
+    [point] = _metric_points(metrics)["zotcli.retries"]
+    assert point.value == 1
+
+
+def test_mock_file_exporter(runner, mock_active_profile, mock_zotero_patched, tmp_path, monkeypatch):
+    """Test ZOTCLI_OTEL_EXPORTER=file appends spans as JSON lines."""
+    pytest.importorskip("opentelemetry.sdk")
+    path = tmp_path / "otel.jsonl"
+    monkeypatch.setenv(telemetry.EXPORTER_ENV_VAR, "file")
+    monkeypatch.setenv(telemetry.FILE_ENV_VAR, str(path))
+    result = runner.invoke(zot, ['tags', 'list'])
+    assert result.exit_code == 0, result.output
+    assert not telemetry.enabled()
+    records = [json.loads(line) for line in path.read_text().splitlines() if line.strip()]
+    assert any(r.get("name") == "zot tags list" for r in records)